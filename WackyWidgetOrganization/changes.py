@@ -0,0 +1,282 @@
+from collections import deque
+from itertools import islice
+from typing import NamedTuple
+
+from employee import Vacancy, ROLE_RANK
+
+
+class Change(NamedTuple):
+    """
+    One spot whose place in the organization changed, numbered in the order changes were published.
+      sequence    - 1 for the first change published after the feed was attached, then counting up
+      kind        - "hire", "removal", "move" (new boss), "promotion" or "demotion" (new role, and
+                    maybe a new boss), "vacancy" (a vacancy opened) or "filled" (a vacancy went away)
+      name        - employee name, or the number of a vacancy (Vacancy.number), which it keeps
+                    until it is filled or removed, undone changes included
+      boss_before - name of the boss before the change, or its number if it is a vacancy; None for
+                    the President or a spot that was not in the organization
+      boss_after  - the same after the change
+      role_before - role before the change, None if the spot was not in the organization
+      role_after  - role after the change, None if the spot left it
+    A mirror that keeps (name, boss, role) for each spot stays in step by dropping the before half
+    of each change and adding the after half.
+    """
+    sequence: int
+    kind: str
+    name: str | int | None
+    boss_before: str | int | None
+    boss_after: str | int | None
+    role_before: str | None
+    role_after: str | None
+
+
+def _identity(spot) -> str | int | None:
+    # How a Change names a spot: the employee's name, or the vacancy's number
+    if spot is None:
+        return None
+    return spot.number if isinstance(spot, Vacancy) else spot.name
+
+
+def _change(sequence: int, vacant: bool, before: tuple | None, after: tuple | None) -> Change:
+    # The Change of a spot from before to after, each its (name, boss name, role), or None while
+    # it is not in the organization
+    if before is None:
+        kind = "vacancy" if vacant else "hire"
+        before = (after[0], None, None)
+    elif after is None:
+        kind = "filled" if vacant else "removal"
+        after = (before[0], None, None)
+    elif after[2] != before[2]:
+        kind = "promotion" if ROLE_RANK.get(after[2], 0) < ROLE_RANK.get(before[2], 0) else "demotion"
+    else:
+        kind = "move"
+    return Change(sequence, kind, before[0], before[1], after[1], before[2], after[2])
+
+
+class ChangeFeed:
+    """
+    The changes an OrganizationManager makes, one Change per spot that joined, left, got a new boss
+    or a new role, published once each command, committed transaction or undo is done. A spot
+    changed more than once by one of those comes through once, from where it was to where it ended
+    up; a transaction rolled back publishes nothing. Only the last limit changes are kept.
+
+    Subscribers are called with each Change as it is published, while the organization is still
+    between commands (and locked, for a ConcurrentOrganizationManager), so they must not change it.
+    A mirror that reads instead keeps the sequence number of the last change it applied and asks
+    since() for the rest; once those have been dropped it starts over from resync().
+    """
+
+    def __init__(self, limit: int = 10_000):
+        self.limit = limit
+        self.org = None
+        self.sequence = 0           # Number of the newest change published
+        self._changes = deque(maxlen=limit)
+        self._subscribers = []
+        self._touched = {}          # Spot -> (name, boss, role) before the changes not yet published, None if absent
+
+    def attach(self, org):
+        # Starts publishing the changes made to org from now on
+        if org._feed is not None:
+            raise ValueError("The organization already has a change feed.")
+        self.org = org
+        org._feed = self
+
+    def close(self):
+        # Stops publishing; the changes kept so far stay readable
+        if self.org is not None and self.org._feed is self:
+            self.org._feed = None
+        self._touched.clear()
+
+    def subscribe(self, callback):
+        # Calls callback(change) for every change published from now on; returns callback
+        self._subscribers.append(callback)
+        return callback
+
+    def unsubscribe(self, callback):
+        self._subscribers.remove(callback)
+
+    @property
+    def oldest(self) -> int:
+        # Sequence number of the oldest change kept, sequence + 1 while none is
+        return self._changes[0].sequence if self._changes else self.sequence + 1
+
+    def since(self, sequence: int) -> list:
+        # The changes published after change number sequence, oldest first.
+        # KeyError once some of them have been dropped: the reader has to resync.
+        if sequence > self.sequence:
+            raise KeyError(f"Change {sequence} has not been published (the newest is {self.sequence}).")
+        if sequence + 1 < self.oldest:
+            raise KeyError(f"Changes after {sequence} are no longer kept (changes {self.oldest} to "
+                           f"{self.sequence} are); resync from a snapshot.")
+        return list(islice(self._changes, sequence + 1 - self.oldest, None))
+
+    def resync(self) -> tuple:
+        # (sequence, snapshot): a FrozenOrg of the organization just after change number sequence.
+        # Taken again if a change is published meanwhile, as commands may run on other threads.
+        while True:
+            sequence = self.sequence
+            snapshot = self.org.snapshot()
+            if self.sequence == sequence:
+                return sequence, snapshot
+
+    # ----- Called by OrganizationManager -----
+
+    def _state(self, spot) -> tuple | None:
+        org = self.org
+        if isinstance(spot, Vacancy):
+            if spot not in org._vacancy_index.get(spot.role, ()):
+                return None
+        elif org.employee_lookup.get(spot.name) is not spot:
+            return None
+        return _identity(spot), _identity(spot.boss), spot.role
+
+    def touch(self, spots):
+        # Notes where spots are before a change that may move them
+        touched = self._touched
+        for spot in spots:
+            if spot not in touched:
+                touched[spot] = self._state(spot)
+
+    def publish(self):
+        # Publishes a Change for every spot touched since the last call that is not where it was
+        touched, self._touched = self._touched, {}
+        for spot, before in touched.items():
+            after = self._state(spot)
+            if after == before:
+                continue
+            self.sequence += 1
+            change = _change(self.sequence, isinstance(spot, Vacancy), before, after)
+            self._changes.append(change)
+            for callback in self._subscribers:
+                callback(change)
+
+    def __len__(self) -> int:
+        return len(self._changes)
+
+    def __iter__(self):
+        return iter(self._changes)
+
+
+# ----- Diff -----
+
+def _same(a, b) -> bool:
+    # Whether two FrozenSpots head equal subtrees, going by their digests
+    return a is b or (a.digest is not None and a.digest == b.digest)
+
+
+def _placed(reports, boss):
+    # (report, key) for each report: an employee's name, or for a vacancy its place, (boss, n) for
+    # the n-th vacancy among the reports, counting from 0
+    number = 0
+    for report in reports:
+        if report.name is None:
+            yield report, (boss, number)
+            number += 1
+        else:
+            yield report, report.name
+
+
+def diff(org_a, org_b) -> list:
+    """
+    The changes between two organizations, each an OrganizationManager (its snapshot is taken) or a
+    FrozenOrg, such as two versions from a VersionHistory: one Change per spot that is in only one
+    of them or has another boss or role in org_b, numbered from 1, in the same terms as a ChangeFeed
+    except for vacancies. Those are not numbered in a snapshot, so they are known by their place:
+    (boss, n) for the n-th vacancy, counting from 0, among the reports of boss, which is a name or
+    itself a place. A spot below a vacancy has that place as its boss. A mirror of org_a that applies
+    the changes holds org_b. Changing only an employee's place among its boss's reports is not a change.
+
+    Subtrees whose spots have the same digest are passed over without being looked into, and the
+    versions of one organization share each unchanged subtree outright, so the cost grows with the
+    number of changes and the report lists along their paths, not with headcount. Digests are
+    hashes: two different subtrees with the same one would be missed, as with any hash comparison.
+    """
+    roots = [org.snapshot().root if hasattr(org, "snapshot") else org.root for org in (org_a, org_b)]
+    found = []                  # (vacant, before, after) for each change
+    waiting = ({}, {})          # Per side, key -> (spot, boss) of spots not matched yet
+    expanded = (set(), set())   # Per side, keys of waiting spots whose reports are loose
+    fresh = []                  # (side, key) of spots that started waiting since the last expansion
+    loose = [(side, root, None, root.name) for side, root in enumerate(roots) if root is not None]
+    pairs = []                  # (key, spot in org_a, boss, spot in org_b, boss) of matched spots
+    lists = []                  # (boss, reports in org_a, reports in org_b) still to compare
+
+    def compare(boss, reports_a, reports_b):
+        # Reports of the same boss on both sides: equal employee subtrees cancel out, vacancies in
+        # the same place are compared with each other, and what is left is loose
+        unmatched = {}
+        places = {}
+        for report in reports_b:
+            if report.name is None:
+                places[boss, len(places)] = report
+            else:
+                unmatched.setdefault(report.digest, []).append(report)
+        vacancies = 0
+        for report in reports_a:
+            if report.name is None:
+                key = (boss, vacancies)
+                vacancies += 1
+                other = places.pop(key, None)
+                if other is None:
+                    loose.append((0, report, boss, key))
+                elif not _same(report, other):
+                    pairs.append((key, report, boss, other, boss))
+                continue
+            same = unmatched.get(report.digest) if report.digest is not None else None
+            if same:
+                same.pop()
+            else:
+                loose.append((0, report, boss, report.name))
+        for same in unmatched.values():
+            for report in same:
+                loose.append((1, report, boss, report.name))
+        loose.extend((1, report, boss, key) for key, report in places.items())
+
+    def expand(side, spot, key):
+        # Spot is not where it was on the other side, so neither is any report it has
+        loose.extend((side, report, key, own) for report, own in _placed(spot.reports, key))
+
+    while True:
+        while loose or pairs or lists:
+            if lists:
+                compare(*lists.pop())
+                continue
+            if pairs:
+                key, spot_a, boss_a, spot_b, boss_b = pairs.pop()
+                vacant = spot_a.name is None
+                if vacant and spot_a.role != spot_b.role:
+                    # A vacancy of another role in the same place: one went away and another opened
+                    found.append((True, (key, boss_a, spot_a.role), None))
+                    found.append((True, None, (key, boss_b, spot_b.role)))
+                elif (boss_a, spot_a.role) != (boss_b, spot_b.role):
+                    found.append((vacant, (key, boss_a, spot_a.role), (key, boss_b, spot_b.role)))
+                if key in expanded[0] or key in expanded[1]:
+                    # The reports of one side are loose already, so the other side's join them
+                    for side, spot in enumerate((spot_a, spot_b)):
+                        if key not in expanded[side]:
+                            expand(side, spot, key)
+                elif not _same(spot_a, spot_b):
+                    lists.append((key, spot_a.reports, spot_b.reports))
+                continue
+            side, spot, boss, key = loose.pop()
+            other = waiting[1 - side].pop(key, None)
+            if other is None:
+                waiting[side][key] = (spot, boss)
+                fresh.append((side, key))
+            elif side:
+                pairs.append((key, *other, spot, boss))
+            else:
+                pairs.append((key, spot, boss, *other))
+        # Whatever still waits has no match so far; its reports may be the way to one
+        stuck = [(side, key) for side, key in fresh if key in waiting[side]]
+        if not stuck:
+            break
+        fresh.clear()
+        for side, key in stuck:
+            expanded[side].add(key)
+            expand(side, waiting[side][key][0], key)
+
+    for key, (spot, boss) in waiting[0].items():
+        found.append((spot.name is None, (key, boss, spot.role), None))
+    for key, (spot, boss) in waiting[1].items():
+        found.append((spot.name is None, None, (key, boss, spot.role)))
+    return [_change(number, *change) for number, change in enumerate(found, 1)]
@@ -0,0 +1,309 @@
+import struct
+import sys
+from array import array
+
+from employee import Employee, Vacancy, ReportList, cycle_error
+from results import ActionResult
+
+MAGIC = b"WWOC"
+VERSION = 1
+# magic, version, node count, name count, role count, name bytes, role bytes
+HEADER = struct.Struct("<4sB3xIIIII")
+COLUMNS = ("parent", "first_child", "next_sibling", "max_reports", "name_id", "role_code")
+
+
+def _pack_strings(strings: list) -> tuple:
+    # UTF-8 blob plus the end offset of each string (offsets[0] is 0)
+    encoded = [string.encode("utf-8") for string in strings]
+    offsets = array("I", [0])
+    total = 0
+    for chunk in encoded:
+        total += len(chunk)
+        offsets.append(total)
+    return offsets, b"".join(encoded)
+
+
+def _little_endian(column) -> bytes:
+    # Memoryview columns only exist on little-endian hosts (see _load_column), so they copy as is
+    if isinstance(column, memoryview):
+        return column.tobytes()
+    if sys.byteorder == "big":
+        column = array(column.typecode, column)
+        column.byteswap()
+    return column.tobytes()
+
+
+def _load_column(view: memoryview, typecode: str, count: int):
+    # Columns are read in place from the buffer unless the host is big-endian
+    column = view[:count * 4].cast(typecode)
+    if sys.byteorder == "big":
+        column = array(typecode, column)
+        column.byteswap()
+    return column
+
+
+class ColumnarOrg:
+    """
+    An organization stored as parallel arrays instead of Employee objects. Nodes are numbered in
+    display order (node 0 is the President), and each column holds one value per node:
+      parent, first_child, next_sibling - node numbers, -1 for none
+      max_reports                       - capacity of the spot
+      name_id                           - index into the interned name table, -1 for a vacancy
+      role_code                         - index into the role table
+    plus a bitmask of which nodes are vacancies. The whole store serializes to one bytes blob,
+    which is also how it pickles.
+    Only the tree under the President is captured. OrganizationManager.from_columnar() turns a store
+    back into a manager, and OrganizationManager.save()/load() keep one in a file.
+
+    A store is a read-only snapshot, not a backend an OrganizationManager runs on: it answers DISPLAY
+    and is_superior_to() with array walks, but has no HIRE, FIRE or other change. Every change is
+    made on the Employee objects (bugs and all, as the command line tests pin them down), which a
+    manager loaded from a file builds from its store before the first one.
+    """
+
+    def __init__(self, columns: dict, vacancy_mask, name_offsets, name_blob, role_offsets, role_blob):
+        for column in COLUMNS:
+            setattr(self, column, columns[column])
+        self.vacancy_mask = vacancy_mask
+        self._name_offsets = name_offsets
+        self._name_blob = name_blob
+        self._role_offsets = role_offsets
+        self._role_blob = role_blob
+        self.roles = [self._string(role_offsets, role_blob, code) for code in range(len(role_offsets) - 1)]
+        self._names = None          # Decoded name table, built on first use
+        self._nodes_by_name = None  # Built on the first lookup by name
+
+    def __len__(self) -> int:
+        return len(self.parent)
+
+    # ----- Conversion -----
+
+    @classmethod
+    def from_manager(cls, org) -> "ColumnarOrg":
+        columns = {column: array("i") for column in COLUMNS}
+        names, roles, role_codes = [], [], {}
+        vacancies = []
+        if org.president is not None:
+            # Preorder walk; the stack holds (node, parent number) and last_child the newest child of each parent
+            stack = [(org.president, -1)]
+            seen = set()
+            last_child = {}
+            while stack:
+                node, parent = stack.pop()
+                if id(node) in seen:
+                    raise cycle_error(node)
+                seen.add(id(node))
+                number = len(columns["parent"])
+                columns["parent"].append(parent)
+                columns["first_child"].append(-1)
+                columns["next_sibling"].append(-1)
+                columns["max_reports"].append(node.max_reports)
+                if parent != -1:
+                    previous = last_child.get(parent)
+                    if previous is None:
+                        columns["first_child"][parent] = number
+                    else:
+                        columns["next_sibling"][previous] = number
+                    last_child[parent] = number
+                if isinstance(node, Vacancy):
+                    vacancies.append(number)
+                    columns["name_id"].append(-1)
+                else:
+                    columns["name_id"].append(len(names))
+                    names.append(node.name)
+                code = role_codes.get(node.role)
+                if code is None:
+                    code = role_codes[node.role] = len(roles)
+                    roles.append(node.role)
+                columns["role_code"].append(code)
+                stack.extend((report, number) for report in reversed(node.reports))
+
+        vacancy_mask = bytearray((len(columns["parent"]) + 7) // 8)
+        for number in vacancies:
+            vacancy_mask[number >> 3] |= 1 << (number & 7)
+        name_offsets, name_blob = _pack_strings(names)
+        role_offsets, role_blob = _pack_strings(roles)
+        return cls(columns, vacancy_mask, name_offsets, name_blob, role_offsets, role_blob)
+
+    def build_nodes(self, lookup: dict | None = None) -> tuple:
+        # Rebuilds the object graph with every ReportList index in place.
+        # Returns (President or None, dict of name to Employee); the employees go into lookup if one is given.
+        if lookup is None:
+            lookup = {}
+        count = len(self)
+        if count == 0:
+            return None, lookup
+        names, roles, role_code, name_id = self.names(), self.roles, self.role_code, self.name_id
+        nodes = []
+        for number in range(count):
+            role = roles[role_code[number]]
+            if name_id[number] == -1:
+                node = Vacancy(role=role)
+            else:
+                node = Employee(name=sys.intern(names[name_id[number]]), role=role)
+                lookup[node.name] = node
+            node.max_reports = self.max_reports[number]
+            nodes.append(node)
+        # Children are numbered after their parent, so walking backwards builds every
+        # ReportList from reports that already have theirs
+        parent, first_child, next_sibling = self.parent, self.first_child, self.next_sibling
+        for number in range(count - 1, -1, -1):
+            node = nodes[number]
+            if parent[number] != -1:
+                node.boss = nodes[parent[number]]
+            child = first_child[number]
+            if child != -1:
+                reports = []
+                while child != -1:
+                    reports.append(nodes[child])
+                    child = next_sibling[child]
+                node.reports = ReportList(reports)
+        return nodes[0], lookup
+
+    def to_bytes(self) -> bytes:
+        name_count = len(self._name_offsets) - 1
+        role_count = len(self._role_offsets) - 1
+        parts = [HEADER.pack(MAGIC, VERSION, len(self), name_count, role_count,
+                             len(self._name_blob), len(self._role_blob))]
+        parts.extend(_little_endian(getattr(self, column)) for column in COLUMNS)
+        parts.append(_little_endian(self._name_offsets))
+        parts.append(_little_endian(self._role_offsets))
+        parts.extend((bytes(self.vacancy_mask), bytes(self._name_blob), bytes(self._role_blob)))
+        return b"".join(parts)
+
+    @classmethod
+    def from_bytes(cls, buffer) -> "ColumnarOrg":
+        # Accepts bytes or any buffer (such as an mmap); columns are views into it, not copies.
+        view = memoryview(buffer)
+        if len(view) < HEADER.size:
+            raise ValueError("Not a columnar organization snapshot.")
+        magic, version, count, name_count, role_count, name_bytes, role_bytes = HEADER.unpack_from(view)
+        if magic != MAGIC:
+            raise ValueError("Not a columnar organization snapshot.")
+        if version != VERSION:
+            raise ValueError(f"Unsupported snapshot version {version}.")
+        mask_bytes = (count + 7) // 8
+        expected = HEADER.size + 4 * (len(COLUMNS) * count + name_count + role_count + 2) + mask_bytes + name_bytes + role_bytes
+        if len(view) < expected:
+            raise ValueError("Snapshot is truncated.")
+
+        position = HEADER.size
+        columns = {}
+        for column in COLUMNS:
+            columns[column] = _load_column(view[position:], "i", count)
+            position += 4 * count
+        name_offsets = _load_column(view[position:], "I", name_count + 1)
+        position += 4 * (name_count + 1)
+        role_offsets = _load_column(view[position:], "I", role_count + 1)
+        position += 4 * (role_count + 1)
+        vacancy_mask = view[position:position + mask_bytes]
+        position += mask_bytes
+        name_blob = view[position:position + name_bytes]
+        position += name_bytes
+        role_blob = view[position:position + role_bytes]
+        return cls(columns, vacancy_mask, name_offsets, name_blob, role_offsets, role_blob)
+
+    def __reduce__(self):
+        return ColumnarOrg.from_bytes, (self.to_bytes(),)
+
+    # ----- Node access -----
+
+    @staticmethod
+    def _string(offsets, blob, index: int) -> str:
+        return bytes(blob[offsets[index]:offsets[index + 1]]).decode("utf-8")
+
+    def is_vacant(self, node: int) -> bool:
+        return bool(self.vacancy_mask[node >> 3] >> (node & 7) & 1)
+
+    def names(self) -> list:
+        # Every employee name, in name_id order. Decoded once; ASCII tables are sliced without per-name decoding.
+        if self._names is None:
+            offsets, blob = self._name_offsets, bytes(self._name_blob)
+            text = blob.decode("utf-8")
+            if len(text) == len(blob):
+                self._names = [text[offsets[i]:offsets[i + 1]] for i in range(len(offsets) - 1)]
+            else:
+                self._names = [blob[offsets[i]:offsets[i + 1]].decode("utf-8") for i in range(len(offsets) - 1)]
+        return self._names
+
+    def name_of(self, node: int) -> str | None:
+        name_id = self.name_id[node]
+        return None if name_id == -1 else self.names()[name_id]
+
+    def role_of(self, node: int) -> str:
+        return self.roles[self.role_code[node]]
+
+    def reports_of(self, node: int):
+        child = self.first_child[node]
+        while child != -1:
+            yield child
+            child = self.next_sibling[child]
+
+    def find(self, name: str) -> int | None:
+        # Node number of an employee, or None. The name index is built on first use.
+        if self._nodes_by_name is None:
+            names = self.names()
+            self._nodes_by_name = {names[name_id]: node
+                                   for node, name_id in enumerate(self.name_id) if name_id != -1}
+        return self._nodes_by_name.get(name)
+
+    # ----- Queries -----
+
+    def is_superior_to(self, manager_name: str, employee_name: str) -> bool:
+        manager, node = self.find(manager_name), self.find(employee_name)
+        if manager is None or node is None:
+            return False
+        parent = self.parent
+        node = parent[node]
+        while node != -1:
+            if node == manager:
+                return True
+            node = parent[node]
+        return False
+
+    def display_lines(self, root: int = 0, max_depth: int | None = None):
+        # Same lines as OrganizationManager._display_lines, walking next_sibling links instead of lists.
+        if max_depth is not None and max_depth <= 0:
+            return
+        first_child, next_sibling, name_id = self.first_child, self.next_sibling, self.name_id
+        names, roles, role_code = self.names(), self.roles, self.role_code
+        indents = ["", "\t"]
+        resume = []     # Next sibling to visit at each level above the current one
+        node, level = first_child[root], 1
+        while True:
+            if node == -1:
+                if not resume:
+                    return
+                node = resume.pop()
+                level -= 1
+                continue
+            if name_id[node] == -1:
+                yield f"{indents[level]}VACANCY: {roles[role_code[node]]}"
+                node = next_sibling[node]
+                continue
+            yield f"{indents[level]}{roles[role_code[node]]}: {names[name_id[node]]}"
+            child = first_child[node]
+            if child != -1 and (max_depth is None or level < max_depth):
+                resume.append(next_sibling[node])
+                node = child
+                level += 1
+                if len(indents) <= level:
+                    indents.append("\t" * level)
+            else:
+                node = next_sibling[node]
+
+    def display_organization(self, stream=None, max_depth: int | None = None, root: str | None = None):
+        # Writes the same listing as OrganizationManager.display_organization, and returns the same
+        # ActionResult for an unknown root; with no echo to print it, that is up to the caller.
+        if stream is None:
+            stream = sys.stdout
+        if len(self) == 0:
+            stream.write("Organization is empty.\n")
+            return
+        top = 0 if root is None else self.find(root)
+        if top is None:
+            return ActionResult("unknown_employee", (root,))
+        lines = [f"{self.role_of(top)}: {self.name_of(top)}"]
+        lines.extend(self.display_lines(top, max_depth))
+        lines.append("")
+        stream.write("\n".join(lines))
@@ -0,0 +1,81 @@
+from typing import NamedTuple
+
+from organization_manager import OrganizationManager
+
+
+class Command(NamedTuple):
+    """
+    One command of the line protocol, as typed at the prompt or written in a script.
+      name      - the command word, upper case
+      method    - OrganizationManager method called with the arguments
+      arguments - argument names, shown in the syntax message
+      syntax    - e.g. "HIRE <ManagerName> <NewEmployeeName>"
+      words     - number of words a valid line has, the command word included
+    """
+    name: str
+    method: str
+    arguments: tuple
+    syntax: str
+    words: int
+
+    @property
+    def batch(self) -> bool:
+        # Whether OrganizationManager.apply_batch() accepts it too
+        return self.name in OrganizationManager.BATCH_COMMANDS
+
+
+COMMANDS = {}
+
+
+def register(name: str, method: str, *arguments: str) -> Command:
+    """
+    Adds a command the REPL and scripts dispatch to OrganizationManager.<method>(*arguments).
+    Commands apply_batch() also accepts must name the same method and argument count as BATCH_COMMANDS.
+    """
+    name = name.upper()
+    if name in COMMANDS or name == "EXIT":
+        raise ValueError(f"Command {name} is already registered.")
+    if not callable(getattr(OrganizationManager, method, None)):
+        raise ValueError(f"OrganizationManager has no method {method}.")
+    if name in OrganizationManager.BATCH_COMMANDS and OrganizationManager.BATCH_COMMANDS[name] != (method, len(arguments)):
+        raise ValueError(f"Command {name} does not match OrganizationManager.BATCH_COMMANDS.")
+    syntax = " ".join([name] + [f"<{argument}>" for argument in arguments])
+    command = COMMANDS[name] = Command(name, method, tuple(arguments), syntax, len(arguments) + 1)
+    return command
+
+
+register("HIRE", "hire_employee", "ManagerName", "NewEmployeeName")
+register("FIRE", "fire_employee", "ManagerName", "EmployeeName")
+register("QUIT", "employee_quits", "EmployeeName")
+register("LAYOFF", "layoff_employee", "ManagerName", "TargetEmployeeName")
+register("TRANSFER", "transfer_employee", "InitiatorName", "EmployeeName", "NewManagerName")
+register("PROMOTE", "promote_employee", "ReceivingManagerName", "TargetEmployeeName")
+register("DISPLAY", "display_organization")
+
+
+def dispatch(org_manager: OrganizationManager, parts: list):
+    """
+    Runs one command line already split into words (EXIT is the caller's to handle).
+    An unknown command or a wrong argument count prints the usual error and returns None;
+    otherwise returns what the method returned.
+    """
+    command = COMMANDS.get(parts[0].upper())
+    if command is None:
+        print(f"Error: Unknown command '{parts[0].upper()}'.")
+        return None
+    words = command.words
+    if len(parts) != words:
+        print(f"Incorrect number of arguments for command {command.name}")
+        print(f"Syntax should be: {command.syntax}")
+        return None
+    method = command.method
+    # Spelled out per argument count: a *parts[1:] call costs more than the rest of dispatch
+    if words == 3:
+        return getattr(org_manager, method)(parts[1], parts[2])
+    if words == 2:
+        return getattr(org_manager, method)(parts[1])
+    if words == 1:
+        return getattr(org_manager, method)()
+    if words == 4:
+        return getattr(org_manager, method)(parts[1], parts[2], parts[3])
+    return getattr(org_manager, method)(*parts[1:])
@@ -0,0 +1,372 @@
+import contextlib
+import io
+import sys
+import threading
+
+from employee import ROLE_RANK
+from organization_manager import OrganizationManager
+from results import ActionResult
+
+STRIPES = 64        # Branch locks; the President's direct reports are spread over them
+BRANCH_DEPTH = 64   # Boss pointers followed looking for a branch before giving up (see employee.cycle_error)
+RETRIES = 4         # Attempts at branch locks before a command runs alone
+
+# Per command: positions of names that make it change the President's own reports when they name
+# a Vice President (first tuple) or the President (second tuple). Such commands run alone.
+TOP_LEVEL = {
+    "HIRE": ((), (0,)),
+    "FIRE": ((1,), ()),
+    "QUIT": ((0,), ()),
+    "LAYOFF": ((1,), ()),
+    "TRANSFER": ((1,), (2,)),
+    "PROMOTE": ((), (0,)),
+}
+
+
+class SharedExclusiveLock:
+    """
+    Many holders in shared mode, or one in exclusive mode. A waiting exclusive holder goes first,
+    so a steady stream of shared holders cannot starve it. Not reentrant.
+    """
+
+    def __init__(self):
+        self._condition = threading.Condition(threading.Lock())
+        self._shared = 0
+        self._exclusive = False
+        self._waiting = 0
+
+    def acquire_shared(self):
+        with self._condition:
+            while self._exclusive or self._waiting:
+                self._condition.wait()
+            self._shared += 1
+
+    def release_shared(self):
+        with self._condition:
+            self._shared -= 1
+            if not self._shared:
+                self._condition.notify_all()
+
+    def acquire_exclusive(self):
+        with self._condition:
+            self._waiting += 1
+            while self._exclusive or self._shared:
+                self._condition.wait()
+            self._waiting -= 1
+            self._exclusive = True
+
+    def release_exclusive(self):
+        with self._condition:
+            self._exclusive = False
+            self._condition.notify_all()
+
+
+class ConcurrentOrganizationManager(OrganizationManager):
+    """
+    OrganizationManager that commands can be issued to from many threads at once.
+
+    The subtree under each of the President's direct reports (a branch) has its own lock, so
+    commands in different Vice Presidents' branches run side by side:
+      - A command first takes the gate in shared mode, then the locks of every branch its names sit
+        in, in stripe order, so TRANSFER, PROMOTE and LAYOFF across two branches cannot deadlock.
+        If a name moved to another branch meanwhile, the locks are dropped and taken again.
+      - Commands that change the President's own reports (hiring under the President, removing or
+        moving a Vice President, promoting to Vice President), a LAYOFF whose opening search leaves
+        the employee's branch, and a command whose branches keep changing take the gate exclusively
+        and run alone. So does anything inside `with org.exclusive():`, every
+        transaction (see OrganizationManager.transaction), undo() and redo().
+      - Checks run under the branch locks only. From its first change until it returns, a command
+        also holds the commit lock, which guards what every branch shares (names, indexes, the tallies,
+        openings and frozen copy of the President, the ancestry index, the undo stack, the journal,
+        the version history and the change feed). Journal records and published changes therefore
+        come in the order the changes were made.
+      - Reads (DISPLAY, headcount, the role and vacancy queries, snapshot, save) hold the gate in shared mode and
+        the commit lock, so they see the organization between two commands. DISPLAY writes its
+        listing out after letting go, and export() writes a snapshot.
+    The ancestry index is only rebuilt by a command running alone; until then hierarchy checks
+    climb boss pointers. Python runs one thread at a time, so the gain is in overlapping what
+    commands wait on (journal syncs, echo output), not in spreading the checks over cores.
+    """
+
+    def __init__(self, echo: bool = True):
+        self._local = threading.local()     # First, as the base class sets _unit and _quiet
+        super().__init__(echo)
+        self._gate = SharedExclusiveLock()
+        self._stripes = [threading.Lock() for _ in range(STRIPES)]
+        self._commit = threading.RLock()
+        self._loading = threading.Lock()    # Held while a loaded organization's objects are built
+
+    @property
+    def _unit(self):
+        # The open transaction belongs to the thread that opened it
+        return getattr(self._local, "unit", None)
+
+    @_unit.setter
+    def _unit(self, unit):
+        self._local.unit = unit
+
+    @property
+    def _quiet(self):
+        # apply_batch and redo quieten their own thread's commands only
+        return getattr(self._local, "quiet", False)
+
+    @_quiet.setter
+    def _quiet(self, quiet):
+        self._local.quiet = quiet
+
+    # ----- Locking -----
+
+    def _materialize(self):
+        # Readers holding the gate together may all be first to need the objects; one builds them
+        with self._loading:
+            if self._store is not None:
+                super()._materialize()
+
+    def _held(self, mode: str) -> bool:
+        return getattr(self._local, mode, False)
+
+    @contextlib.contextmanager
+    def exclusive(self):
+        # Runs the block with no other command or read in progress
+        local = self._local
+        if self._held("exclusive"):
+            yield
+            return
+        if self._held("shared"):
+            raise RuntimeError("Cannot run alone from inside a command.")
+        self._gate.acquire_exclusive()
+        local.exclusive = True
+        try:
+            yield
+        finally:
+            self._end_commit()
+            local.exclusive = False
+            self._gate.release_exclusive()
+
+    @contextlib.contextmanager
+    def _snapshot(self):
+        # Holds off every change for the length of a read
+        local = self._local
+        gated = not (self._held("exclusive") or self._held("shared"))
+        if gated:
+            self._gate.acquire_shared()
+            local.shared = True
+        try:
+            with self._commit:
+                yield
+        finally:
+            if gated:
+                local.shared = False
+                self._gate.release_shared()
+
+    def _begin_commit(self):
+        # Call before a command's first change; _end_commit releases it once the command returns
+        local = self._local
+        if not getattr(local, "committing", False):
+            self._commit.acquire()
+            local.committing = True
+
+    def _end_commit(self):
+        local = self._local
+        if getattr(local, "committing", False):
+            local.committing = False
+            self._commit.release()
+
+    def _branch(self, node):
+        # The President's direct report node sits under (node itself for one of them), or None for
+        # the President and for a node whose boss pointers do not lead to the President
+        president = self.president
+        for _ in range(BRANCH_DEPTH):
+            boss = node.boss
+            if boss is president:
+                return node
+            if boss is None:
+                return None
+            node = boss
+        return None
+
+    def _scope(self, command: str, names: tuple) -> list | None:
+        # Branches a command reads and changes, in lock order, or None when it has to run alone
+        president = self.president
+        if president is None:
+            return None
+        nodes = self.employee_lookup.resolve(names)
+        vice_presidents, presidents = TOP_LEVEL[command]
+        if any(nodes[i] is not None and nodes[i].boss is president for i in vice_presidents):
+            return None
+        if any(nodes[i] is president for i in presidents):
+            return None
+        branches = {}
+        for node in nodes:
+            if node is None or node is president:
+                continue
+            branch = self._branch(node)
+            if branch is None:
+                return None
+            branches[hash(branch) % STRIPES, id(branch)] = branch
+        return [branches[key] for key in sorted(branches)]
+
+    def _opening_nearby(self, names: tuple) -> bool:
+        # Whether LAYOFF finds its opening without looking outside the employee's branch:
+        # the same first steps as _find_opening, under the employee's own Vice President
+        target = self.employee_lookup.get(names[1])
+        if target is None or target.boss is None:
+            return True
+        boss = target.boss
+        if self._has_spots(boss) is not False:
+            return True
+        if ROLE_RANK.get(target.role, 0) <= 2 or boss.boss is None:
+            return False
+        return self._opening_in(boss.boss.reports, skip=boss)[1] is not None
+
+    def _run(self, method, command: str, names: tuple):
+        # Calls method under the locks its names need, or alone
+        local = self._local
+        if self._held("exclusive"):
+            try:
+                return method(self, *names)
+            finally:
+                self._end_commit()
+        for _ in range(RETRIES):
+            self._gate.acquire_shared()
+            local.shared = True
+            try:
+                scope = self._scope(command, names)
+                if scope is None:
+                    break
+                stripes = sorted({hash(branch) % STRIPES for branch in scope})
+                for stripe in stripes:
+                    self._stripes[stripe].acquire()
+                try:
+                    if self._scope(command, names) != scope:
+                        continue
+                    if command == "LAYOFF" and not self._opening_nearby(names):
+                        break
+                    try:
+                        return method(self, *names)
+                    finally:
+                        self._end_commit()
+                finally:
+                    for stripe in reversed(stripes):
+                        self._stripes[stripe].release()
+            finally:
+                local.shared = False
+                self._gate.release_shared()
+        with self.exclusive():
+            return method(self, *names)
+
+    # ----- Where changes begin -----
+
+    def _record(self, command: str, names):
+        self._begin_commit()
+        super()._record(command, names)
+
+    def _add_employee(self, manager, new_employee_name: str):
+        self._begin_commit()
+        if new_employee_name in self.employee_lookup:
+            # Hired into another branch since the name was checked
+            return ActionResult("name_taken", (new_employee_name,))
+        return super()._add_employee(manager, new_employee_name)
+
+    def _replace_vacancy_with_new_employee(self, manager, vacancy_index: int, new_employee_name: str):
+        self._begin_commit()
+        if new_employee_name in self.employee_lookup:
+            return ActionResult("name_taken", (new_employee_name,))
+        return super()._replace_vacancy_with_new_employee(manager, vacancy_index, new_employee_name)
+
+    def _remove_employee(self, employee):
+        self._begin_commit()
+        return super()._remove_employee(employee)
+
+    def _move_employee(self, employee, new_boss, replacement_index: int):
+        self._begin_commit()
+        return super()._move_employee(employee, new_boss, replacement_index)
+
+    def _promote_into_vacancy(self, target_employee, receiving_manager, idx: int):
+        self._begin_commit()
+        return super()._promote_into_vacancy(target_employee, receiving_manager, idx)
+
+    def _promote_to_new_spot(self, target_employee, receiving_manager):
+        self._begin_commit()
+        return super()._promote_to_new_spot(target_employee, receiving_manager)
+
+    def _rebuild_ancestry(self):
+        # Relabels the whole tree, so only while nothing else runs
+        if self._held("exclusive"):
+            super()._rebuild_ancestry()
+
+    # ----- Commands -----
+
+    def initialize_president(self, name: str) -> bool:
+        with self.exclusive():
+            self._begin_commit()
+            return OrganizationManager.initialize_president(self, name)
+
+    def hire_employee(self, hiring_manager_name: str, new_employee_name: str) -> ActionResult:
+        return self._run(OrganizationManager.hire_employee, "HIRE", (hiring_manager_name, new_employee_name))
+
+    def fire_employee(self, firing_manager_name: str, target_employee_name: str) -> ActionResult:
+        return self._run(OrganizationManager.fire_employee, "FIRE", (firing_manager_name, target_employee_name))
+
+    def employee_quits(self, employee_name: str) -> ActionResult:
+        return self._run(OrganizationManager.employee_quits, "QUIT", (employee_name,))
+
+    def layoff_employee(self, manager_name: str, target_employee_name: str) -> ActionResult:
+        return self._run(OrganizationManager.layoff_employee, "LAYOFF", (manager_name, target_employee_name))
+
+    def transfer_employee(self, initiator_name: str, employee_name: str, destination_manager_name: str) -> ActionResult:
+        return self._run(OrganizationManager.transfer_employee, "TRANSFER",
+                         (initiator_name, employee_name, destination_manager_name))
+
+    def promote_employee(self, receiving_manager_name: str, target_employee_name: str) -> ActionResult:
+        return self._run(OrganizationManager.promote_employee, "PROMOTE", (receiving_manager_name, target_employee_name))
+
+    # ----- Transactions and undo -----
+
+    @contextlib.contextmanager
+    def transaction(self):
+        # Runs alone from start to end, so no other thread sees the changes before they commit
+        with self.exclusive(), OrganizationManager.transaction(self):
+            yield self
+
+    def undo(self) -> bool:
+        with self.exclusive():
+            return super().undo()
+
+    def redo(self) -> bool:
+        with self.exclusive():
+            return super().redo()
+
+    # ----- Reads -----
+
+    def headcount(self, name: str):
+        with self._snapshot():
+            return super().headcount(name)
+
+    def employees_with_role(self, role: str, under: str | None = None) -> list | None:
+        with self._snapshot():
+            return super().employees_with_role(role, under)
+
+    def vacancies(self, role: str | None = None, under: str | None = None) -> list | None:
+        with self._snapshot():
+            return super().vacancies(role, under)
+
+    def display_organization(self, stream=None, max_depth: int | None = None, root: str | None = None):
+        listing = io.StringIO()
+        with self._snapshot():
+            result = super().display_organization(listing, max_depth, root)
+        (sys.stdout if stream is None else stream).write(listing.getvalue())
+        return result
+
+    def snapshot(self):
+        with self._snapshot():
+            return super().snapshot()
+
+    def export(self, target, format: str | None = None, compress: bool | None = None):
+        # Writes a snapshot, so commands carry on while the file is written.
+        # Raises ValueError on a reporting cycle (see employee.cycle_error).
+        self.snapshot().export(target, format, compress)
+
+    def _snapshot_bytes(self) -> bytes:
+        with self._snapshot():
+            return super()._snapshot_bytes()
@@ -1,4 +1,8 @@
 from abc import ABC
+from bisect import bisect_left
+from itertools import count
+
+ROLE_LADDER = ["President", "Vice President", "Supervisor", "Worker"]  # Highest role first
 
 ROLE_CAPACITY = {
     "President": 2,
@@ -7,28 +11,245 @@ ROLE_CAPACITY = {
     "Worker": 0
 }
 
+ROLE_RANK = {role: rank for rank, role in enumerate(ROLE_LADDER)}  # Role to position on the ladder
+
+def configure_roles(ladder: list[str], capacity: dict[str, int]):
+    # Replaces the role ladder (highest role first) and the per-role capacities.
+    # Only affects employees created afterwards, so call it before building an organization.
+    if len(ladder) < 2 or len(set(ladder)) != len(ladder):
+        raise ValueError("The role ladder needs at least two distinct roles.")
+    ROLE_LADDER[:] = ladder
+    ROLE_CAPACITY.clear()
+    ROLE_CAPACITY.update(capacity)
+    ROLE_RANK.clear()
+    ROLE_RANK.update((role, rank) for rank, role in enumerate(ladder))
+
+def cycle_error(spot) -> ValueError:
+    # The error every walk down the tree raises on reaching spot a second time on one path.
+    # Some known bugs (see the command line tests) can move an employee below one of their own
+    # reports, closing a reporting cycle that a walk would otherwise follow forever. Listings,
+    # exports, snapshots, save() and ColumnarOrg.from_manager all raise this ValueError then.
+    return ValueError(f"{getattr(spot, 'name', 'A vacancy')} appears below themselves in the hierarchy.")
+
+def _mark(slots: list, index: int, flag: bool):
+    # Adds or drops index in a sorted list of slot indexes.
+    position = bisect_left(slots, index)
+    present = position < len(slots) and slots[position] == index
+    if flag and not present:
+        slots.insert(position, index)
+    elif present and not flag:
+        del slots[position]
+
+def _drop_and_shift(slots: list, index: int):
+    # Drops index from a sorted list of slot indexes and shifts the later ones down by one.
+    start = bisect_left(slots, index)
+    if start < len(slots) and slots[start] == index:
+        del slots[start]
+    for position in range(start, len(slots)):
+        slots[position] -= 1
+
+def _shift_up(slots: list, index: int):
+    # Shifts the entries of a sorted list of slot indexes that are index or later up by one.
+    for position in range(bisect_left(slots, index), len(slots)):
+        slots[position] += 1
+
+def _renumber(reports: list, start: int):
+    # Sets the slot of every report from start on to its index, after entries before it came or went.
+    for position in range(start, len(reports)):
+        reports[position].slot = position
+
+class ReportList(list):
+    # List of direct reports that also keeps sorted slot indexes of:
+    #   vacancy_slots - reports that are a Vacancy
+    #   open_slots    - reports that have room for a report of their own
+    #   open_below    - reports with at least one entry in their own open_slots
+    # so capacity checks and opening searches do not have to scan every report. Each report's
+    # slot holds its index here, so finding a report does not scan the list either.
+    __slots__ = ("vacancy_slots", "open_slots", "open_below")
+
+    def __init__(self, reports=()):
+        super().__init__(reports)
+        _renumber(self, 0)
+        # Filed in index order, so each list comes out sorted
+        self.vacancy_slots = [index for index, report in enumerate(self) if isinstance(report, Vacancy)]
+        self.open_slots = [index for index, report in enumerate(self) if report.has_open_spot()]
+        self.open_below = [index for index, report in enumerate(self) if report.reports.open_slots]
+
+    def _file(self, index: int, report):
+        report.slot = index
+        _mark(self.vacancy_slots, index, isinstance(report, Vacancy))
+        _mark(self.open_slots, index, report.has_open_spot())
+        _mark(self.open_below, index, bool(report.reports.open_slots))
+
+    def first_vacancy(self) -> int:
+        # Index of the first Vacancy slot, -1 if there is none.
+        return self.vacancy_slots[0] if self.vacancy_slots else -1
+
+    def index(self, report, *args) -> int:
+        # The report's slot, checked against the list; a scan only for a report filed elsewhere since
+        index = report.slot
+        if not args and index < len(self) and self[index] is report:
+            return index
+        return super().index(report, *args)
+
+    def holds(self, report) -> bool:
+        # Whether report is in this list, which its slot answers unless it was filed elsewhere since
+        index = report.slot
+        if index < len(self) and self[index] is report:
+            return True
+        return super().__contains__(report)
+
+    def refresh(self, report):
+        # Re-files a report whose own reports or capacity changed. Ignored if it is not in this list.
+        try:
+            index = self.index(report)
+        except ValueError:
+            return
+        _mark(self.open_slots, index, report.has_open_spot())
+        _mark(self.open_below, index, bool(report.reports.open_slots))
+
+    def append(self, report):
+        self._file(len(self), report)
+        super().append(report)
+
+    def insert(self, index: int, report):
+        index = min(max(index + len(self) if index < 0 else index, 0), len(self))
+        super().insert(index, report)
+        _renumber(self, index + 1)
+        _shift_up(self.vacancy_slots, index)
+        _shift_up(self.open_slots, index)
+        _shift_up(self.open_below, index)
+        self._file(index, report)
+
+    def remove(self, report):
+        try:
+            index = self.index(report)
+        except ValueError:
+            raise ValueError("list.remove(x): x not in list") from None
+        del self[index]
+
+    def __delitem__(self, index: int):
+        if index < 0:
+            index += len(self)
+        super().__delitem__(index)
+        _renumber(self, index)
+        _drop_and_shift(self.vacancy_slots, index)
+        _drop_and_shift(self.open_slots, index)
+        _drop_and_shift(self.open_below, index)
+
+    def __setitem__(self, index: int, report):
+        if not -len(self) <= index < len(self):
+            super().__setitem__(index, report)  # raises the usual IndexError
+        if index < 0:
+            index += len(self)
+        super().__setitem__(index, report)
+        self._file(index, report)
+
+class EmptyReports(tuple):
+    # Read-only stand-in for a ReportList with no entries. Every node starts out sharing
+    # NO_REPORTS and only gets a ReportList of its own in add_report(), so leaves cost no list.
+    # Lookups fail with the same errors an empty ReportList raises.
+    __slots__ = ()
+    vacancy_slots = open_slots = open_below = ()
+
+    def first_vacancy(self) -> int:
+        return -1
+
+    def refresh(self, report):
+        return
+
+    def holds(self, report) -> bool:
+        return False
+
+    def index(self, report, *args):
+        raise ValueError(f"{report!r} is not in list")
+
+    def remove(self, report):
+        raise ValueError("list.remove(x): x not in list")
+
+    def __setitem__(self, index, report):
+        raise IndexError("list assignment index out of range")
+
+    def __delitem__(self, index):
+        raise IndexError("list assignment index out of range")
+
+NO_REPORTS = EmptyReports()
+
+class Tally:
+    # What sits below one spot, kept current by OrganizationManager as the organization changes:
+    #   employees - Employees anywhere below
+    #   vacancies - role -> number of Vacancies anywhere below, None while there are none
+    #   height    - levels below (1 if all reports are leaves)
+    #   levels    - level -> number of direct reports that many levels deep (their height plus one),
+    #               so losing the deepest report does not mean looking at every other one
+    # Leaves have no Tally of their own (their tally is None).
+    __slots__ = ("employees", "vacancies", "height", "levels")
+
+    def __init__(self):
+        self.employees = 0
+        self.vacancies = None
+        self.height = 0
+        self.levels = {}
+
 class OrganizationSpot(ABC):
+    __slots__ = ()
+
+    def add_report(self, report):
+        # Appends a direct report, giving this spot its own ReportList on the first one.
+        if self.reports is NO_REPORTS:
+            self.reports = ReportList()
+        self.reports.append(report)
+
+    def insert_report(self, index: int, report):
+        # Puts a report in at index, giving this spot its own ReportList if it has none.
+        if self.reports is NO_REPORTS:
+            self.reports = ReportList()
+        self.reports.insert(index, report)
+
     def is_vacant(self):
         return isinstance(self, Vacancy)
 
+    def has_open_spot(self) -> bool:
+        # True if a report could be placed here, either in an empty slot or a vacancy.
+        return len(self.reports) < self.max_reports or bool(self.reports.vacancy_slots)
+
+    def open_spots(self) -> int:
+        # Number of reports that could still be placed here (empty slots plus vacancies).
+        return max(self.max_reports - len(self.reports), 0) + len(self.reports.vacancy_slots)
+
 class Employee(OrganizationSpot):
+    __slots__ = ("name", "role", "boss", "reports", "max_reports", "tour", "tally", "frozen", "slot")
+
     def __init__(self, name: str, role: str, boss=None):
         self.name = name                # Unique name, Dont know if just first/last or full name yet
         self.role = role                # Position in the company
         self.boss = boss                # Reference to Employee directly above
-        self.reports = []               # List of Employees directly below
+        self.reports = NO_REPORTS       # List of Employees directly below (shared while empty)
         self.max_reports = ROLE_CAPACITY.get(role, 0) # Maximum number of direct reports
+        self.tour = None                # (stamp, enter, exit) from the manager's ancestry index
+        self.tally = None               # Tally of everything below, None while there is nothing
+        self.frozen = None              # FrozenSpot of this spot as it is now, None until frozen or once changed
+        self.slot = 0                   # Index in the boss's reports, kept by ReportList
 
     def promote(self):
-        if self.role == "Worker":
-            self.role = "Supervisor"
-        elif self.role == "Supervisor":
-            self.role = "Vice President"
+        # Moves one rung up the ladder, but never into the top role
+        rank = ROLE_RANK.get(self.role, 0)
+        if rank > 1:
+            self.role = ROLE_LADDER[rank - 1]
         self.max_reports = ROLE_CAPACITY.get(self.role, 0)
 
+_vacancy_numbers = count(1)    # Numbers vacancies in the order they are created, for the change feed
+
 class Vacancy(OrganizationSpot):
+    __slots__ = ("role", "boss", "reports", "max_reports", "tour", "tally", "frozen", "slot", "number")
+
     def __init__(self, role: str, boss=None):
         self.role = role        # Position in the company
         self.boss = boss        # Reference to Employee directly above
-        self.reports = []       # List of Employees directly below
-        self.max_reports = ROLE_CAPACITY.get(role, 0) # Maximum number of direct reports
\ No newline at end of file
+        self.reports = NO_REPORTS   # List of Employees directly below (shared while empty)
+        self.max_reports = ROLE_CAPACITY.get(role, 0) # Maximum number of direct reports
+        self.tour = None        # (stamp, enter, exit) from the manager's ancestry index
+        self.tally = None       # Tally of everything below, None while there is nothing
+        self.frozen = None      # FrozenSpot of this spot as it is now, None until frozen or once changed
+        self.slot = 0           # Index in the boss's reports, kept by ReportList
+        self.number = next(_vacancy_numbers)    # Tells it from other vacancies for as long as it lives
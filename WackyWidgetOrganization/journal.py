@@ -0,0 +1,300 @@
+import os
+import struct
+import threading
+import time
+import zlib
+
+from organization_manager import OrganizationManager
+
+# Each segment starts with a header: magic and format version, so a journal in another layout is
+# rejected rather than misread.
+MAGIC = b"WWOJ"
+VERSION = 2     # Version 1 had no header and 16-bit name lengths
+SEGMENT_HEADER = struct.Struct("<4sB3x")
+
+# Record layout: payload length and CRC-32 of the payload, then the payload itself:
+# sequence number, command code, and each name as a length-prefixed UTF-8 string.
+# A TRANSACTION record holds a committed transaction (see OrganizationManager.transaction) whole:
+# for each of its commands, the command word and then its names, so it is replayed all or not at all.
+RECORD_HEADER = struct.Struct("<II")
+PAYLOAD_HEADER = struct.Struct("<QB")
+NAME_LENGTH = struct.Struct("<I")   # Names are not limited in length, so neither is the prefix
+
+COMMANDS = ["PRESIDENT"] + list(OrganizationManager.BATCH_COMMANDS) + ["TRANSACTION"]
+COMMAND_CODES = {command: code for code, command in enumerate(COMMANDS)}
+ARITY = {"PRESIDENT": 1, **{command: arity for command, (_, arity) in OrganizationManager.BATCH_COMMANDS.items()}}
+
+CHECKPOINT_PREFIX = "checkpoint-"
+SEGMENT_PREFIX = "journal-"
+
+
+def _file_name(prefix: str, sequence: int, suffix: str) -> str:
+    # Zero-padded so the directory listing sorts by sequence number
+    return f"{prefix}{sequence:016d}{suffix}"
+
+
+def _numbered(path: str, prefix: str, suffix: str) -> list:
+    # (sequence, file path) of every file named by _file_name, oldest first
+    found = []
+    for entry in os.listdir(path):
+        if entry.startswith(prefix) and entry.endswith(suffix):
+            number = entry[len(prefix):len(entry) - len(suffix)]
+            if number.isdigit():
+                found.append((int(number), os.path.join(path, entry)))
+    return sorted(found)
+
+
+def _sync_directory(path: str):
+    # Makes renames and new files in path durable
+    descriptor = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(descriptor)
+    finally:
+        os.close(descriptor)
+
+
+def _open_segment(path: str):
+    # Opens a segment for appending, writing the header first if it is new
+    segment = open(path, "ab")
+    if segment.tell() == 0:
+        segment.write(SEGMENT_HEADER.pack(MAGIC, VERSION))
+        segment.flush()
+        os.fsync(segment.fileno())
+    return segment
+
+
+def segment_start(data: bytes, name: str) -> int | None:
+    """
+    Offset of the first record of a segment, after its header; None if the header itself was cut
+    short by a crash. Raises ValueError if the segment has another magic or format version.
+    """
+    if len(data) < SEGMENT_HEADER.size:
+        return None
+    magic, version = SEGMENT_HEADER.unpack_from(data)
+    if magic != MAGIC:
+        raise ValueError(f"{name} is not a journal segment.")
+    if version != VERSION:
+        raise ValueError(f"{name} has unsupported journal version {version}.")
+    return SEGMENT_HEADER.size
+
+
+def encode_record(sequence: int, command: str, names) -> bytes:
+    if command == "TRANSACTION":
+        names = [word for step, step_names in names for word in (step, *step_names)]
+    parts = [PAYLOAD_HEADER.pack(sequence, COMMAND_CODES[command])]
+    for name in names:
+        encoded = name.encode("utf-8")
+        parts.append(NAME_LENGTH.pack(len(encoded)))
+        parts.append(encoded)
+    payload = b"".join(parts)
+    return RECORD_HEADER.pack(len(payload), zlib.crc32(payload)) + payload
+
+
+def read_records(data: bytes, position: int = 0):
+    """
+    Yields (sequence, command, names, end offset) for each intact record in data from position on.
+    The names of a TRANSACTION record are its (command, names) pairs.
+    Stops at the first record that is cut short or fails its checksum, which is where a crash
+    interrupted the last write; the end offset of the previous record is where the good data ends.
+    """
+    header_size = RECORD_HEADER.size
+    while position + header_size <= len(data):
+        length, checksum = RECORD_HEADER.unpack_from(data, position)
+        start = position + header_size
+        end = start + length
+        if end > len(data) or zlib.crc32(data[start:end]) != checksum:
+            return
+        sequence, code = PAYLOAD_HEADER.unpack_from(data, start)
+        command = COMMANDS[code]
+        names = []
+        offset = start + PAYLOAD_HEADER.size
+        count = None if command == "TRANSACTION" else ARITY[command]
+        while len(names) != count and offset < end:
+            (size,) = NAME_LENGTH.unpack_from(data, offset)
+            offset += NAME_LENGTH.size
+            names.append(data[offset:offset + size].decode("utf-8"))
+            offset += size
+        if command == "TRANSACTION":
+            words, names = iter(names), []
+            for step in words:
+                names.append((step, [next(words) for _ in range(ARITY[step])]))
+        yield sequence, command, names, end
+        position = end
+
+
+class Journal:
+    """
+    Write-ahead journal of an OrganizationManager, kept in a directory:
+      checkpoint-<seq>.bin - the organization after record <seq>, written with OrganizationManager.save()
+      journal-<seq>.log    - a header, then records from <seq> on, appended until the next checkpoint
+    Records are buffered and written with one fsync per group: once group_size records are waiting,
+    or group_delay seconds after the oldest unsynced one arrived, from a timer if no later record
+    comes along first, so a record is on disk that long after its change at most. sync() forces it.
+    Every checkpoint_every records the organization is checkpointed and a new segment started,
+    so recover() never replays more than that many records, unless save() refused the organization
+    (see OrganizationManager._check_tree): then the segment goes on until a checkpoint succeeds.
+    """
+
+    def __init__(self, path: str, group_size: int = 256, group_delay: float = 0.01, checkpoint_every: int = 100_000):
+        self.path = path
+        self.group_size = group_size
+        self.group_delay = group_delay
+        self.checkpoint_every = checkpoint_every
+        self.org = None
+        self.sequence = 0           # Sequence number of the last record handed to record()
+        self.synced = 0             # Last sequence number known to be on disk
+        self._pending = []
+        self._oldest_pending = 0.0
+        self._timer = None          # Syncs the pending group once group_delay is up
+        self._lock = threading.RLock()  # The timer syncs from a thread of its own
+        self._since_checkpoint = 0
+        self._segment = None
+
+    # ----- Setup -----
+
+    def attach(self, org: OrganizationManager):
+        # Starts journaling org in a new, empty directory. Its current state becomes checkpoint 0,
+        # so an organization save() refuses raises ValueError.
+        os.makedirs(self.path, exist_ok=True)
+        if _numbered(self.path, CHECKPOINT_PREFIX, ".bin") or _numbered(self.path, SEGMENT_PREFIX, ".log"):
+            raise ValueError(f"{self.path} already holds a journal; use recover() to continue it.")
+        self.org = org
+        self.checkpoint()
+        org._journal = self
+
+    def _resume(self, org: OrganizationManager, sequence: int, checkpointed: int, segment: str):
+        # Continues an existing journal after recover() replayed it up to sequence.
+        self.org = org
+        self.sequence = self.synced = sequence
+        self._since_checkpoint = sequence - checkpointed
+        self._segment = _open_segment(segment)
+        org._journal = self
+
+    # ----- Writing -----
+
+    def record(self, command: str, names):
+        with self._lock:
+            self.sequence += 1
+            if not self._pending:
+                self._oldest_pending = time.monotonic()
+            self._pending.append(encode_record(self.sequence, command, names))
+            if len(self._pending) >= self.group_size or time.monotonic() - self._oldest_pending >= self.group_delay:
+                self.sync()
+            elif self._timer is None:
+                self._timer = threading.Timer(self.group_delay, self.sync)
+                self._timer.start()
+            self._since_checkpoint += 1
+            if self._since_checkpoint >= self.checkpoint_every:
+                try:
+                    self.checkpoint()
+                except ValueError:
+                    # save() refused the organization (see OrganizationManager._check_tree); the segment
+                    # carries on, so recover() replays from the previous checkpoint. Try again later.
+                    self._since_checkpoint = 0
+
+    def sync(self):
+        # Writes every buffered record and waits for the disk.
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            if not self._pending or self._segment is None:
+                return
+            self._segment.write(b"".join(self._pending))
+            self._segment.flush()
+            os.fsync(self._segment.fileno())
+            self._pending.clear()
+            self.synced = self.sequence
+
+    def checkpoint(self):
+        # Saves the organization as of the last record, starts a new segment and
+        # deletes what the checkpoint makes redundant.
+        # Raises ValueError, and changes nothing on disk, if save() refuses the organization.
+        with self._lock:
+            self._checkpoint()
+
+    def _checkpoint(self):
+        if self._segment is not None:
+            self.sync()
+        checkpoint = os.path.join(self.path, _file_name(CHECKPOINT_PREFIX, self.sequence, ".bin"))
+        self.org.save(checkpoint)
+        with open(checkpoint, "rb") as file:
+            os.fsync(file.fileno())
+        if self._segment is not None:
+            self._segment.close()
+        segment = os.path.join(self.path, _file_name(SEGMENT_PREFIX, self.sequence + 1, ".log"))
+        self._segment = _open_segment(segment)
+        _sync_directory(self.path)
+        for sequence, old in _numbered(self.path, CHECKPOINT_PREFIX, ".bin"):
+            if sequence < self.sequence:
+                os.remove(old)
+        for sequence, old in _numbered(self.path, SEGMENT_PREFIX, ".log"):
+            if sequence <= self.sequence:
+                os.remove(old)
+        self._since_checkpoint = 0
+
+    def close(self):
+        # Syncs what is buffered and detaches from the organization.
+        with self._lock:
+            if self._segment is not None:
+                self.sync()
+                self._segment.close()
+                self._segment = None
+        if self.org is not None and self.org._journal is self:
+            self.org._journal = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def recover(path: str, echo: bool = True, manager: type = OrganizationManager, **options) -> OrganizationManager:
+    """
+    Rebuilds the organization journaled in path: loads the newest readable checkpoint into a
+    manager (an OrganizationManager subclass, such as ConcurrentOrganizationManager) and replays
+    the records after it. A record cut short by a crash ends the replay and is truncated away.
+    Returns the manager with a Journal (built with options) attached, so later changes keep being recorded.
+    Raises ValueError if a segment is not in this version's format (see segment_start).
+    """
+    org, base = None, 0
+    for sequence, checkpoint in reversed(_numbered(path, CHECKPOINT_PREFIX, ".bin")):
+        try:
+            org = manager.load(checkpoint, echo=False)
+        except (OSError, ValueError):
+            continue
+        base = sequence
+        break
+    if org is None:
+        raise ValueError(f"{path} has no readable checkpoint.")
+
+    segments = _numbered(path, SEGMENT_PREFIX, ".log")
+    last = base
+    for index, (_, segment) in enumerate(segments):
+        with open(segment, "rb") as file:
+            data = file.read()
+        start = segment_start(data, segment)
+        # A header cut short is truncated away like a torn record, and written again on reopening
+        good_end = 0 if start is None else start
+        records = () if start is None else read_records(data, start)
+        for sequence, command, names, end in records:
+            good_end = end
+            if sequence <= last:
+                continue
+            if sequence != last + 1:
+                raise ValueError(f"Journal record {last + 1} is missing from {path}.")
+            last = sequence
+            org._replay(command, names)
+        if good_end < len(data):
+            if index != len(segments) - 1:
+                raise ValueError(f"{segment} is damaged before the end of the journal.")
+            with open(segment, "r+b") as file:
+                file.truncate(good_end)
+                os.fsync(file.fileno())
+    # New records go after the last ones read; the next checkpoint deletes older segments
+    tail = segments[-1][1] if segments else os.path.join(path, _file_name(SEGMENT_PREFIX, last + 1, ".log"))
+
+    org.echo = echo
+    Journal(path, **options)._resume(org, last, base, tail)
+    return org
@@ -1,21 +1,120 @@
+import argparse
+import contextlib
+import sys
+
+from commands import COMMANDS, dispatch
 from organization_manager import OrganizationManager
+from records import read_records
+
+BUFFER_SIZE = 1 << 20   # Bytes read from a script and written to stdout at a time in batch mode
+
+def run_script(lines, org_manager=None):
+    """
+    Runs commands without prompts or banners: the first line is the President's name (unless
+    org_manager already has a President) and every later line a command, up to EXIT or the end of
+    lines. Prints what the interactive loop would print for the same input, minus its banners and
+    prompts; EXIT still prints its farewell line.
+    Returns the OrganizationManager.
+    """
+    if org_manager is None:
+        org_manager = OrganizationManager()
+    lines = iter(lines)
+    if org_manager.president is None:
+        for starting_name in lines:
+            org_manager.initialize_president(starting_name.rstrip("\r\n"))
+            break
+
+    for line in lines:
+        parts = line.split()
+        if not parts:
+            continue
+        if parts[0].upper() == "EXIT":
+            print("Exiting Wacky Widget HR System.")
+            break
+        try:
+            dispatch(org_manager, parts)
+        except Exception as e:
+            print(f"An unexpected error occurred: {e}")
+    return org_manager
+
+def buffered_stdout():
+    # A block-buffered writer on stdout's file descriptor, or stdout itself if it has none
+    try:
+        descriptor = sys.stdout.fileno()
+    except (AttributeError, OSError, ValueError):
+        return sys.stdout
+    sys.stdout.flush()
+    return open(descriptor, "w", buffering=BUFFER_SIZE, encoding=sys.stdout.encoding,
+                errors=sys.stdout.errors, closefd=False)
 
-def incorrect_argument_count(command):
-    print(f"Incorrect number of arguments for command {command}");
+def import_organization(path: str) -> OrganizationManager:
+    # The organization in an HRIS export (see records.read_records); exits listing the problems if it cannot be built
+    try:
+        return OrganizationManager.from_records(read_records(path))
+    except (OSError, ValueError) as e:
+        sys.exit(f"Cannot import {path}: {e}")
+
+def run_batch(script=None, org_manager=None):
+    # Runs the script file, or stdin when script is None, with all output going through one buffered writer
+    if script is None:
+        source = contextlib.nullcontext(sys.stdin)
+    else:
+        source = open(script, encoding="utf-8", buffering=BUFFER_SIZE)
+    output = buffered_stdout()
+    try:
+        with source as lines, contextlib.redirect_stdout(output):
+            run_script(lines, org_manager)
+    finally:
+        output.flush()
+
+def main(argv=()):
+    parser = argparse.ArgumentParser(description="Wacky Widget Company System")
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument("--script", metavar="FILE", help="run the commands in FILE without prompts")
+    mode.add_argument("--batch", action="store_true", help="run the commands on stdin without prompts")
+    mode.add_argument("--serve", metavar="ADDRESS",
+                      help="serve the line protocol on HOST:PORT, or on a Unix socket at unix:PATH")
+    parser.add_argument("--president", metavar="NAME",
+                        help="the President's name, required with --serve unless --import is given")
+    parser.add_argument("--import", dest="import_file", metavar="FILE",
+                        help="start from the organization in FILE (.csv, .json or .jsonl records of "
+                             "name, manager, role); scripts then start with a command, not a name")
+    options = parser.parse_args(argv)
+    if options.import_file is not None and options.president is not None:
+        parser.error("--president cannot be used with --import")
+    if options.serve is not None:
+        if options.import_file is None and options.president is None:
+            parser.error("--serve requires --president or --import")
+        from server import parse_address, serve
+        try:
+            parse_address(options.serve)
+        except ValueError as e:
+            parser.error(str(e))
+    org_manager = None if options.import_file is None else import_organization(options.import_file)
+    if options.script is not None or options.batch:
+        run_batch(options.script, org_manager)
+        return
+    if options.serve is not None:
+        if org_manager is None:
+            org_manager = OrganizationManager()
+            org_manager.initialize_president(options.president)
+        serve(org_manager, options.serve)
+        return
 
-def main():
-    org_manager = OrganizationManager()
-    
     print("Welcome to the Wacky Widget Company System.")
-    starting_name = input("Please enter the President's name to begin: ")
-    # All names should not contain spaces for simplicity
-    org_manager.initialize_president(starting_name)
+    if org_manager is None:
+        org_manager = OrganizationManager()
+        starting_name = input("Please enter the President's name to begin: ")
+        # All names should not contain spaces for simplicity
+        org_manager.initialize_president(starting_name)
+    else:
+        print(f"Imported {len(org_manager.employee_lookup)} employees under President {org_manager.president.name}.")
 
     print("\nWelcome to the Wacky Widget Company System.")
-    
+    available = ", ".join([*COMMANDS, "EXIT"])
 
     while True:
-        print("Available commands: HIRE, FIRE, QUIT, LAYOFF, TRANSFER, PROMOTE, DISPLAY, EXIT.")
+        print(f"Available commands: {available}.")
         try:
             user_input = input("\nEnter command: ").strip()
             if not user_input:
@@ -29,63 +128,10 @@ def main():
                 print("Exiting Wacky Widget HR System.")
                 break
 
-            if command == "HIRE":
-                if len(parts) != 3:
-                    incorrect_argument_count(command)
-                    print(f"Syntax should be: HIRE <ManagerName> <NewEmployeeName>")
-                    continue                
-                org_manager.hire_employee(parts[1], parts[2])
-            
-            elif command == "FIRE":
-                if len(parts) != 3:
-                    incorrect_argument_count(command)
-                    print(f"Syntax should be: FIRE <ManagerName> <EmployeeName>")
-                    continue
-                org_manager.fire_employee(parts[1], parts[2])
-                
-            elif command == "QUIT":
-                if len(parts) != 2:
-                    incorrect_argument_count(command)
-                    print(f"Syntax should be: QUIT <EmployeeName>")
-                    continue
-                org_manager.employee_quits(parts[1])
-
-            elif command == "LAYOFF":
-                if len(parts) != 3:
-                    incorrect_argument_count(command)
-                    print(f"Syntax should be: LAYOFF <ManagerName> <TargetEmployeeName>")
-                    continue
-                org_manager.layoff_employee(parts[1], parts[2])
-                
-            elif command == "TRANSFER":
-                if len(parts) != 4:
-                    incorrect_argument_count(command)
-                    print(f"Syntax should be: TRANSFER <InitiatorName> <EmployeeName> <NewManagerName>")
-                    continue
-                org_manager.transfer_employee(parts[1], parts[2], parts[3])
-
-            elif command == "PROMOTE":
-                if len(parts) != 3:
-                    incorrect_argument_count(command)
-                    print(f"Syntax should be: PROMOTE <ReceivingManagerName> <TargetEmployeeName>")
-                    continue
-                org_manager.promote_employee(parts[1], parts[2])
-
-
-            elif command == "DISPLAY":
-                if len(parts) != 1:
-                    incorrect_argument_count(command)
-                    print(f"Syntax should be: DISPLAY")
-                    continue
-                org_manager.display_organization()
-
-
-            else:
-                print(f"Error: Unknown command '{command}'.")
-
+            dispatch(org_manager, parts)
 
         except Exception as e:
             print(f"An unexpected error occurred: {e}")
             
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main(sys.argv[1:])
\ No newline at end of file
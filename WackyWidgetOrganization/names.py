@@ -0,0 +1,30 @@
+import sys
+from itertools import filterfalse
+
+
+class NameRegistry(dict):
+    """
+    The one map from employee name to Employee (OrganizationManager.employee_lookup).
+    A plain dict underneath, so an existence check and a lookup are the same single hash probe.
+    Names are interned as employees are added, so the lookup, the role index, results and
+    journal records all share one string object per employee.
+    """
+    __slots__ = ()
+
+    @staticmethod
+    def intern(name):
+        # sys.intern only takes exact str; anything else is stored as given
+        return sys.intern(name) if type(name) is str else name
+
+    def add(self, employee):
+        name = employee.name = self.intern(employee.name)
+        self[name] = employee
+        return employee
+
+    def missing(self, names) -> list:
+        # Names that are not registered, each once, in the order first seen
+        return list(filterfalse(self.__contains__, dict.fromkeys(names)))
+
+    def resolve(self, names) -> list:
+        # The Employee for each name, None where there is none
+        return list(map(self.get, names))
@@ -1,12 +1,87 @@
-from employee import Employee, Vacancy
+import contextlib
+import functools
+import gc
+import inspect
+import mmap
+import os
+import sys
+from collections import deque
+
+from employee import Employee, Vacancy, Tally, ReportList, NO_REPORTS, ROLE_CAPACITY, ROLE_LADDER, ROLE_RANK, cycle_error
+from results import ActionResult, Headcount
+from columnar_store import ColumnarOrg
+from names import NameRegistry
+from persistent import FrozenOrg, FrozenSpot
+import records
+
+UNDO_LIMIT = 1000       # Units keep_undo() keeps by default
+UNDO_CHANGES = 100_000  # Inverse steps keep_undo() keeps by default, across all units
+
+
+def _journaled(command: str):
+    # Records a call in the attached journal (see journal.py) and version history (see persistent.py),
+    # and publishes it to the change feed (see changes.py), once it has changed the organization; inside a transaction the record waits for the commit.
+    # While undo is kept, a call outside a transaction is a unit of its own on the undo stack.
+    # Calls that raise part way are recorded too: replaying them reproduces the same partial change.
+    def decorate(method):
+        signature = inspect.signature(method)
+
+        @functools.wraps(method)
+        def call(self, *names, **keywords):
+            if self._unit is None:
+                if self.undo_limit:
+                    with self._single_unit():
+                        return call(self, *names, **keywords)
+                if self._journal is None and self._history is None and self._feed is None:
+                    return method(self, *names, **keywords)
+            if keywords:
+                names = tuple(signature.bind(self, *names, **keywords).arguments.values())[1:]
+            try:
+                result = method(self, *names)
+            except Exception:
+                self._record(command, names)
+                raise
+            if result.ok:
+                self._record(command, names)
+            return result
+        return call
+    return decorate
+
 
 class OrganizationManager:
     _active = None 
 
-    def __init__(self):
+    # Commands apply_batch accepts: name -> (method, number of name arguments)
+    BATCH_COMMANDS = {
+        "HIRE": ("hire_employee", 2),
+        "FIRE": ("fire_employee", 2),
+        "QUIT": ("employee_quits", 1),
+        "LAYOFF": ("layoff_employee", 2),
+        "TRANSFER": ("transfer_employee", 3),
+        "PROMOTE": ("promote_employee", 2),
+    }
+
+    _store = None       # ColumnarOrg a loaded organization still lives in, until its objects are built
+
+    def __init__(self, echo: bool = True):
         self.president = None
-        self.all_names = set()      # Keeps names unique
-        self.employee_lookup = {}   # Dict for name to Employee object
+        self.echo = echo            # Print each result's message; callers that only read results turn it off
+        self._quiet = False         # True while apply_batch or redo runs commands, which print nothing
+        self.employee_lookup = NameRegistry()   # Name to Employee object; also what keeps names unique
+        self._tour_stamp = 0        # Generation of the ancestry index (see _rebuild_ancestry)
+        self._tour_current = False  # False once a subtree has moved since the last rebuild
+        self._tour_debt = 0         # Boss pointers walked since the last rebuild
+        self._journal = None        # Journal that successful changes are appended to, if attached
+        self._history = None        # VersionHistory that keeps a version after each change, if attached
+        self._feed = None           # ChangeFeed the changes are published to, if attached
+        self._unit = None           # (commands, inverse steps) of the open transaction, None outside one
+        self.undo_limit = 0         # Units kept for undo(), 0 while undo is not kept (see keep_undo)
+        self.undo_changes = UNDO_CHANGES
+        self._undo = deque()        # (commands, inverse steps) of committed units, newest last
+        self._undo_size = 0         # Inverse steps held in _undo
+        self._redo = []             # Commands of undone units, newest last
+        self._role_index = {}       # role -> {name: Employee} of everyone holding it
+        self._vacancy_index = {}    # role -> {Vacancy: None} of the vacancies left in that role
 
 
     # ----- Helper Methods -----
@@ -15,127 +90,615 @@ class OrganizationManager:
         # Tests expect names with spaces to be rejected
         return isinstance(name, str) and name != "" and (" " not in name)
 
+    def _report(self, result: ActionResult) -> ActionResult:
+        # Renders a result when echo is on. Every public method hands its result through here once.
+        if self.echo and not self._quiet:
+            print(result.message)
+        return result
+
+    def _fail(self, code: str, *names) -> ActionResult:
+        return self._report(ActionResult(code, names))
+
+    def _record(self, command: str, names):
+        # Appends a change to the attached journal and version history, or to the open transaction
+        if self._unit is not None:
+            self._unit[0].append((command, tuple(names)))
+            return
+        if self._journal is not None:
+            self._journal.record(command, names)
+        if self._history is not None:
+            self._history.record(command, names)
+        if self._feed is not None:
+            self._feed.publish()
+
+    def _log(self, inverse, *args):
+        # Notes, in the open transaction, the inverse step that undoes the change just made
+        if self._unit is not None:
+            self._unit[1].append((inverse, args))
+
+    def _touch(self, *spots):
+        # Call before spots join or leave the organization, or change boss or role (see changes.py)
+        if self._feed is not None:
+            self._feed.touch(spots)
+
+    @property
+    def all_names(self):
+        # Every employee name, as a live view of employee_lookup (no longer a set of its own)
+        return self.employee_lookup.keys()
+
     def _find_employee(self, name: str):
         # Utility to quickly find an employee object by name.
         return self.employee_lookup.get(name)
 
     def _determine_valid_role(self, manager: Employee) -> str:
-        # Determines the role of an employee based on the manager's role.
-        match manager.role:
-            case "President":
-                return "Vice President"
-            case "Vice President":
-                return "Supervisor"
-            case "Supervisor":
-                return "Worker"
-            case _:
-                return "Worker"
+        # Determines the role of an employee based on the manager's role (one rung down the ladder).
+        rank = ROLE_RANK.get(manager.role, len(ROLE_LADDER) - 1)
+        return ROLE_LADDER[min(rank + 1, len(ROLE_LADDER) - 1)]
 
-    def _add_employee(self, manager: Employee, new_employee_name: str):
+    def _add_employee(self, manager: Employee, new_employee_name: str) -> ActionResult:
         new_employee = Employee(
             name=new_employee_name,
             role=self._determine_valid_role(manager),
             boss=manager
         )
-        manager.reports.append(new_employee)
-        self.all_names.add(new_employee_name)
-        self.employee_lookup[new_employee_name] = new_employee
-        print(f"Successfully hired {new_employee_name} under {manager.name}.")
-
-    def _replace_vacancy_with_new_employee(self, manager: Employee, vacancy_index: int, new_employee_name: str):
+        self._touch(new_employee)
+        self.employee_lookup.add(new_employee)
+        manager.add_report(new_employee)
+        self._refresh_openings(manager)
+        self._retally(manager, 1, None, 1)
+        self._index(new_employee)
+        self._log(self._remove_employee, new_employee)
+        return ActionResult("hired", (new_employee_name, manager.name), manager.name, len(manager.reports) - 1)
+
+    def _replace_vacancy_with_new_employee(self, manager: Employee, vacancy_index: int, new_employee_name: str) -> ActionResult:
         vacancy = manager.reports[vacancy_index]
         vacancy_reports = vacancy.reports
         new_employee = Employee(name=new_employee_name, role=vacancy.role, boss=manager)
-        manager.reports[vacancy_index] = new_employee
+        self._touch(vacancy, new_employee, *vacancy_reports)
+        # The new employee inherits the vacancy's reports, so they now report to them
         new_employee.reports = vacancy_reports
-        self.all_names.add(new_employee_name)
-        self.employee_lookup[new_employee_name] = new_employee
-        print(f"Successfully placed {new_employee_name} under {manager.name}.")
+        for report in vacancy_reports:
+            report.boss = new_employee
+        new_employee.tour = vacancy.tour
+        new_employee.tally = vacancy.tally
+        manager.reports[vacancy_index] = new_employee
+        self._refresh_openings(manager)
+        self._retally(manager, 1, {vacancy.role: -1})
+        self._unindex(vacancy)
+        self.employee_lookup.add(new_employee)
+        self._index(new_employee)
+        self._log(self._restore_vacancy, new_employee, vacancy, vacancy_index)
+        return ActionResult("placed", (new_employee_name, manager.name), manager.name, vacancy_index)
+
+    def _rebuild_ancestry(self):
+        # Labels every node under the President with (stamp, enter, exit): enter is its
+        # preorder number and exit the largest preorder number in its subtree.
+        self._tour_stamp += 1
+        self._tour_current = True
+        self._tour_debt = 0
+        if self.president is None:
+            return
+        stamp = self._tour_stamp
+        stack = [(self.president, 0, iter(self.president.reports))]
+        counter = 1
+        while stack:
+            node, enter, children = stack[-1]
+            child = next(children, None)
+            if child is None:
+                stack.pop()
+                node.tour = (stamp, enter, counter - 1)
+            else:
+                stack.append((child, counter, iter(child.reports)))
+                counter += 1
 
     def _is_superior_to(self, manager: Employee, employee: Employee) -> bool:
         # Checks if the manager is in the employee's hierarchy (up the tree).
+        # Climbs boss pointers only until a node labeled by the ancestry index is reached,
+        # then compares enter/exit intervals. Nodes added since the last rebuild are not
+        # labeled yet; the index is rebuilt once the walking has cost as much as a rebuild.
+        if self._tour_debt > len(self.employee_lookup):
+            self._rebuild_ancestry()
+        stamp = self._tour_stamp if self._tour_current else None
         current_boss = employee.boss
         while current_boss is not None:
             if current_boss is manager:
                 return True
+            tour = current_boss.tour
+            if tour is not None and tour[0] == stamp:
+                outer = manager.tour
+                return outer is not None and outer[0] == stamp and outer[1] < tour[1] <= outer[2]
+            self._tour_debt += 1
             current_boss = current_boss.boss
         return False
 
-    def _display_loop(self, employee: Employee, level: int):
-        # Helper method to recursively display the organization hierarchy.
-        if not employee.reports:
+    def _display_lines(self, root: Employee, max_depth: int | None = None):
+        # Yields the hierarchy below root one line at a time, depth first, without recursing.
+        # The reports being walked at each level sit on a stack, so depth is not bounded by the recursion limit.
+        if max_depth is not None and max_depth <= 0:
             return
-
-        tab_indent = "\t" * level  # tests expect tabs, not spaces
-        for report in employee.reports:
+        stack = [(root, iter(root.reports))]
+        on_path = {id(root)}
+        indents = ["", "\t"]   # tests expect tabs, not spaces
+        while stack:
+            report = next(stack[-1][1], None)
+            if report is None:
+                on_path.discard(id(stack.pop()[0]))
+                continue
+            level = len(stack)
             if isinstance(report, Vacancy):
                 # EXACT string the tests look for
-                print(f"{tab_indent}VACANCY: {report.role}")
-                # Do not recurse into vacancy
-            else:
-                print(f"{tab_indent}{report.role}: {report.name}")
-                self._display_loop(report, level + 1)
-
-    def _replace_employee_with_vacancy(self, employee: Employee):
+                yield f"{indents[level]}VACANCY: {report.role}"
+                # Do not descend into vacancy
+                continue
+            yield f"{indents[level]}{report.role}: {report.name}"
+            if report.reports and (max_depth is None or level < max_depth):
+                if id(report) in on_path:
+                    raise cycle_error(report)
+                on_path.add(id(report))
+                stack.append((report, iter(report.reports)))
+                if len(indents) <= level + 1:
+                    indents.append("\t" * (level + 1))
+
+    def _replace_employee_with_vacancy(self, employee: Employee) -> int:
         # Replaces an employee with a vacancy, transferring reports to the vacancy.
         vacancy = Vacancy(role=employee.role, boss=employee.boss)
+        self._touch(vacancy, *employee.reports)
         employee_index = employee.boss.reports.index(employee)
-        employee.boss.reports[employee_index] = vacancy
         # Assign the reports to the vacancy
         for report in employee.reports:
             report.boss = vacancy
-            vacancy.reports.append(report)
+            vacancy.add_report(report)
+        vacancy.tour = employee.tour
+        vacancy.tally, employee.tally = employee.tally, None
+        employee.boss.reports[employee_index] = vacancy
+        self._refresh_openings(employee.boss)
+        self._retally(employee.boss, -1, {employee.role: 1})
+        self._index(vacancy)
+        self._log(self._restore_employee, vacancy, employee, employee_index)
+        return employee_index
 
-    def _remove_employee(self, employee: Employee):
+    def _remove_employee(self, employee: Employee) -> ActionResult:
         # Removes an employee from the organization.
         # Remove employee name from tracking structures
-        self.all_names.remove(employee.name)
+        self._touch(employee)
         del self.employee_lookup[employee.name]
+        self._unindex(employee)
+        self._log(self._rehire, employee)
 
         # If the target employee has no reports
         if len(employee.reports) == 0:
+            if self._unit is not None:
+                self._log(self._reinsert, employee, employee.boss, employee.boss.reports.index(employee), None)
             employee.boss.reports.remove(employee)
-            print(f"{employee.name} has been removed from the company.")
-        else:
-            # If the target employee has reports, leave a vacancy
-            self._replace_employee_with_vacancy(employee)
-            print(f"{employee.name} has been removed from the company. Vacancy remains.")
-
-    def _move_employee(self, employee: Employee, new_boss: Employee, replacement_index: int):
-        employee.boss.reports.remove(employee)
+            self._refresh_openings(employee.boss)
+            self._retally(employee.boss, 1, None, 1, sign=-1)
+            # The boss can be a vacancy, which has no name to report
+            return ActionResult("removed", (employee.name,), getattr(employee.boss, "name", None))
+        # If the target employee has reports, leave a vacancy
+        index = self._replace_employee_with_vacancy(employee)
+        return ActionResult("vacated", (employee.name,), getattr(employee.boss, "name", None), index)
+
+    def _move_employee(self, employee: Employee, new_boss: Employee, replacement_index: int) -> ActionResult:
+        old_boss = employee.boss
+        self._touch(employee)
+        if self._unit is not None:
+            self._log(self._reinsert, employee, old_boss, old_boss.reports.index(employee), None)
+        old_boss.reports.remove(employee)
+        self._refresh_openings(old_boss)
+        self._forget_ancestry(employee)
+        moved = self._contribution(employee)
+        self._retally(old_boss, *moved, sign=-1)
+        replaced = []
         if replacement_index == -1:
-            new_boss.reports.append(employee)
+            new_boss.add_report(employee)
+            replacement_index = len(new_boss.reports) - 1
         else:
+            replaced = new_boss.reports[replacement_index:replacement_index + 1]
+            self._touch(*replaced)
             new_boss.reports[replacement_index] = employee
+            if replaced:
+                if isinstance(replaced[0], Vacancy):
+                    self._unindex(replaced[0])
+                if replaced[0].reports:
+                    self._tour_current = False  # The replaced spot's reports are left behind
         employee.boss = new_boss
-        print(f"Successfully placed {employee.name} under {new_boss.name}.")
+        self._refresh_openings(new_boss)
+        # Attached before the replaced spot is detached, so heights recounted on the way up include employee
+        self._retally(new_boss, *moved)
+        if replaced:
+            self._retally(new_boss, *self._contribution(replaced[0]), sign=-1)
+        self._log(self._unplace, employee, new_boss, replacement_index, replaced[0] if replaced else None)
+        return ActionResult("placed", (employee.name, new_boss.name), new_boss.name, replacement_index)
+
+    def _promote_into_vacancy(self, target_employee: Employee, receiving_manager: Employee, idx: int) -> ActionResult:
+        # Move and promote
+        self._tour_current = False  # Subtrees change places
+        old_boss = target_employee.boss
+        self._touch(target_employee)
+        if target_employee.role != ROLE_LADDER[-1]:
+            self._replace_employee_with_vacancy(target_employee)
+        else:
+            if self._unit is not None:
+                self._log(self._reinsert, target_employee, old_boss, old_boss.reports.index(target_employee),
+                          (target_employee.reports, target_employee.tally))
+            moved = self._contribution(target_employee)
+            old_boss.reports.remove(target_employee)
+            self._refresh_openings(old_boss)
+            self._retally(old_boss, *moved, sign=-1)
+        target_employee.boss = receiving_manager
+        # The promoted employee takes over the vacancy and its reports
+        vacancy = receiving_manager.reports[idx]
+        self._touch(vacancy, *vacancy.reports)
+        self._log(self._unpromote, target_employee, (target_employee.role, target_employee.max_reports), vacancy, idx)
+        target_employee.reports = vacancy.reports
+        target_employee.tally = vacancy.tally
+        for report in target_employee.reports:
+            report.boss = target_employee
+        receiving_manager.reports[idx] = target_employee
+        self._unindex(target_employee)
+        target_employee.promote()
+        self._index(target_employee)
+        self._refresh_openings(target_employee)
+        self._refresh_openings(receiving_manager)
+        if isinstance(vacancy, Vacancy):
+            self._unindex(vacancy)
+            self._retally(receiving_manager, 1, {vacancy.role: -1})
+        else:
+            # A Worker removed from in front of the slot shifted it (known bug), so an employee was
+            # replaced; it stays tracked like other stranded spots
+            self._retally(receiving_manager, *self._contribution(target_employee))
+            self._retally(receiving_manager, *self._contribution(vacancy), sign=-1)
+        return ActionResult("promoted", (target_employee.name, receiving_manager.name), receiving_manager.name, idx)
+
+    def _promote_to_new_spot(self, target_employee: Employee, receiving_manager: Employee) -> ActionResult:
+        old_boss = target_employee.boss
+        self._touch(target_employee)
+        if self._unit is not None:
+            self._log(self._reinsert, target_employee, old_boss, old_boss.reports.index(target_employee), None)
+        old_boss.reports.remove(target_employee)
+        self._refresh_openings(old_boss)
+        self._forget_ancestry(target_employee)
+        moved = self._contribution(target_employee)
+        self._retally(old_boss, *moved, sign=-1)
+        target_employee.boss = receiving_manager
+        receiving_manager.add_report(target_employee)
+        previous = (target_employee.role, target_employee.max_reports)
+        self._unindex(target_employee)
+        target_employee.promote()
+        self._index(target_employee)
+        self._refresh_openings(target_employee)
+        self._refresh_openings(receiving_manager)
+        self._retally(receiving_manager, *moved)
+        self._log(self._unpromote, target_employee, previous, None, len(receiving_manager.reports) - 1)
+        return ActionResult("promoted", (target_employee.name, receiving_manager.name),
+                            receiving_manager.name, len(receiving_manager.reports) - 1)
+
+    def _thaw(self, spot):
+        # Drops the frozen copies of spot and the spots above it. Stops at the first spot without
+        # one: a spot is only frozen along with everything above it, so nothing further up has one.
+        while spot is not None and spot.frozen is not None:
+            spot.frozen = None
+            spot = spot.boss
+
+    def _freeze(self) -> FrozenSpot | None:
+        # FrozenSpot of the President. Spots whose frozen copy is still current are reused as they are,
+        # so only the spots changed since the last call are copied, reports before their bosses.
+        # Each copy builds its reports tuple and digest afresh, so a change costs the sum of the
+        # report counts along its path: O(depth x width). That is accepted, as the ladder keeps
+        # the depth small and ReportList inserts and deletes already cost O(width).
+        # Raises cycle_error on a reporting cycle.
+        president = self.president
+        if president is None or president.frozen is not None:
+            return None if president is None else president.frozen
+        stack = [(president, iter(president.reports))]
+        on_path = {id(president)}
+        while stack:
+            node, children = stack[-1]
+            child = next(children, None)
+            if child is None:
+                stack.pop()
+                on_path.discard(id(node))
+                node.frozen = FrozenSpot.of(getattr(node, "name", None), node.role, node.max_reports,
+                                            tuple(report.frozen for report in node.reports))
+            elif child.frozen is None:
+                if id(child) in on_path:
+                    raise cycle_error(child)
+                on_path.add(id(child))
+                stack.append((child, iter(child.reports)))
+        return president.frozen
+
+    def _forget_ancestry(self, employee: Employee):
+        # Call when an employee leaves its spot. A moving leaf just loses its label; a moving
+        # subtree invalidates the whole ancestry index until the next rebuild.
+        if employee.reports:
+            self._tour_current = False
+        employee.tour = None
+
+    @staticmethod
+    def _contribution(spot) -> tuple:
+        # (employees, vacancies by role, levels) that spot and everything below it add to the tallies above.
+        # The vacancies dict may be the spot's own; callers only read it.
+        tally = spot.tally
+        if tally is None:
+            employees, vacancies, levels = 0, None, 1
+        else:
+            employees, vacancies, levels = tally.employees, tally.vacancies, tally.height + 1
+        if isinstance(spot, Vacancy):
+            vacancies = dict(vacancies) if vacancies else {}
+            vacancies[spot.role] = vacancies.get(spot.role, 0) + 1
+        else:
+            employees += 1
+        return employees, vacancies, levels
+
+    def _retally(self, spot, employees: int = 0, vacancies: dict | None = None, levels: int | None = None, sign: int = 1):
+        # Call after spot's reports change. Adds employees and vacancies (role -> count), times sign,
+        # to the Tally of spot and of every spot above it. levels is the height plus one of a subtree
+        # attached (sign 1) or detached (sign -1) under spot, or None if no subtree came or went.
+        # Follows boss pointers up to the first spot its boss does not list as a report, and a
+        # reporting cycle (see cycle_error) ends the walk where it closes.
+        employees *= sign
+        # Level of a report of node before and after, None while it is not there
+        change = None if levels is None else ((None, levels) if sign > 0 else (levels, None))
+        node = spot
+        steps, seen = 0, None
+        while node is not None:
+            tally = node.tally
+            if tally is None:
+                tally = node.tally = Tally()
+            tally.employees += employees
+            if vacancies:
+                counts = tally.vacancies if tally.vacancies is not None else {}
+                for role, count in vacancies.items():
+                    count = counts.get(role, 0) + count * sign
+                    if count:
+                        counts[role] = count
+                    else:
+                        counts.pop(role, None)
+                tally.vacancies = counts or None
+            if change is not None:
+                counts = tally.levels
+                before, after = change
+                if before is not None:
+                    left = counts.get(before, 0) - 1
+                    if left > 0:
+                        counts[before] = left
+                    else:
+                        counts.pop(before, None)
+                if after is not None:
+                    counts[after] = counts.get(after, 0) + 1
+                height = tally.height
+                tally.height = max(counts, default=0)
+                # What the boss sees change: node's own level, one more than its height
+                change = None if tally.height == height else (height + 1, tally.height + 1)
+            elif not employees and not vacancies:
+                return
+            boss = node.boss
+            if boss is not None and not boss.reports.holds(node):
+                return      # Stranded (see _promote_into_vacancy); its counts never reached the tree above
+            node = boss
+            steps += 1
+            if steps > 64:
+                # Deeper than any sound organization; start watching for a cycle
+                if seen is None:
+                    seen = set()
+                if id(node) in seen:
+                    return
+                seen.add(id(node))
+
+    def _recount(self):
+        # Builds every Tally under the President from scratch, reports before their bosses
+        if self.president is None:
+            return
+        order = []
+        stack = [self.president]
+        while stack:
+            node = stack.pop()
+            order.append(node)
+            stack.extend(node.reports)
+        for node in reversed(order):
+            node.tally = None
+            if node.reports:
+                tally = node.tally = Tally()
+                counts = {}
+                for report in node.reports:
+                    employees, vacancies, levels = self._contribution(report)
+                    tally.employees += employees
+                    for role, count in (vacancies or {}).items():
+                        counts[role] = counts.get(role, 0) + count
+                    tally.levels[levels] = tally.levels.get(levels, 0) + 1
+                tally.height = max(tally.levels, default=0)
+                tally.vacancies = counts or None
+
+    def _index(self, spot):
+        # Files a spot that joined the organization in the role or vacancy index
+        if isinstance(spot, Vacancy):
+            self._vacancy_index.setdefault(spot.role, {})[spot] = None
+        else:
+            self._role_index.setdefault(spot.role, {})[spot.name] = spot
+
+    def _unindex(self, spot):
+        # Call before a spot leaves the organization or an employee changes role
+        if isinstance(spot, Vacancy):
+            self._vacancy_index.get(spot.role, {}).pop(spot, None)
+        else:
+            self._role_index.get(spot.role, {}).pop(spot.name, None)
+
+    def _reindex(self):
+        # Builds both indexes from scratch: everyone tracked, and the vacancies under the President
+        self._role_index = {}
+        self._vacancy_index = {}
+        for person in self.employee_lookup.values():
+            self._index(person)
+        stack = [self.president] if self.president is not None else []
+        while stack:
+            node = stack.pop()
+            if isinstance(node, Vacancy):
+                self._index(node)
+            stack.extend(node.reports)
+
+    def _below(self, boss: Employee, candidates, matches) -> list:
+        # The candidates (a sized collection of spots) anywhere below boss. Walks boss's subtree when it is smaller than the
+        # candidate list (its size comes from the tallies), otherwise asks the ancestry index about each.
+        tally = boss.tally
+        size = 0 if tally is None else tally.employees + sum((tally.vacancies or {}).values())
+        if size < len(candidates):
+            found = []
+            stack = list(boss.reports)
+            visited = 0
+            while stack and visited <= size:
+                node = stack.pop()
+                visited += 1
+                if matches(node):
+                    found.append(node)
+                stack.extend(node.reports)
+            if visited <= size:
+                return found
+            # More below than the tallies say: a reporting cycle, so fall back to the index
+        return [node for node in candidates if self._is_superior_to(boss, node)]
+
+    # ----- Inverse steps (see transaction) -----
+    # Each undoes one change noted with _log, assuming every change made after it is already undone.
+
+    def _hand_back(self, spot, previous, index: int):
+        # Puts previous back in the slot spot took over from it, with the reports, tally and label spot took too
+        boss = spot.boss
+        previous.reports, previous.tally, previous.tour = spot.reports, spot.tally, spot.tour
+        spot.reports, spot.tally = NO_REPORTS, None
+        for report in previous.reports:
+            report.boss = previous
+        previous.boss, previous.frozen = boss, None
+        boss.reports[index] = previous
+        self._refresh_openings(boss)
+
+    def _restore_vacancy(self, employee: Employee, vacancy: Vacancy, index: int):
+        # Undoes _replace_vacancy_with_new_employee
+        self._hand_back(employee, vacancy, index)
+        self._retally(vacancy.boss, -1, {vacancy.role: 1})
+        del self.employee_lookup[employee.name]
+        self._unindex(employee)
+        self._index(vacancy)
+
+    def _restore_employee(self, vacancy: Vacancy, employee: Employee, index: int):
+        # Undoes _replace_employee_with_vacancy
+        self._hand_back(vacancy, employee, index)
+        self._retally(employee.boss, 1, {vacancy.role: -1})
+        self._unindex(vacancy)
+
+    def _rehire(self, employee: Employee):
+        # Undoes the part of _remove_employee that forgets the name
+        self.employee_lookup.add(employee)
+        self._index(employee)
+
+    def _reinsert(self, employee: Employee, boss, index: int, detached: tuple | None):
+        # Undoes taking employee out of boss's reports at index. detached is the (reports, tally)
+        # employee had then, if it gave them up afterwards.
+        if detached is not None:
+            employee.reports, employee.tally = detached
+        employee.boss = boss
+        employee.frozen = None
+        boss.insert_report(index, employee)
+        self._refresh_openings(boss)
+        self._forget_ancestry(employee)
+        self._retally(boss, *self._contribution(employee))
+
+    def _unplace(self, employee: Employee, boss: Employee, index: int, replaced):
+        # Undoes placing employee at index of boss's reports, in place of replaced if it took a spot over
+        moved = self._contribution(employee)
+        if replaced is None:
+            del boss.reports[index]
+        else:
+            boss.reports[index] = replaced
+            replaced.frozen = None
+            if isinstance(replaced, Vacancy):
+                self._index(replaced)
+            if replaced.reports:
+                self._tour_current = False
+        self._refresh_openings(boss)
+        # Attached before employee is detached, so heights recounted on the way up include replaced
+        if replaced is not None:
+            self._retally(boss, *self._contribution(replaced))
+        self._retally(boss, *moved, sign=-1)
+
+    def _unpromote(self, employee: Employee, previous: tuple, replaced, index: int):
+        # Undoes promoting employee from previous (role, max_reports) into index of its boss's reports,
+        # in place of replaced if it took a spot over. Leaves employee out of the tree until it is put back.
+        boss = employee.boss
+        self._tour_current = False
+        if replaced is None:
+            moved = self._contribution(employee)
+            del boss.reports[index]
+            self._refresh_openings(boss)
+            self._retally(boss, *moved, sign=-1)
+        elif isinstance(replaced, Vacancy):
+            self._hand_back(employee, replaced, index)
+            self._retally(boss, -1, {replaced.role: 1})
+            self._index(replaced)
+        else:
+            # The spot of an employee taken over (see _promote_into_vacancy)
+            moved = self._contribution(employee)
+            self._hand_back(employee, replaced, index)
+            self._retally(boss, *self._contribution(replaced))
+            self._retally(boss, *moved, sign=-1)
+        self._unindex(employee)
+        employee.role, employee.max_reports = previous
+        self._index(employee)
+
+    def _clear_president(self, president: Employee):
+        # Undoes initialize_president
+        self.president = None
+        del self.employee_lookup[president.name]
+        self._unindex(president)
 
     def _check_vancancy_objects(self, manager: Employee) -> int:
-        # Checks for Vacancy objects under a manager and returns the first index if found, -1 otherwise.
-        for index, report in enumerate(manager.reports):
-            if isinstance(report, Vacancy):
-                return index
-        return -1
+        # Returns the first Vacancy index under a manager, -1 otherwise.
+        # The reports list keeps its vacancy slots indexed, so this does not scan.
+        return manager.reports.first_vacancy()
 
     def _has_spots(self, manager: Employee):
         # Checks if a manager has availability for new reports.
         # Returns True if open empty slot, index of Vacancy if found, or False if full.
-        if len(manager.reports) < manager.max_reports:
+        reports = manager.reports
+        if len(reports) < manager.max_reports:
             return True
-        index = self._check_vancancy_objects(manager)
-        if index != -1:
-            return index
+        if reports.vacancy_slots:
+            return reports.vacancy_slots[0]
         return False
 
+    def _refresh_openings(self, manager: Employee):
+        # Call after a manager's reports or capacity change. Re-files the manager in its
+        # boss's opening index, and the boss in the grand-boss's index if that flipped.
+        # The frozen copies of the manager and of everything above it are out of date too.
+        self._thaw(manager)
+        boss = manager.boss
+        if boss is None:
+            return
+        had_openings = bool(boss.reports.open_slots)
+        boss.reports.refresh(manager)
+        if boss.boss is not None and bool(boss.reports.open_slots) != had_openings:
+            boss.boss.reports.refresh(boss)
+
+    def _opening_in(self, reports, skip=None):
+        # First report, in list order, that has room for a report of its own (other than skip).
+        # Returns (index, manager) like _find_opening, or (None, None).
+        for slot in reports.open_slots:
+            report = reports[slot]
+            if report is not skip:
+                result = self._has_spots(report)
+                return (-1 if result is True else result), report
+        return None, None
+
     def _find_opening(self, manager: Employee, role: str):
-        match role:
-            case "Worker":
-                return self._find_worker_opening(manager)
-            case "Supervisor":
-                return self._find_super_opening(manager)
-            case "Vice President":
+        # Rung 1 (Vice President) only looks at its own boss, rung 2 (Supervisor) also at the
+        # boss's peers, and every lower rung (Worker) also at the boss's cousins.
+        match ROLE_RANK.get(role, 0):
+            case 0:
+                return None, None
+            case 1:
                 return self._find_vp_opening(manager)
-        return None, None
+            case 2:
+                return self._find_super_opening(manager)
+            case _:
+                return self._find_worker_opening(manager)
 
     def _find_worker_opening(self, supervisor: Employee):
         # Checks for worker openings in the company
@@ -147,23 +710,16 @@ class OrganizationManager:
             return result, supervisor
 
         # 2) other Supervisors under same VP
-        for report in supervisor.boss.reports:
-            if report is not supervisor:
-                result = self._has_spots(report)
-                if result is True:
-                    return -1, report
-                elif result is not False:
-                    return result, report
+        index, report = self._opening_in(supervisor.boss.reports, skip=supervisor)
+        if report is not None:
+            return index, report
 
         # 3) Supervisors under other VPs
-        for vp in supervisor.boss.boss.reports:
+        vps = supervisor.boss.boss.reports
+        for slot in vps.open_below:
+            vp = vps[slot]
             if vp is not supervisor.boss:
-                for report in vp.reports:
-                    result = self._has_spots(report)
-                    if result is True:
-                        return -1, report
-                    elif result is not False:
-                        return result, report
+                return self._opening_in(vp.reports)
 
         return None, None
 
@@ -176,15 +732,7 @@ class OrganizationManager:
             return result, vp
 
         # 2) other VPs under the President
-        for report in vp.boss.reports:
-            if report is not vp:
-                result = self._has_spots(report)
-                if result is True:
-                    return -1, report
-                elif result is not False:
-                    return result, report
-
-        return None, None
+        return self._opening_in(vp.boss.reports, skip=vp)
 
     def _find_vp_opening(self, president: Employee):
         result = self._has_spots(president)
@@ -216,234 +764,690 @@ class OrganizationManager:
 
         # name validation
         if not self._valid_name(actual_name):
-            print("Error: Invalid name.")
+            self._fail("invalid_name")
             return False
 
         # One president only
         if self.president is not None:
             return False
-        president = Employee(name=name, role="President", boss=None)
-        self.president = president
-        self.all_names.add(name)
-        self.employee_lookup[name] = president
-        # keep class-level attr aligned for tests that read OrganizationManager.president
-        OrganizationManager.president = self.president
-        print(f"Success: Initialized President {name}.")
+        # While undo is kept, a unit of its own like the other commands
+        with self._single_unit() if self._unit is None and self.undo_limit else contextlib.nullcontext():
+            president = Employee(name=name, role=ROLE_LADDER[0], boss=None)
+            self._touch(president)
+            self.president = president
+            self.employee_lookup.add(president)
+            self._index(president)
+            self._log(self._clear_president, president)
+            self._record("PRESIDENT", (name,))
+        self._report(ActionResult("initialized", (name,)))
         return True
 
-    def hire_employee(self, hiring_manager_name: str, new_employee_name: str):
+    @_journaled("HIRE")
+    def hire_employee(self, hiring_manager_name: str, new_employee_name: str) -> ActionResult:
         # Hires a new employee under a specific manager (Requirement 3).
         # Validate new name
         if not self._valid_name(new_employee_name):
-            print("Error: Invalid name.")
-            return
+            return self._fail("invalid_name")
 
         # Checks if names exist
-        if hiring_manager_name not in self.all_names:
-            print(f"Error: Hiring manager {hiring_manager_name} does not exist.")
-            return
-        if new_employee_name in self.all_names:
-            print(f"Error: Employee name {new_employee_name} already exists.")
-            return
-
-        hiring_manager = self._find_employee(hiring_manager_name)
+        lookup = self.employee_lookup
+        hiring_manager = lookup.get(hiring_manager_name)
+        if hiring_manager is None:
+            return self._fail("unknown_hiring_manager", hiring_manager_name)
+        if new_employee_name in lookup:
+            return self._fail("name_taken", new_employee_name)
 
         # Checks if hiring manager can hire
-        if hiring_manager.role == "Worker":
-            print(f"Error: A worker cannot hire employees.")
-            return
+        if hiring_manager.role == ROLE_LADDER[-1]:
+            return self._fail("worker_cannot_hire")
 
         result = self._has_spots(hiring_manager)
         # Checks if there is an open spot
         if result is False:
-            print(f"Error: Hiring manager {hiring_manager_name} has reached maximum direct reports.")
-            return
+            return self._fail("hiring_manager_full", hiring_manager_name)
 
         # Replace empty spot with new employee
         if result is True:
-            self._add_employee(hiring_manager, new_employee_name)
-        else:
-            # Replace Vacancy object with new employee
-            self._replace_vacancy_with_new_employee(hiring_manager, result, new_employee_name)
-        return
+            return self._report(self._add_employee(hiring_manager, new_employee_name))
+        # Replace Vacancy object with new employee
+        return self._report(self._replace_vacancy_with_new_employee(hiring_manager, result, new_employee_name))
 
-    def fire_employee(self, firing_manager_name: str, target_employee_name: str):
+    @_journaled("FIRE")
+    def fire_employee(self, firing_manager_name: str, target_employee_name: str) -> ActionResult:
         # Removes an employee, leaving a vacancy. Firing manager must be in target's hierarchy (Requirement 4).
         if self.president is None:
-            print("Error: No president initialized.")
-            return
+            return self._fail("no_president")
         if target_employee_name == self.president.name:
-            print("Error: Cannot fire the President.")
-            return
-        if firing_manager_name not in self.all_names:
-            print(f"Error: Firing manager {firing_manager_name} does not exist.")
-            return
-        if target_employee_name not in self.all_names:
-            print(f"Error: Employee name {target_employee_name} does not exist.")
-            return
-
-        firing_manager = self._find_employee(firing_manager_name)
-        target_employee = self._find_employee(target_employee_name)
+            return self._fail("cannot_fire_president")
+        lookup = self.employee_lookup
+        firing_manager = lookup.get(firing_manager_name)
+        if firing_manager is None:
+            return self._fail("unknown_firing_manager", firing_manager_name)
+        target_employee = lookup.get(target_employee_name)
+        if target_employee is None:
+            return self._fail("unknown_employee", target_employee_name)
 
         if not self._is_superior_to(firing_manager, target_employee):
-            print(f"Error: {firing_manager_name} is not in the hierarchy of {target_employee_name}.")
-            return
+            return self._fail("not_in_hierarchy", firing_manager_name, target_employee_name)
 
-        self._remove_employee(target_employee)
-        return
+        return self._report(self._remove_employee(target_employee))
 
-    def employee_quits(self, employee_name: str):
+    @_journaled("QUIT")
+    def employee_quits(self, employee_name: str) -> ActionResult:
         # An employee quits. Vacancy remains. President cannot quit. (Requirement 5)
         if self.president is None:
-            print("Error: No president initialized.")
-            return
+            return self._fail("no_president")
         if employee_name == self.president.name:
-            print("Error: President cannot quit.")
-            return
-        if employee_name not in self.all_names:
-            print(f"Error: Employee name {employee_name} does not exist.")
-            return
+            return self._fail("president_cannot_quit")
+        employee = self.employee_lookup.get(employee_name)
+        if employee is None:
+            return self._fail("unknown_employee", employee_name)
 
-        self._remove_employee(self._find_employee(employee_name))
-        return
+        return self._report(self._remove_employee(employee))
 
-    def layoff_employee(self, manager_name: str, target_employee_name: str):
+    @_journaled("LAYOFF")
+    def layoff_employee(self, manager_name: str, target_employee_name: str) -> ActionResult:
         # Lays off an employee. Attempts to transfer them to the closest comparable opening (Requirement 6).
         if self.president is None:
-            print("Error: No president initialized.")
-            return
+            return self._fail("no_president")
         if target_employee_name == self.president.name:
-            print("Error: Cannot lay off the President.")
-            return
-        if manager_name not in self.all_names:
-            print(f"Error: Manager {manager_name} does not exist.")
-            return
-        if target_employee_name not in self.all_names:
-            print(f"Error: Employee name {target_employee_name} does not exist.")
-            return
-
-        manager = self._find_employee(manager_name)
-        target_employee = self._find_employee(target_employee_name)
+            return self._fail("cannot_lay_off_president")
+        lookup = self.employee_lookup
+        manager = lookup.get(manager_name)
+        if manager is None:
+            return self._fail("unknown_manager", manager_name)
+        target_employee = lookup.get(target_employee_name)
+        if target_employee is None:
+            return self._fail("unknown_employee", target_employee_name)
 
         if not self._is_superior_to(manager, target_employee):
-            print(f"Error: {manager_name} is not in the hierarchy of {target_employee_name}.")
-            return
+            return self._fail("not_in_hierarchy", manager_name, target_employee_name)
 
         index, new_boss = self._find_opening(target_employee.boss, target_employee.role)
 
         if index is None:
-            print("No comparable openings found")
-            self._remove_employee(target_employee)
-            print("Done")
-            return
+            if self.echo and not self._quiet:
+                print("No comparable openings found")
+            removed = self._remove_employee(target_employee)
+            code = "laid_off" if removed.code == "removed" else "laid_off_vacated"
+            return self._report(removed._replace(code=code))
 
-        self._move_employee(target_employee, new_boss, index)
-        return
+        return self._report(self._move_employee(target_employee, new_boss, index))
 
-    def transfer_employee(self, initiator_name: str, employee_name: str, destination_manager_name: str):
+    @_journaled("TRANSFER")
+    def transfer_employee(self, initiator_name: str, employee_name: str, destination_manager_name: str) -> ActionResult:
         # Transfers an employee to the same level. Initiator must manage both spots, and destination must be vacant (Requirement 7).
-        if initiator_name not in self.all_names:
-            print(f"Error: Initiator {initiator_name} does not exist.")
-            return
-        if employee_name not in self.all_names:
-            print(f"Error: Employee name {employee_name} does not exist.")
-            return
-        if destination_manager_name not in self.all_names:
-            print(f"Error: Destination manager {destination_manager_name} does not exist.")
-            return
-
-        initiator = self._find_employee(initiator_name)
+        lookup = self.employee_lookup
+        initiator = lookup.get(initiator_name)
+        if initiator is None:
+            return self._fail("unknown_initiator", initiator_name)
+        employee = lookup.get(employee_name)
+        if employee is None:
+            return self._fail("unknown_employee", employee_name)
+        destination_manager = lookup.get(destination_manager_name)
+        if destination_manager is None:
+            return self._fail("unknown_destination", destination_manager_name)
+
+        # Only roles with at least two rungs below them (President, Vice President) can transfer
+        if ROLE_RANK[initiator.role] > len(ROLE_LADDER) - 3:
+            return self._fail("cannot_transfer", initiator_name)
 
-        if initiator.role not in ["President", "Vice President"]:
-            print(f"Error: Initiator {initiator_name} does not have permission to transfer employees.")
-            return
-
-        employee = self._find_employee(employee_name)
         if not self._is_superior_to(initiator, employee):
-            print(f"Error: {initiator_name} does not manage {employee_name}.")
-            return
+            return self._fail("not_managed", initiator_name, employee_name)
 
-        destination_manager = self._find_employee(destination_manager_name)
         if not self._is_superior_to(initiator, destination_manager) and initiator != destination_manager:
-            print(f"Error: {initiator_name} does not manage {destination_manager_name}.")
-            return
+            return self._fail("not_managed", initiator_name, destination_manager_name)
 
         if employee.role != self._determine_valid_role(destination_manager):
-            print(f"Error: Employee {employee_name} cannot be transferred to {destination_manager_name} due to role mismatch.")
-            return
+            return self._fail("role_mismatch", employee_name, destination_manager_name)
 
         if not self._has_spots(destination_manager):
-            print(f"Error: Destination manager {destination_manager_name} has reached maximum direct reports.")
-            return
+            return self._fail("destination_full", destination_manager_name)
 
         replacement_index = self._check_vancancy_objects(destination_manager)
-        self._move_employee(employee, destination_manager, replacement_index)
-        return
+        return self._report(self._move_employee(employee, destination_manager, replacement_index))
 
-    def promote_employee(self, receiving_manager_name: str, target_employee_name: str):
+    @_journaled("PROMOTE")
+    def promote_employee(self, receiving_manager_name: str, target_employee_name: str) -> ActionResult:
         # Promotes an employee one level to a vacancy under a manager (Requirement 8).
-        if receiving_manager_name not in self.all_names:
-            print(f"Error: Receiving manager {receiving_manager_name} does not exist.")
-            return
-        if target_employee_name not in self.all_names:
-            print(f"Error: Employee name {target_employee_name} does not exist.")
-            return
-
-        receiving_manager = self._find_employee(receiving_manager_name)
-        target_employee = self._find_employee(target_employee_name)
+        lookup = self.employee_lookup
+        receiving_manager = lookup.get(receiving_manager_name)
+        if receiving_manager is None:
+            return self._fail("unknown_receiving_manager", receiving_manager_name)
+        target_employee = lookup.get(target_employee_name)
+        if target_employee is None:
+            return self._fail("unknown_employee", target_employee_name)
 
         # Not promotable beyond VP
-        if target_employee.role in ("Vice President", "President"):
-            print(f"Error: {target_employee_name} cannot be promoted further.")
-            return
+        if ROLE_RANK[target_employee.role] <= 1:
+            return self._fail("cannot_promote_further", target_employee_name)
 
         # Workers/Supervisors cannot be the receiving manager
-        if receiving_manager.role in ("Worker", "Supervisor"):
-            print(f"Error: {receiving_manager_name} cannot promote employees.")
-            return
+        if ROLE_RANK[receiving_manager.role] >= len(ROLE_LADDER) - 2:
+            return self._fail("cannot_promote", receiving_manager_name)
 
         # President cannot promote Workers (would be two levels)
-        if receiving_manager.role == "President" and target_employee.role == "Worker":
-            print("Error: Promotions can only be one level.")
-            return
+        if ROLE_RANK[target_employee.role] - ROLE_RANK[receiving_manager.role] > 2:
+            return self._fail("one_level_only")
         
         
 
         # receiving manager must have a spot
         result = self._has_spots(receiving_manager)
         if result is False:
-            print(f"Error: Receiving manager {receiving_manager_name} has reached maximum direct reports.")
-            return
+            return self._fail("receiving_manager_full", receiving_manager_name)
 
         # If there is a vacancy under receiving_manager that the target would not become boss of current peers
-        for idx, report in enumerate(receiving_manager.reports):
-            if isinstance(report, Vacancy) and (target_employee not in report.reports):
-                # Move and promote
-                if target_employee.role != "Worker":
-                    self._replace_employee_with_vacancy(target_employee)
-                else:
-                    target_employee.boss.reports.remove(target_employee)
-                target_employee.boss = receiving_manager
-                target_employee.reports = receiving_manager.reports[idx].reports
-                receiving_manager.reports[idx] = target_employee
-                target_employee.promote()
-                print(f"Successfully promoted {target_employee_name} under {receiving_manager_name}.")
-                return
+        for idx in receiving_manager.reports.vacancy_slots:
+            report = receiving_manager.reports[idx]
+            if target_employee not in report.reports:
+                return self._report(self._promote_into_vacancy(target_employee, receiving_manager, idx))
 
         # Otherwise, normal addition (no specific vacancy node needed)
-        target_employee.boss.reports.remove(target_employee)
-        target_employee.boss = receiving_manager
-        receiving_manager.reports.append(target_employee)
-        target_employee.promote()
-        print(f"Successfully promoted {target_employee_name} under {receiving_manager_name}.")
-        return
+        return self._report(self._promote_to_new_spot(target_employee, receiving_manager))
+
+    def apply_batch(self, commands) -> list:
+        """
+        Applies parsed operations in order, e.g. [("HIRE", "Alice", "Bob"), ("QUIT", "Bob")].
+        Nothing is printed. Returns the ActionResult of each operation.
+        The whole batch is checked first: if any operation has an unknown command or the wrong number of
+        names, ValueError lists every bad one and the organization is left untouched.
+        """
+        operations = []
+        problems = []
+        for position, parts in enumerate(commands):
+            command = parts[0].upper() if parts and isinstance(parts[0], str) else None
+            spec = self.BATCH_COMMANDS.get(command)
+            if spec is None:
+                problems.append(f"#{position}: unknown command {parts[0] if parts else ''!r}")
+            elif len(parts) != spec[1] + 1:
+                problems.append(f"#{position}: {command} takes {spec[1]} names, got {len(parts) - 1}")
+            elif not all(isinstance(name, str) for name in parts[1:]):
+                problems.append(f"#{position}: {command} names must be strings")
+            else:
+                operations.append((getattr(self, spec[0]), parts[1:]))
+        if problems:
+            raise ValueError("Batch rejected, nothing was applied:\n" + "\n".join(problems))
+
+        results = []
+        append = results.append
+        quiet, self._quiet = self._quiet, True
+        try:
+            for method, names in operations:
+                try:
+                    append(method(*names))
+                except Exception as e:
+                    append(ActionResult("unexpected_error", (str(e),)))
+        finally:
+            self._quiet = quiet
+        return results
+
+    # ----- Transactions and undo -----
+
+    @contextlib.contextmanager
+    def transaction(self):
+        """
+        Makes the changes inside the with block one unit:
+          - If the block raises, every change made in it is undone, newest first, and the exception
+            propagates. The inverse of each change is noted as it is made, so rolling back costs as
+            much as the changes did; nothing is copied up front.
+          - Otherwise the unit commits. Its commands reach the journal as one record and the version
+            history as one version only now, and while undo is kept it is one step for undo().
+        A transaction opened inside another is a savepoint: if its block raises, only its own
+        changes are undone, and the outer transaction carries on. Changes made after a reporting
+        cycle closed (see employee.cycle_error) cannot be taken back exactly.
+        """
+        unit = self._unit
+        if unit is not None:
+            commands, inverses = len(unit[0]), len(unit[1])
+            try:
+                yield self
+            except BaseException:
+                self._roll_back(unit[1], inverses)
+                del unit[0][commands:]
+                raise
+            return
+        unit = self._unit = ([], [])
+        try:
+            yield self
+        except BaseException:
+            self._unit = None
+            self._roll_back(unit[1])
+            if self._feed is not None:
+                self._feed.publish()    # Normally nothing: every spot is back where it was
+            raise
+        self._unit = None
+        self._commit_unit(unit)
+
+    @contextlib.contextmanager
+    def _single_unit(self, redoing: bool = False):
+        # One command outside a transaction while undo is kept. Commits even if the command raises:
+        # what it changed before raising stays, as it does when undo is not kept.
+        unit = self._unit = ([], [])
+        try:
+            yield
+        finally:
+            self._unit = None
+            self._commit_unit(unit, redoing)
+
+    def _commit_unit(self, unit: tuple, redoing: bool = False):
+        commands, inverses = unit
+        if len(commands) == 1:
+            self._record(*commands[0])
+        elif commands:
+            self._record("TRANSACTION", tuple(commands))
+        if inverses and self.undo_limit:
+            self._undo.append((commands, inverses))
+            self._undo_size += len(inverses)
+            self._trim_undo()
+            if not redoing:
+                self._redo.clear()
+
+    def _roll_back(self, inverses: list, start: int = 0):
+        # Applies the inverse steps from start on, newest first, and drops them
+        unit, self._unit = self._unit, None
+        try:
+            while len(inverses) > start:
+                inverse, args = inverses.pop()
+                if self._feed is not None:
+                    # An inverse step is handed the spots it puts back, and moves their reports at most
+                    for spot in args:
+                        if isinstance(spot, (Employee, Vacancy)):
+                            self._touch(spot, *spot.reports)
+                inverse(*args)
+        finally:
+            self._unit = unit
+
+    def _trim_undo(self):
+        # Drops the oldest units until the undo stack is within both bounds
+        while self._undo and (len(self._undo) > self.undo_limit or self._undo_size > self.undo_changes):
+            self._undo_size -= len(self._undo.popleft()[1])
+
+    def keep_undo(self, limit: int = UNDO_LIMIT, max_changes: int = UNDO_CHANGES):
+        """
+        Keeps the last limit units for undo(): each transaction, and each command run outside one.
+        Every inverse step holds on to the spots it would put back, so the oldest units are also
+        dropped once together they note more than max_changes steps. keep_undo(0) stops keeping them.
+        """
+        self.undo_limit = limit
+        self.undo_changes = max_changes
+        self._trim_undo()
+        if not limit:
+            self._redo.clear()
+
+    def undo(self) -> bool:
+        """
+        Undoes the newest unit on the undo stack, newest change first; False if there is none.
+        The journal has no record for an undo, so an attached journal takes a checkpoint
+        afterwards, an attached version history keeps an "UNDO" version, and an attached change
+        feed publishes where the undo put each spot back.
+        If the journal cannot checkpoint what the undo leaves (see _check_tree), the unit is run
+        again, so the organization is what the journal replays to, and the ValueError is raised.
+        """
+        if self._unit is not None:
+            raise RuntimeError("Cannot undo inside a transaction.")
+        if not self._undo:
+            return False
+        commands, inverses = self._undo.pop()
+        self._undo_size -= len(inverses)
+        self._roll_back(inverses)
+        if self._journal is not None:
+            try:
+                self._journal.checkpoint()
+            except ValueError:
+                self._run_again(commands)
+                raise
+        self._redo.append(commands)
+        if self._history is not None:
+            self._history.record("UNDO", ())
+        if self._feed is not None:
+            self._feed.publish()
+        return True
+
+    def redo(self) -> bool:
+        """
+        Runs the commands of the newest undone unit again, as one unit, without printing; False if
+        there is none. Any change other than a redo empties the redo stack.
+        """
+        if self._unit is not None:
+            raise RuntimeError("Cannot redo inside a transaction.")
+        if not self._redo:
+            return False
+        commands = self._redo.pop()
+        quiet, self._quiet = self._quiet, True
+        try:
+            with self._single_unit(redoing=True):
+                for command, names in commands:
+                    self._replay(command, names)
+        finally:
+            self._quiet = quiet
+        return True
+
+    def _run_again(self, commands: list):
+        # Puts back a unit undo() took back, as one unit on the undo stack, without journaling or
+        # printing it: the journal still holds its records, and nothing else has seen the undo yet
+        journal, history, quiet = self._journal, self._history, self._quiet
+        self._journal, self._history, self._quiet = None, None, True
+        try:
+            with self._single_unit(redoing=True):
+                for command, names in commands:
+                    self._replay(command, names)
+        finally:
+            self._journal, self._history, self._quiet = journal, history, quiet
+
+    def _replay(self, command: str, names):
+        # Runs a recorded command again (see journal.py). A command that raised when it was
+        # recorded raises again; what it changed before raising is what it changed then.
+        try:
+            if command == "PRESIDENT":
+                self.initialize_president(*names)
+            elif command == "TRANSACTION":
+                for step in names:
+                    self._replay(*step)
+            else:
+                getattr(self, self.BATCH_COMMANDS[command][0])(*names)
+        except Exception:
+            pass
 
-    def display_organization(self):
+    def headcount(self, name: str) -> Headcount | None:
+        """
+        What sits below an employee, read from the tallies kept up to date by every change, so it
+        costs the same however large the subtree is. Returns None if there is no such employee.
+        """
+        employee = self._find_employee(name)
+        if employee is None:
+            return None
+        tally = employee.tally
+        if tally is None:
+            return Headcount(0, {}, 0)
+        return Headcount(tally.employees, dict(tally.vacancies or {}), tally.height)
+
+    def employees_with_role(self, role: str, under: str | None = None) -> list | None:
+        """
+        Employees holding role, read from the role index instead of walking the tree. With under,
+        only those anywhere below that employee. In no particular order; None if under is unknown.
+        """
+        holders = self._role_index.get(role, {}).values()
+        if under is None:
+            return list(holders)
+        boss = self._find_employee(under)
+        if boss is None:
+            return None
+        return self._below(boss, holders, lambda node: node.role == role and not isinstance(node, Vacancy))
+
+    def vacancies(self, role: str | None = None, under: str | None = None) -> list | None:
+        """
+        Vacancy spots (only those of role, if given), read from the vacancy index. With under, only
+        those anywhere below that employee. In no particular order; None if under is unknown.
+        Like employee_lookup, the index keeps spots stranded outside the tree (see _promote_into_vacancy).
+        """
+        if role is None:
+            spots = [vacancy for index in self._vacancy_index.values() for vacancy in index]
+        else:
+            spots = self._vacancy_index.get(role, {}).keys()
+        if under is None:
+            return list(spots)
+        boss = self._find_employee(under)
+        if boss is None:
+            return None
+        return self._below(boss, spots, lambda node: isinstance(node, Vacancy) and (role is None or node.role == role))
+
+    def snapshot(self) -> FrozenOrg:
+        """
+        The organization as it is now, as an immutable FrozenOrg that later changes leave alone.
+        Spots unchanged since the previous snapshot are shared with it, so this only copies the
+        paths from each changed spot up to the President, each spot on them with its whole tuple of
+        reports: O(depth x width) per change. Attach a VersionHistory to keep one after every change.
+        Raises ValueError on a reporting cycle (see employee.cycle_error).
+        """
+        return FrozenOrg(self._freeze())
+
+    def display_organization(self, stream=None, max_depth: int | None = None, root: str | None = None):
         # Displays the current organization hierarchy (Requirement 11).
+        # The listing is built in memory and written to stream (stdout by default) in one call.
+        # root limits it to one employee's subtree, max_depth to that many levels below the root.
+        # Returns an ActionResult if root is not an employee, None once the listing is written.
+        # Raises cycle_error on a reporting cycle below the root.
+        store = self._store
+        if store is not None and (root is None or store.find(root) is not None):
+            # A loaded organization lists straight from its file; an unknown root is reported below
+            return store.display_organization(stream, max_depth, root)
+        if stream is None:
+            stream = sys.stdout
         if self.president is None:
-            print("Organization is empty.")
+            stream.write("Organization is empty.\n")
             return
-        print(f"President: {self.president.name}")
-        self._display_loop(self.president, 1)
-        return
+        top = self.president if root is None else self._find_employee(root)
+        if top is None:
+            return self._fail("unknown_employee", root)
+        lines = [f"{top.role}: {top.name}"]
+        lines.extend(self._display_lines(top, max_depth))
+        lines.append("")
+        stream.write("\n".join(lines))
+
+    def export(self, target, format: str | None = None, compress: bool | None = None):
+        """
+        Streams the whole organization, vacancies included, to target (a path or an open file) as
+        JSON Lines, CSV or nested JSON; see records.export for the formats and gzip compression.
+        Spots are written one at a time as the tree is walked, so memory does not grow with the
+        organization. Raises ValueError on a reporting cycle (see employee.cycle_error).
+        """
+        records.export(self.president, target, format, compress)
+
+    # ----- Bulk import -----
 
+    @classmethod
+    def from_records(cls, records, echo: bool = True) -> "OrganizationManager":
+        """
+        Builds a manager from (name, manager, role) records, e.g. the rows of an HRIS export (see
+        records.read_records), without a hire_employee call per person. Records may come in any
+        order; the President's has no manager (None or ""). A role left empty is the one below the
+        manager's. Each manager's reports keep the order of their records.
+        The records are read once and checked in bulk: if any breaks a rule (a bad or repeated name,
+        an unknown manager, a role other than the one below the manager's, more reports than the
+        manager's role allows, no President or more than one, records that do not lead up to the
+        President), ValueError lists every problem by record number and nothing is built.
+        """
+        # The new spots all link to each other, so collections while building would free nothing
+        collecting = gc.isenabled()
+        gc.disable()
+        try:
+            return cls._build_from_records(records, echo)
+        finally:
+            if collecting:
+                gc.enable()
+
+    @classmethod
+    def _build_from_records(cls, records, echo: bool) -> "OrganizationManager":
+        org = cls(echo=echo)
+        problems = []           # (record number, problem)
+        lookup = NameRegistry()
+        numbers = {}            # name -> number of its record, for the problems found once linked
+        reports = {}            # manager name -> Employees naming it, in record order
+        president = None
+        valid, add = org._valid_name, lookup.add
+        for number, record in enumerate(records, 1):
+            if len(record) != 3:
+                problems.append((number, f"expected (name, manager, role), got {record!r}"))
+                continue
+            name, manager, role = record
+            if not valid(name):
+                problems.append((number, f"invalid name {name!r}"))
+            elif name in lookup:
+                problems.append((number, f"{name} already appears in record {numbers[name]}"))
+            elif role and role not in ROLE_RANK:
+                problems.append((number, f"unknown role {role!r}"))
+            elif not manager and president is not None:
+                problems.append((number, f"{name} has no manager, but {president.name} "
+                                         f"(record {numbers[president.name]}) is already the President"))
+            else:
+                employee = add(Employee(name, role or None))
+                numbers[employee.name] = number
+                if not manager:
+                    president = employee
+                else:
+                    reports.setdefault(manager, []).append(employee)
+        if president is None:
+            problems.append((0, "no record without a manager, so there is no President"))
+        elif president.role is None:
+            president.role, president.max_reports = ROLE_LADDER[0], ROLE_CAPACITY.get(ROLE_LADDER[0], 0)
+        elif president.role != ROLE_LADDER[0]:
+            problems.append((numbers[president.name], f"{president.name} has no manager, "
+                                                      f"so must be the {ROLE_LADDER[0]}, not a {president.role}"))
+
+        # Link top-down from the President, one level at a time
+        order = [president] if president is not None else []
+        teams = []              # (manager, its reports) in the order linked
+        for boss in order:
+            below = reports.pop(boss.name, None)
+            if below is None:
+                continue
+            rank = ROLE_RANK[boss.role] + 1
+            if rank == len(ROLE_LADDER):
+                problems.append((numbers[boss.name], f"{boss.name} is a {boss.role}, "
+                                                     f"so cannot have the {len(below)} reports naming them"))
+                continue
+            role = ROLE_LADDER[rank]
+            if len(below) > boss.max_reports:
+                problems.append((numbers[boss.name], f"{boss.name} has {len(below)} reports, "
+                                                     f"more than the {boss.max_reports} a {boss.role} can have"))
+            for employee in below:
+                if employee.role is None:
+                    employee.role, employee.max_reports = role, ROLE_CAPACITY.get(role, 0)
+                elif employee.role != role:
+                    problems.append((numbers[employee.name], f"{employee.name} reports to {boss.name}, a {boss.role}, "
+                                                             f"so must be a {role}, not a {employee.role}"))
+                employee.boss = boss
+            teams.append((boss, below))
+            order.extend(below)
+        for manager, below in reports.items():
+            for employee in below:
+                if manager in lookup:
+                    problem = f"{employee.name} does not report up to the President (through {manager})"
+                else:
+                    problem = f"manager {manager} of {employee.name} has no record"
+                problems.append((numbers[employee.name], problem))
+        if problems:
+            problems.sort(key=lambda problem: problem[0])
+            raise ValueError("Import rejected, nothing was built:\n" +
+                             "\n".join(f"record {number}: {problem}" if number else problem
+                                       for number, problem in problems))
+
+        # Bottom-up, so every ReportList sees its reports' own open slots. There are no vacancies
+        # yet, so a tally only counts employees and levels.
+        for boss, below in reversed(teams):
+            boss.reports = ReportList(below)
+            tally = boss.tally = Tally()
+            tally.employees = len(below) + sum(report.tally.employees for report in below if report.tally is not None)
+            counts = tally.levels
+            for report in below:
+                level = 1 if report.tally is None else report.tally.height + 1
+                counts[level] = counts.get(level, 0) + 1
+            tally.height = max(counts)
+        role_index = org._role_index
+        for employee in order:
+            role_index.setdefault(employee.role, {})[employee.name] = employee
+        org.president = president
+        org.employee_lookup = lookup
+        return org
+
+    # ----- Snapshots -----
+
+    @classmethod
+    def from_columnar(cls, store: ColumnarOrg, echo: bool = True) -> "OrganizationManager":
+        # Builds a manager holding the organization captured in a ColumnarOrg.
+        org = cls(echo=echo)
+        org._adopt(store)
+        return org
+
+    def _adopt(self, store: ColumnarOrg):
+        self.employee_lookup = NameRegistry()
+        self.president, _ = store.build_nodes(self.employee_lookup)
+        self._recount()
+        self._reindex()
+
+    def save(self, path: str):
+        # Writes the organization to path in the versioned ColumnarOrg binary format.
+        # The data goes to a temporary file that replaces path, so a failed save never leaves half a file.
+        # The format holds the tree alone, so an organization whose tree and employee_lookup disagree
+        # (see _check_tree) raises ValueError rather than come back from load() without its strays.
+        if self._store is None:
+            self._check_tree()
+        data = self._snapshot_bytes()
+        temporary = f"{path}.tmp"
+        with open(temporary, "wb") as file:
+            file.write(data)
+        os.replace(temporary, path)
+
+    def _check_tree(self):
+        # Raises ValueError unless the tree under the President holds each employee in employee_lookup
+        # and each vacancy in the vacancy index exactly once, and nothing else, with every boss pointer
+        # matching its boss's reports; spots can be stranded outside the tree (see _promote_into_vacancy),
+        # and a reporting cycle raises cycle_error.
+        count = vacancies = 0
+        stack = [] if self.president is None else [(self.president, None)]
+        seen = set()
+        while stack:
+            node, boss = stack.pop()
+            if id(node) in seen:
+                raise cycle_error(node)
+            seen.add(id(node))
+            if node.boss is not boss:
+                raise ValueError(f"{getattr(node, 'name', 'A vacancy')} is listed under a boss it does not report to.")
+            if isinstance(node, Employee):
+                if self.employee_lookup.get(node.name) is not node:
+                    raise ValueError(f"{node.name} is in the hierarchy but not in employee_lookup.")
+                count += 1
+            elif node not in self._vacancy_index.get(node.role, ()):
+                raise ValueError("A vacancy in the hierarchy is not in the vacancy index.")
+            else:
+                vacancies += 1
+            stack.extend((report, node) for report in node.reports)
+        if count != len(self.employee_lookup):
+            raise ValueError(f"{len(self.employee_lookup) - count} employees are outside the hierarchy.")
+        if vacancies != sum(map(len, self._vacancy_index.values())):
+            raise ValueError(f"{sum(map(len, self._vacancy_index.values())) - vacancies} vacancies are outside the hierarchy.")
+
+    def _snapshot_bytes(self) -> bytes:
+        if self._store is not None:
+            return self._store.to_bytes()
+        return ColumnarOrg.from_manager(self).to_bytes()
+
+    @classmethod
+    def load(cls, path: str, echo: bool = True) -> "OrganizationManager":
+        """
+        Opens a file written by save(). The file is memory-mapped, and the Employee objects,
+        employee_lookup and the indexes are only built the first time something reads them.
+        Until then DISPLAY and save() work straight from the mapped file; the first change builds them,
+        as a ColumnarOrg cannot be changed.
+        Raises ValueError if the file is not a snapshot this version can read.
+        """
+        with open(path, "rb") as file:
+            try:
+                buffer = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:
+                raise ValueError(f"{path} is empty, not an organization snapshot.") from None
+        store = ColumnarOrg.from_bytes(buffer)
+        org = cls(echo=echo)
+        del org.president, org.employee_lookup, org._role_index, org._vacancy_index
+        org._store = store
+        return org
+
+    def __getattr__(self, attribute: str):
+        # Only reached for attributes the instance does not have: on a loaded organization, the
+        # objects that load() left unbuilt
+        if attribute in _BUILT_ON_ACCESS and self._store is not None:
+            self._materialize()
+            return getattr(self, attribute)
+        raise AttributeError(f"{type(self).__name__!r} object has no attribute {attribute!r}")
+
+    def _materialize(self):
+        # Builds a loaded organization's objects on a scratch manager and takes them over in one
+        # update, so a reader on another thread never finds only some of them
+        scratch = OrganizationManager(echo=False)
+        scratch._adopt(self._store)
+        self.__dict__.update({attribute: scratch.__dict__[attribute] for attribute in _BUILT_ON_ACCESS})
+        self._store = None
+
+
+_BUILT_ON_ACCESS = ("president", "employee_lookup", "_role_index", "_vacancy_index")
@@ -0,0 +1,161 @@
+import sys
+from collections import deque
+from typing import NamedTuple
+
+import records
+from results import ActionResult
+
+
+class FrozenSpot(NamedTuple):
+    """
+    One spot of a frozen organization. Never changes once built, so versions share every spot
+    whose subtree did not change between them.
+      name        - employee name, None for a vacancy
+      role        - position in the company
+      max_reports - capacity of the spot
+      reports     - FrozenSpots directly below, in display order
+      digest      - hash of all of the above and the reports' digests, so spots heading equal
+                    subtrees have equal digests (see changes.diff); None if built without one
+    """
+    name: str | None
+    role: str
+    max_reports: int
+    reports: tuple = ()
+    digest: int | None = None
+
+    @classmethod
+    def of(cls, name: str | None, role: str, max_reports: int, reports: tuple = ()) -> "FrozenSpot":
+        # A FrozenSpot with its digest, worked out from the reports' own
+        digest = hash((name, role, max_reports, *[report.digest for report in reports]))
+        return cls(name, role, max_reports, reports, digest)
+
+    def is_vacant(self) -> bool:
+        return self.name is None
+
+
+class FrozenOrg:
+    """
+    The organization as it was at one point, from OrganizationManager.snapshot() or a VersionHistory.
+    Taking one only copies the spots that changed since the previous one (each change copies the
+    path from the changed spot up to the President, and each spot on it brings a new tuple of all
+    its reports), so a version costs the report counts along the changed paths, not the headcount.
+    diff() in changes.py lists what differs between two of them, passing over the subtrees they share.
+      root    - FrozenSpot of the President, None for an empty organization
+      version - number of the change it follows in a VersionHistory, None for a plain snapshot
+      change  - (command, names) of that change, None for a plain snapshot. A committed transaction
+                is ("TRANSACTION", its (command, names) pairs), an undo ("UNDO", ()).
+    """
+
+    def __init__(self, root: FrozenSpot | None, version: int | None = None, change: tuple | None = None):
+        self.root = root
+        self.version = version
+        self.change = change
+        self._spots_by_name = None  # Built on the first lookup by name
+
+    def spots(self):
+        # Yields (spot, boss spot) for every spot in display order; the President's boss is None
+        if self.root is None:
+            return
+        stack = [(self.root, None)]
+        while stack:
+            spot, boss = stack.pop()
+            yield spot, boss
+            stack.extend((report, spot) for report in reversed(spot.reports))
+
+    def find(self, name: str) -> FrozenSpot | None:
+        # The spot of an employee, or None. The name index is built on first use.
+        if self._spots_by_name is None:
+            self._spots_by_name = {spot.name: spot for spot, _ in self.spots() if spot.name is not None}
+        return self._spots_by_name.get(name)
+
+    def display_lines(self, root: FrozenSpot, max_depth: int | None = None):
+        # Same lines as OrganizationManager._display_lines.
+        if max_depth is not None and max_depth <= 0:
+            return
+        stack = [iter(root.reports)]
+        indents = ["", "\t"]
+        while stack:
+            report = next(stack[-1], None)
+            if report is None:
+                stack.pop()
+                continue
+            level = len(stack)
+            if report.name is None:
+                yield f"{indents[level]}VACANCY: {report.role}"
+                continue
+            yield f"{indents[level]}{report.role}: {report.name}"
+            if report.reports and (max_depth is None or level < max_depth):
+                stack.append(iter(report.reports))
+                if len(indents) <= level + 1:
+                    indents.append("\t" * (level + 1))
+
+    def display_organization(self, stream=None, max_depth: int | None = None, root: str | None = None):
+        # Writes the same listing as OrganizationManager.display_organization, and returns the same
+        # ActionResult for an unknown root; with no echo to print it, that is up to the caller.
+        if stream is None:
+            stream = sys.stdout
+        if self.root is None:
+            stream.write("Organization is empty.\n")
+            return
+        top = self.root if root is None else self.find(root)
+        if top is None:
+            return ActionResult("unknown_employee", (root,))
+        lines = [f"{top.role}: {top.name}"]
+        lines.extend(self.display_lines(top, max_depth))
+        lines.append("")
+        stream.write("\n".join(lines))
+
+    def export(self, target, format: str | None = None, compress: bool | None = None):
+        # Same files as OrganizationManager.export
+        records.export(self.root, target, format, compress)
+
+
+class VersionHistory:
+    """
+    The most recent versions of an OrganizationManager, one FrozenOrg after every change that
+    the journal would record (initializing the President included). Versions are numbered from
+    0, the organization as it was when the history was attached; only the last limit are kept.
+    """
+
+    def __init__(self, limit: int = 10_000):
+        self.limit = limit
+        self.org = None
+        self.version = 0            # Number of the newest version
+        self._versions = deque(maxlen=limit)
+
+    def attach(self, org):
+        # Starts keeping versions of org; its current state becomes version 0.
+        if org._history is not None:
+            raise ValueError("The organization already has a version history.")
+        self.org = org
+        self._versions.append(FrozenOrg(org.snapshot().root, 0))
+        org._history = self
+
+    def record(self, command: str, names):
+        self.version += 1
+        self._versions.append(FrozenOrg(self.org._freeze(), self.version, (command, tuple(names))))
+
+    def close(self):
+        # Stops keeping versions; the ones kept so far stay readable.
+        if self.org is not None and self.org._history is self:
+            self.org._history = None
+
+    @property
+    def oldest(self) -> int:
+        return self._versions[0].version
+
+    @property
+    def latest(self) -> FrozenOrg:
+        return self._versions[-1]
+
+    def at(self, version: int) -> FrozenOrg:
+        # The organization right after change number version. KeyError once it has been dropped.
+        if not self.oldest <= version <= self.version:
+            raise KeyError(f"Version {version} is not kept (versions {self.oldest} to {self.version} are).")
+        return self._versions[version - self.oldest]
+
+    def __len__(self) -> int:
+        return len(self._versions)
+
+    def __iter__(self):
+        return iter(self._versions)
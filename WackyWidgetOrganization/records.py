@@ -0,0 +1,196 @@
+import csv
+import gzip
+import io
+import json
+import os
+from json.encoder import encode_basestring
+from operator import itemgetter
+
+from employee import cycle_error
+
+FIELDS = ("name", "manager", "role")    # What each record holds; the President's manager is empty
+EXPORT_FIELDS = ("id", "boss", "name", "manager", "role")   # What each exported spot holds (see export)
+FORMATS = {".jsonl": "jsonl", ".ndjson": "jsonl", ".csv": "csv", ".json": "json"}
+GZIP_LEVEL = 6      # zlib's default; gzip's own 9 is about four times slower on exports for a 12% smaller file
+
+
+def _format_of(path: str) -> tuple:
+    # (format, gzip-compressed) from a file name such as org.csv or org.jsonl.gz
+    stem, extension = os.path.splitext(path)
+    compressed = extension.lower() == ".gz"
+    if compressed:
+        extension = os.path.splitext(stem)[1]
+    return FORMATS.get(extension.lower()), compressed
+
+
+def _open_text(path: str, mode: str, compressed: bool, encoding: str = "utf-8", newline=None):
+    if compressed:
+        return gzip.open(path, mode + "t", GZIP_LEVEL, encoding=encoding, newline=newline)
+    return open(path, mode, encoding=encoding, newline=newline)
+
+
+# ----- Import -----
+
+
+def _from_csv(file, path: str):
+    # A header row names the columns, in any order and case; role may be left out, other columns are ignored
+    rows = csv.reader(file, skipinitialspace=True)
+    header = [column.strip().lower() for column in next(rows, [])]
+    for column in FIELDS[:2]:
+        if column not in header:
+            raise ValueError(f"{path} has no {column} column.")
+    name, manager = header.index("name"), header.index("manager")
+    if "role" in header:
+        role = header.index("role")
+        pick = itemgetter(name, manager, role)
+    else:
+        role = 0
+        pick = lambda row: (row[name], row[manager], None)
+    width = max(name, manager, role) + 1
+    for row in rows:
+        if not row:
+            continue
+        if len(row) < width:
+            row += [None] * (width - len(row))  # A short row: the missing values come through as None
+        yield pick(row)
+
+
+def _from_objects(objects):
+    # Objects with name, manager and role keys; anything else is passed on for from_records to reject
+    for item in objects:
+        if isinstance(item, dict):
+            yield tuple(item.get(field) for field in FIELDS)
+        else:
+            yield (item,)
+
+
+def read_records(path: str):
+    """
+    Streams (name, manager, role) records from an HRIS export for OrganizationManager.from_records,
+    picking the format by extension, with .gz after it for a gzip-compressed file:
+      .csv           - a header row with name and manager columns, and optionally role
+      .json          - an array of objects with name, manager and role keys
+      .jsonl/.ndjson - one such object per line
+    Files written by export() read back the same way. Empty manager and role values come through
+    as they are; from_records treats them as absent.
+    Raises ValueError for another extension or a CSV file without the needed columns.
+    """
+    format, compressed = _format_of(path)
+    if format is None:
+        raise ValueError(f"Cannot tell the format of {path}; expected .csv, .json or .jsonl.")
+    # utf-8-sig also reads files without the byte order mark spreadsheet programs put first
+    with _open_text(path, "r", compressed, "utf-8-sig", "" if format == "csv" else None) as file:
+        if format == "csv":
+            yield from _from_csv(file, path)
+        elif format == "json":
+            yield from _from_objects(json.load(file))
+        else:
+            yield from _from_objects(json.loads(line) for line in file if line.strip())
+
+
+# ----- Export -----
+
+def _walk(root):
+    # Yields (id, boss id, spot, boss, depth) for root and every spot below it, depth first in
+    # display order, vacancies and whatever sits under them included. ids number the spots in
+    # that order. Works on live spots and FrozenSpots alike; raises cycle_error on a reporting cycle.
+    yield 0, None, root, None, 0
+    number = 1
+    stack = [(0, root, iter(root.reports))]
+    on_path = {id(root)}
+    while stack:
+        boss_number, boss, reports = stack[-1]
+        report = next(reports, None)
+        if report is None:
+            on_path.discard(id(boss))
+            stack.pop()
+            continue
+        yield number, boss_number, report, boss, len(stack)
+        if report.reports:
+            if id(report) in on_path:
+                raise cycle_error(report)
+            on_path.add(id(report))
+            stack.append((number, report, iter(report.reports)))
+        number += 1
+
+
+def _quote(text) -> str:
+    return "null" if text is None else encode_basestring(text)
+
+
+def csv_rows(root):
+    # One row of EXPORT_FIELDS per spot; a vacancy has no name, and the President no boss or manager
+    for number, boss_number, spot, boss, _ in _walk(root):
+        yield number, boss_number, getattr(spot, "name", None), getattr(boss, "name", None), spot.role
+
+
+def json_lines(root):
+    # One JSON object of EXPORT_FIELDS per spot and line, with null where csv_rows leaves a field empty
+    roles = {}
+    for number, boss_number, spot, boss, _ in _walk(root):
+        role = roles.get(spot.role) or roles.setdefault(spot.role, _quote(spot.role))
+        yield (f'{{"id": {number}, "boss": {"null" if boss_number is None else boss_number}, '
+               f'"name": {_quote(getattr(spot, "name", None))}, "manager": {_quote(getattr(boss, "name", None))}, '
+               f'"role": {role}}}\n')
+
+
+def json_chunks(root):
+    # One nested JSON document, {"name": ..., "role": ..., "reports": [...]} for each spot, in pieces
+    if root is None:
+        yield "null"
+        return
+    roles = {}
+    previous = -1
+    for _, _, spot, _, depth in _walk(root):
+        if depth <= previous:
+            yield "]}" * (previous - depth + 1) + ", "
+        role = roles.get(spot.role) or roles.setdefault(spot.role, _quote(spot.role))
+        yield f'{{"name": {_quote(getattr(spot, "name", None))}, "role": {role}, "reports": ['
+        previous = depth
+    yield "]}" * (previous + 1)
+
+
+def _write(root, stream, format: str):
+    if format == "csv":
+        writer = csv.writer(stream, lineterminator="\n")
+        writer.writerow(EXPORT_FIELDS)
+        if root is not None:
+            writer.writerows(csv_rows(root))
+    elif format == "jsonl":
+        if root is not None:
+            stream.writelines(json_lines(root))
+    elif format == "json":
+        stream.writelines(json_chunks(root))
+        stream.write("\n")
+    else:
+        raise ValueError(f"Unknown export format {format!r}; expected jsonl, csv or json.")
+
+
+def export(root, target, format: str | None = None, compress: bool | None = None):
+    """
+    Streams root (the President, live or frozen) and every spot below it to target, one spot at a
+    time through the generators above, so memory does not grow with the organization:
+      jsonl - a JSON object of EXPORT_FIELDS per line
+      csv   - a header row, then a row of EXPORT_FIELDS per spot
+      json  - one nested document, each spot with its name, role and list of reports
+    target is a path, whose extension gives the format unless format is given and a further .gz
+    gzip-compresses it, or an open file: a text stream, or a binary one to gzip into with compress.
+    Without vacancies, the jsonl and csv files import back with read_records.
+    """
+    if isinstance(target, (str, os.PathLike)):
+        path = os.fspath(target)
+        named, compressed = _format_of(path)
+        format = format or named
+        if format is None:
+            raise ValueError(f"Cannot tell the format of {path}; expected .jsonl, .csv or .json.")
+        with _open_text(path, "w", compressed if compress is None else compress,
+                        newline="" if format == "csv" else None) as stream:
+            _write(root, stream, format)
+    elif format is None:
+        raise ValueError("Exporting to an open file needs a format: jsonl, csv or json.")
+    elif compress:
+        with io.TextIOWrapper(gzip.GzipFile(fileobj=target, mode="wb", compresslevel=GZIP_LEVEL), encoding="utf-8",
+                              newline="" if format == "csv" else None) as stream:
+            _write(root, stream, format)
+    else:
+        _write(root, target, format)
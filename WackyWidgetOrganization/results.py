@@ -0,0 +1,78 @@
+from typing import NamedTuple
+
+# Message printed for each result code; {0}, {1} are filled from ActionResult.names.
+# Codes missing from SUCCESS_CODES are failures that left the organization unchanged.
+MESSAGES = {
+    "initialized": "Success: Initialized President {0}.",
+    "hired": "Successfully hired {0} under {1}.",
+    "placed": "Successfully placed {0} under {1}.",
+    "removed": "{0} has been removed from the company.",
+    "vacated": "{0} has been removed from the company. Vacancy remains.",
+    "laid_off": "{0} has been removed from the company.\nDone",
+    "laid_off_vacated": "{0} has been removed from the company. Vacancy remains.\nDone",
+    "promoted": "Successfully promoted {0} under {1}.",
+
+    "invalid_name": "Error: Invalid name.",
+    "no_president": "Error: No president initialized.",
+    "name_taken": "Error: Employee name {0} already exists.",
+    "unknown_employee": "Error: Employee name {0} does not exist.",
+    "unknown_hiring_manager": "Error: Hiring manager {0} does not exist.",
+    "unknown_firing_manager": "Error: Firing manager {0} does not exist.",
+    "unknown_manager": "Error: Manager {0} does not exist.",
+    "unknown_initiator": "Error: Initiator {0} does not exist.",
+    "unknown_destination": "Error: Destination manager {0} does not exist.",
+    "unknown_receiving_manager": "Error: Receiving manager {0} does not exist.",
+    "worker_cannot_hire": "Error: A worker cannot hire employees.",
+    "hiring_manager_full": "Error: Hiring manager {0} has reached maximum direct reports.",
+    "destination_full": "Error: Destination manager {0} has reached maximum direct reports.",
+    "receiving_manager_full": "Error: Receiving manager {0} has reached maximum direct reports.",
+    "cannot_fire_president": "Error: Cannot fire the President.",
+    "cannot_lay_off_president": "Error: Cannot lay off the President.",
+    "president_cannot_quit": "Error: President cannot quit.",
+    "not_in_hierarchy": "Error: {0} is not in the hierarchy of {1}.",
+    "cannot_transfer": "Error: Initiator {0} does not have permission to transfer employees.",
+    "not_managed": "Error: {0} does not manage {1}.",
+    "role_mismatch": "Error: Employee {0} cannot be transferred to {1} due to role mismatch.",
+    "cannot_promote_further": "Error: {0} cannot be promoted further.",
+    "cannot_promote": "Error: {0} cannot promote employees.",
+    "one_level_only": "Error: Promotions can only be one level.",
+    "unexpected_error": "An unexpected error occurred: {0}",
+}
+
+SUCCESS_CODES = frozenset({
+    "initialized", "hired", "placed", "removed", "vacated", "laid_off", "laid_off_vacated", "promoted",
+})
+
+
+class ActionResult(NamedTuple):
+    """
+    What one OrganizationManager call did. Nothing is formatted until message is read.
+      code  - key into MESSAGES, e.g. "hired" or "unknown_employee"
+      names - the names the call was about, in message order
+      boss  - manager of the spot the call filled or emptied
+      index - position of that spot among the boss's reports, if it is still there
+    """
+    code: str
+    names: tuple = ()
+    boss: str | None = None
+    index: int | None = None
+
+    @property
+    def ok(self) -> bool:
+        return self.code in SUCCESS_CODES
+
+    @property
+    def message(self) -> str:
+        return MESSAGES[self.code].format(*self.names)
+
+
+class Headcount(NamedTuple):
+    """
+    What sits below one employee, from OrganizationManager.headcount().
+      employees - Employees anywhere below
+      vacancies - role -> number of Vacancies anywhere below
+      depth     - levels below the employee, 0 for someone with no reports
+    """
+    employees: int
+    vacancies: dict
+    depth: int
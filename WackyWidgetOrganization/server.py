@@ -0,0 +1,220 @@
+import asyncio
+import contextlib
+import io
+import time
+
+from commands import dispatch
+from organization_manager import OrganizationManager
+from persistent import FrozenOrg
+
+PIPELINE_DEPTH = 256    # Requests read ahead of their responses on one connection
+SNAPSHOT_AGE = 0.05     # Seconds a DISPLAY may show an organization other clients have since changed
+WRITE_BATCH = 64        # Commands the writer applies before letting connections run
+
+
+def parse_address(address: str) -> dict:
+    """
+    Where to listen, as keyword arguments for OrganizationServer.start():
+      unix:PATH, or anything containing a '/'  - a Unix domain socket at PATH
+      HOST:PORT, :PORT or PORT                  - a TCP socket (host defaults to localhost)
+    """
+    if address.startswith("unix:"):
+        return {"path": address[len("unix:"):]}
+    if "/" in address:
+        return {"path": address}
+    host, _, port = address.rpartition(":")
+    if not port.isdigit():
+        raise ValueError(f"Invalid address {address}.")
+    return {"host": host or "127.0.0.1", "port": int(port)}
+
+
+class OrganizationServer:
+    """
+    Serves one OrganizationManager to many clients over the REPL's line protocol.
+
+    Each line a client sends is a command (HIRE, FIRE, QUIT, LAYOFF, TRANSFER, PROMOTE, DISPLAY, EXIT).
+    The response is what the REPL would print for it, followed by an empty line. Clients may send
+    many lines without waiting; responses come back in the order the lines were sent.
+      - Changes go through one writer task, which applies them one at a time in arrival order.
+        The manager itself is never touched from more than one place at once.
+      - A plain DISPLAY is rendered from an immutable FrozenOrg snapshot, outside the event loop.
+        It shows every change the same connection sent before it, and other clients' changes
+        from no more than SNAPSHOT_AGE seconds earlier. DISPLAY with arguments goes to the writer.
+      - EXIT answers like the REPL and closes the connection once earlier responses are sent.
+    """
+
+    def __init__(self, org_manager: OrganizationManager, pipeline_depth: int = PIPELINE_DEPTH,
+                 snapshot_age: float = SNAPSHOT_AGE):
+        self.org_manager = org_manager
+        self.pipeline_depth = pipeline_depth
+        self.snapshot_age = snapshot_age
+        self.version = 0            # Number of commands the writer has applied that may have changed something
+        self.server = None
+        self._queue = None          # (parts, future) for the writer
+        self._writer_task = None
+        self._snapshot = None       # (version, taken at, FrozenOrg)
+        self._connections = {}      # Connection task -> its StreamReader
+
+    # ----- Lifecycle -----
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0, path: str | None = None):
+        # Starts listening on a Unix socket at path, or on host:port (port 0 picks a free one)
+        self._queue = asyncio.Queue()
+        self._writer_task = asyncio.create_task(self._write_loop())
+        if path is not None:
+            self.server = await asyncio.start_unix_server(self._serve_connection, path)
+        else:
+            self.server = await asyncio.start_server(self._serve_connection, host, port)
+        return self
+
+    @property
+    def address(self):
+        # (host, port) for TCP, the path for a Unix socket
+        return self.server.sockets[0].getsockname()
+
+    async def serve_forever(self):
+        await self.server.serve_forever()
+
+    async def close(self):
+        # Stops listening, then ends every connection once the responses to what it already sent are written
+        self.server.close()
+        for reader in self._connections.values():
+            reader.feed_eof()
+        if self._connections:
+            await asyncio.wait(list(self._connections))
+        await self.server.wait_closed()
+        self._writer_task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await self._writer_task
+
+    # ----- Writer -----
+
+    def _apply(self, parts: list) -> str:
+        # Runs one command line and returns what the REPL prints for it
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            try:
+                result = dispatch(self.org_manager, parts)
+            except Exception as e:
+                print(f"An unexpected error occurred: {e}")
+                self.version += 1
+            else:
+                if getattr(result, "ok", False):
+                    self.version += 1
+        return output.getvalue()
+
+    async def _write_loop(self):
+        queue = self._queue
+        while True:
+            parts, future = await queue.get()
+            applied = 1
+            while True:
+                if not future.cancelled():
+                    future.set_result((self._apply(parts), self.version))
+                if queue.empty():
+                    break
+                if applied == WRITE_BATCH:
+                    await asyncio.sleep(0)
+                    applied = 0
+                parts, future = queue.get_nowait()
+                applied += 1
+
+    def submit(self, parts: list) -> asyncio.Future:
+        # Queues a command line for the writer; the future resolves to (response, version after it)
+        future = asyncio.get_running_loop().create_future()
+        self._queue.put_nowait((parts, future))
+        return future
+
+    # ----- Reads -----
+
+    def _current_snapshot(self, version: int) -> FrozenOrg | None:
+        # A snapshot holding at least the first version changes, or None if the organization cannot
+        # be captured (a reporting cycle); taken between two commands, as the writer never awaits mid-command
+        now = time.monotonic()
+        if self._snapshot is not None:
+            taken_version, taken_at, snapshot = self._snapshot
+            if taken_version == self.version or (taken_version >= version and now - taken_at < self.snapshot_age):
+                return snapshot
+        if self.org_manager.president is None:
+            return None
+        try:
+            snapshot = self.org_manager.snapshot()
+        except ValueError:
+            return None
+        self._snapshot = (self.version, now, snapshot)
+        return snapshot
+
+    async def _display(self, after) -> str:
+        # DISPLAY, once the connection's previous change (after, a writer future or None) is applied
+        version = 0 if after is None else (await after)[1]
+        snapshot = self._current_snapshot(version)
+        if snapshot is None:
+            return (await self.submit(["DISPLAY"]))[0]
+        listing = io.StringIO()
+        await asyncio.to_thread(snapshot.display_organization, listing)
+        return listing.getvalue()
+
+    # ----- Connections -----
+
+    async def _serve_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self._connections[asyncio.current_task()] = reader
+        pending = asyncio.Queue(self.pipeline_depth)     # Responses in request order; None ends the connection
+        sender = asyncio.create_task(self._send_responses(pending, writer))
+        last_change = None
+        try:
+            while not sender.done():
+                line = await reader.readline()
+                if not line:
+                    break
+                parts = line.decode("utf-8", "replace").split()
+                if not parts:
+                    continue
+                command = parts[0].upper()
+                if command == "EXIT":
+                    await pending.put("Exiting Wacky Widget HR System.\n")
+                    break
+                if command == "DISPLAY" and len(parts) == 1:
+                    response = asyncio.ensure_future(self._display(last_change))
+                else:
+                    response = last_change = self.submit(parts)
+                await pending.put(response)
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            if not sender.done():
+                await pending.put(None)
+            with contextlib.suppress(ConnectionError):
+                await sender
+            writer.close()
+            with contextlib.suppress(ConnectionError):
+                await writer.wait_closed()
+            del self._connections[asyncio.current_task()]
+
+    async def _send_responses(self, pending: asyncio.Queue, writer: asyncio.StreamWriter):
+        # Writes responses in order, flushing whenever no further response is ready
+        while True:
+            response = await pending.get()
+            if response is None:
+                break
+            if not isinstance(response, str):
+                response = await response
+                if isinstance(response, tuple):
+                    response = response[0]
+            writer.write(response.encode() + b"\n")
+            if pending.empty():
+                await writer.drain()
+        await writer.drain()
+
+
+def serve(org_manager: OrganizationManager, address: str):
+    # Runs a server for org_manager on address (see parse_address) until interrupted
+    async def run():
+        server = await OrganizationServer(org_manager).start(**parse_address(address))
+        print(f"Serving the Wacky Widget Company System on {address}.", flush=True)
+        try:
+            await server.serve_forever()
+        finally:
+            await server.close()
+
+    with contextlib.suppress(KeyboardInterrupt):
+        asyncio.run(run())
@@ -0,0 +1,89 @@
+"""
+Benchmark: ancestry index vs. walking boss pointers in _is_superior_to
+Configures a deep role ladder (one rung per level, capacity 1) so the organization
+is a single chain, then times the hierarchy checks behind FIRE, LAYOFF and TRANSFER.
+
+Run from the repository root:  python benchmarks/bench_ancestry.py
+"""
+
+import contextlib
+import io
+import os
+import sys
+import time
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "WackyWidgetOrganization"))
+
+import employee
+from organization_manager import OrganizationManager
+
+DEPTHS = [100, 1_000, 10_000]
+REPEAT = 200
+
+
+def walk_is_superior(manager, person) -> bool:
+    # The pre-index implementation of _is_superior_to
+    current_boss = person.boss
+    while current_boss is not None:
+        if current_boss is manager:
+            return True
+        current_boss = current_boss.boss
+    return False
+
+
+def build_chain(depth: int):
+    ladder = [f"Level{i}" for i in range(depth + 1)]
+    employee.configure_roles(ladder, {role: 1 for role in ladder[:-1]})
+    org = OrganizationManager()
+    with contextlib.redirect_stdout(io.StringIO()):
+        org.initialize_president("E0")
+        for i in range(1, depth + 1):
+            org.hire_employee(f"E{i - 1}", f"E{i}")
+    return org
+
+
+def per_call(func) -> float:
+    return timeit.timeit(func, number=REPEAT) / REPEAT * 1e6
+
+
+def bench(depth: int):
+    org = build_chain(depth)
+    top, middle, bottom = (org._find_employee(f"E{i}") for i in (0, depth // 2, depth))
+
+    # The first checks walk and pay for the rebuild; measure steady state afterwards
+    start = time.perf_counter()
+    while not org._tour_current:
+        org._is_superior_to(top, bottom)
+    warmup = (time.perf_counter() - start) * 1e3
+
+    cases = [("top above bottom", top, bottom), ("bottom above top", bottom, top), ("middle above bottom", middle, bottom)]
+    print(f"\nChain depth {depth:,} (index built after {warmup:.1f} ms of walking)")
+    for label, manager, person in cases:
+        assert org._is_superior_to(manager, person) == walk_is_superior(manager, person)
+        indexed = per_call(lambda: org._is_superior_to(manager, person))
+        walked = per_call(lambda: walk_is_superior(manager, person))
+        print(f"  {label:22} indexed {indexed:9.3f} us   walk {walked:9.3f} us   x{walked / indexed:,.0f}")
+
+    # FIRE the bottom employee and hire them back: leaf changes patch the index instead of invalidating it
+    with contextlib.redirect_stdout(io.StringIO()):
+        def churn():
+            org.fire_employee("E0", f"E{depth}")
+            org.hire_employee(f"E{depth - 1}", f"E{depth}")
+        churn_time = per_call(churn)
+    print(f"  FIRE + HIRE at the bottom (index kept current: {org._tour_current}) {churn_time:9.3f} us per pair")
+
+
+def main():
+    saved = (list(employee.ROLE_LADDER), dict(employee.ROLE_CAPACITY))
+    try:
+        print(f"{REPEAT:,} calls per measurement")
+        for depth in DEPTHS:
+            bench(depth)
+    finally:
+        employee.configure_roles(*saved)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
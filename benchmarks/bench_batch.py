@@ -0,0 +1,62 @@
+"""
+Benchmark: main.py reading a command log interactively vs. with --script
+Writes a log of HIRE/FIRE churn plus a DISPLAY every few thousand commands, then runs it through
+main.py as a subprocess twice: once on stdin the interactive way (banner and prompt before every
+command) and once with --script. Reports wall time and how many bytes each run wrote.
+
+Run from the repository root:  python benchmarks/bench_batch.py [commands]
+e.g. python benchmarks/bench_batch.py 1000000
+"""
+
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+PROGRAM = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "WackyWidgetOrganization", "main.py")
+
+COMMANDS = 200_000
+DISPLAY_EVERY = 5_000
+
+
+def write_log(path: str, commands: int):
+    # President, two VPs with three supervisors each, then workers hired and fired in turn
+    lines = ["P", "HIRE P V0", "HIRE P V1"]
+    supervisors = [f"S{v}_{s}" for v in range(2) for s in range(3)]
+    lines.extend(f"HIRE V{s[1]} {s}" for s in supervisors)
+    count = 0
+    while len(lines) < commands:
+        if count % DISPLAY_EVERY == 0:
+            lines.append("DISPLAY")
+        lines.append(f"HIRE {supervisors[count % len(supervisors)]} W{count}")
+        lines.append(f"FIRE P W{count}")
+        count += 1
+    lines.append("EXIT")
+    with open(path, "w", encoding="utf-8") as file:
+        file.write("\n".join(lines) + "\n")
+    return len(lines)
+
+
+def run(arguments: list, stdin) -> tuple:
+    start = time.perf_counter()
+    result = subprocess.run([sys.executable, PROGRAM, *arguments], stdin=stdin, capture_output=True, check=True)
+    return time.perf_counter() - start, len(result.stdout)
+
+
+def main():
+    commands = int(sys.argv[1]) if len(sys.argv) > 1 else COMMANDS
+    with tempfile.TemporaryDirectory() as directory:
+        log = os.path.join(directory, "commands.txt")
+        count = write_log(log, commands)
+        with open(log, "rb") as stdin:
+            interactive, interactive_bytes = run([], stdin)
+        scripted, scripted_bytes = run(["--script", log], subprocess.DEVNULL)
+    print(f"{count:,} commands")
+    print(f"interactive  {interactive:8.2f} s  {count / interactive:12,.0f} commands/s  {interactive_bytes:14,} bytes out")
+    print(f"--script     {scripted:8.2f} s  {count / scripted:12,.0f} commands/s  {scripted_bytes:14,} bytes out")
+    print(f"speedup      {interactive / scripted:8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""
+Benchmark: diffing two organizations vs. diffing their DISPLAY listings
+Imports a wide organization twice, so the two share no spots, changes one copy with a few
+TRANSFER/FIRE/HIRE steps, then times diff() on the copies (subtree digests only), on two versions
+of one organization (shared subtrees), and a line diff of the two DISPLAY listings.
+
+Run from the repository root:  python benchmarks/bench_diff.py [fanout]
+e.g. python benchmarks/bench_diff.py 100   (President, VPs and Supervisors with 100 reports, ~1M employees)
+"""
+
+import difflib
+import io
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "WackyWidgetOrganization"))
+
+import employee
+from changes import diff
+from organization_manager import OrganizationManager
+
+FANOUT = 40
+STEPS = (1, 10, 100)    # Numbers of TRANSFER/FIRE/HIRE triples between the two organizations
+
+
+def build(fanout: int) -> OrganizationManager:
+    rows = [("P", "", "President")]
+    for v in range(fanout):
+        rows.append((f"V{v}", "P", None))
+        for s in range(fanout):
+            rows.append((f"S{v}_{s}", f"V{v}", None))
+            rows.extend((f"W{v}_{s}_{w}", f"S{v}_{s}", None) for w in range(fanout - 1))
+    return OrganizationManager.from_records(rows, echo=False)
+
+
+def change(org: OrganizationManager, fanout: int, start: int, count: int):
+    for i in range(start, start + count):
+        v, s = i % fanout, (i * 7) % fanout
+        org.transfer_employee("P", f"W{v}_{s}_0", f"S{(v + 1) % fanout}_{s}")
+        org.fire_employee("P", f"W{v}_{s}_1")
+        org.hire_employee(f"S{v}_{s}", f"X{i}")
+
+
+def timed(function, *args):
+    start = time.perf_counter()
+    result = function(*args)
+    return result, time.perf_counter() - start
+
+
+def main():
+    fanout = int(sys.argv[1]) if len(sys.argv) > 1 else FANOUT
+    saved = (list(employee.ROLE_LADDER), dict(employee.ROLE_CAPACITY))
+    employee.configure_roles(employee.ROLE_LADDER, {"President": fanout, "Vice President": fanout, "Supervisor": fanout})
+    try:
+        original, changed = build(fanout), build(fanout)
+        print(f"{len(original.employee_lookup):,} employees in each copy")
+        _, frozen = timed(original.snapshot)
+        changed.snapshot()
+        print(f"first snapshot (digests every spot)  {frozen * 1000:10.2f} ms")
+        done = 0
+        for steps in STEPS:
+            before = changed.snapshot()
+            change(changed, fanout, done, steps - done)
+            done = steps
+            after = changed.snapshot()
+            changes, copies = timed(diff, original.snapshot(), after)
+            _, versions = timed(diff, before, after)
+            print(f"{steps:4} triples, {len(changes):4} changes: diff of copies {copies * 1000:8.2f} ms, "
+                  f"of versions {versions * 1000:8.2f} ms")
+
+        listings = []
+        for org in (original, changed):
+            listing = io.StringIO()
+            org.display_organization(listing)
+            listings.append(listing.getvalue().splitlines())
+        start = time.perf_counter()
+        sum(1 for _ in difflib.unified_diff(*listings, lineterm="", n=0))
+        print(f"line diff of the DISPLAY listings    {(time.perf_counter() - start) * 1000:10.2f} ms")
+    finally:
+        employee.configure_roles(*saved)
+
+
+if __name__ == "__main__":
+    main()
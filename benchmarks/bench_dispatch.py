@@ -0,0 +1,90 @@
+"""
+Benchmark: cost of dispatching one command line, registry lookup vs. the old if/elif chain
+Both dispatchers drive a manager whose methods do nothing, so only the lookup, the argument
+count check and the call are measured. Reported per command, since the chain's cost grew with
+how far down the command sat.
+
+Run from the repository root:  python benchmarks/bench_dispatch.py [calls per command]
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "WackyWidgetOrganization"))
+
+from commands import COMMANDS, dispatch
+
+CALLS = 200_000
+
+
+class IdleManager:
+    # Accepts every command and does nothing
+    def hire_employee(self, manager, name): pass
+    def fire_employee(self, manager, name): pass
+    def employee_quits(self, name): pass
+    def layoff_employee(self, manager, name): pass
+    def transfer_employee(self, initiator, name, manager): pass
+    def promote_employee(self, manager, name): pass
+    def display_organization(self): pass
+
+
+def incorrect_argument_count(command):
+    print(f"Incorrect number of arguments for command {command}")
+
+
+def chain_dispatch(org_manager, parts):
+    # The if/elif chain main.main() used before the registry, without its error messages' text
+    command = parts[0].upper()
+    if command == "HIRE":
+        if len(parts) != 3:
+            return incorrect_argument_count(command)
+        org_manager.hire_employee(parts[1], parts[2])
+    elif command == "FIRE":
+        if len(parts) != 3:
+            return incorrect_argument_count(command)
+        org_manager.fire_employee(parts[1], parts[2])
+    elif command == "QUIT":
+        if len(parts) != 2:
+            return incorrect_argument_count(command)
+        org_manager.employee_quits(parts[1])
+    elif command == "LAYOFF":
+        if len(parts) != 3:
+            return incorrect_argument_count(command)
+        org_manager.layoff_employee(parts[1], parts[2])
+    elif command == "TRANSFER":
+        if len(parts) != 4:
+            return incorrect_argument_count(command)
+        org_manager.transfer_employee(parts[1], parts[2], parts[3])
+    elif command == "PROMOTE":
+        if len(parts) != 3:
+            return incorrect_argument_count(command)
+        org_manager.promote_employee(parts[1], parts[2])
+    elif command == "DISPLAY":
+        if len(parts) != 1:
+            return incorrect_argument_count(command)
+        org_manager.display_organization()
+    else:
+        print(f"Error: Unknown command '{command}'.")
+
+
+def per_call(function, org_manager, parts, calls: int) -> float:
+    start = time.perf_counter()
+    for _ in range(calls):
+        function(org_manager, parts)
+    return (time.perf_counter() - start) / calls * 1e9
+
+
+def main():
+    calls = int(sys.argv[1]) if len(sys.argv) > 1 else CALLS
+    org_manager = IdleManager()
+    print(f"{'command':10} {'if/elif':>10} {'registry':>10}   (ns per dispatch)")
+    for command in COMMANDS.values():
+        parts = [command.name.lower()] + [f"Name{i}" for i in range(command.words - 1)]
+        chain = per_call(chain_dispatch, org_manager, parts, calls)
+        registry = per_call(dispatch, org_manager, parts, calls)
+        print(f"{command.name:10} {chain:10.0f} {registry:10.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""
+Benchmark: streaming export throughput and memory
+Imports a wide organization, then exports it in each format, plain and gzip-compressed, reporting
+spots per second and file size. The peak memory of a streamed export is traced against building
+the same nested JSON document in memory with json.dumps.
+
+Run from the repository root:  python benchmarks/bench_export.py [fanout]
+e.g. python benchmarks/bench_export.py 100   (President, VPs and Supervisors with 100 reports, ~1M employees)
+"""
+
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "WackyWidgetOrganization"))
+
+import employee
+from organization_manager import OrganizationManager
+
+FANOUT = 40
+
+
+def build(fanout: int) -> OrganizationManager:
+    rows = [("P", "", "President")]
+    for v in range(fanout):
+        rows.append((f"V{v}", "P", None))
+        for s in range(fanout):
+            rows.append((f"S{v}_{s}", f"V{v}", None))
+            rows.extend((f"W{v}_{s}_{w}", f"S{v}_{s}", None) for w in range(fanout))
+    return OrganizationManager.from_records(rows, echo=False)
+
+
+def as_document(spot) -> dict:
+    # The nested document held in memory all at once, for comparison
+    return {"name": getattr(spot, "name", None), "role": spot.role,
+            "reports": [as_document(report) for report in spot.reports]}
+
+
+def main():
+    fanout = int(sys.argv[1]) if len(sys.argv) > 1 else FANOUT
+    saved = (list(employee.ROLE_LADDER), dict(employee.ROLE_CAPACITY))
+    employee.configure_roles(employee.ROLE_LADDER, {"President": fanout, "Vice President": fanout, "Supervisor": fanout})
+    try:
+        org = build(fanout)
+        spots = len(org.employee_lookup)
+        print(f"{spots:,} spots")
+        with tempfile.TemporaryDirectory() as directory:
+            for name in ("org.jsonl", "org.csv", "org.json", "org.jsonl.gz", "org.csv.gz", "org.json.gz"):
+                path = os.path.join(directory, name)
+                start = time.perf_counter()
+                org.export(path)
+                elapsed = time.perf_counter() - start
+                print(f"{name:14} {elapsed:7.2f} s  {spots / elapsed / 1e6:6.2f} M spots/s  "
+                      f"{os.path.getsize(path) / 2**20:8.1f} MiB")
+
+            tracemalloc.start()
+            org.export(os.path.join(directory, "traced.jsonl"))
+            streamed = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            tracemalloc.start()
+            with open(os.path.join(directory, "traced.json"), "w") as file:
+                file.write(json.dumps(as_document(org.president)))
+            in_memory = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+        print(f"peak memory, streamed export       {streamed / 2**20:10.2f} MiB")
+        print(f"peak memory, document in memory    {in_memory / 2**20:10.2f} MiB")
+    finally:
+        employee.configure_roles(*saved)
+
+
+if __name__ == "__main__":
+    main()
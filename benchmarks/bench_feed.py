@@ -0,0 +1,117 @@
+"""
+Benchmark: following an organization through a change feed vs. polling DISPLAY
+Builds a wide organization, then runs HIRE/TRANSFER/FIRE churn with and without a ChangeFeed
+attached, reporting what publishing adds to each command. A mirror that catches up with since()
+after every few commands is timed against one that re-reads the whole DISPLAY listing instead;
+only the polls themselves are timed, and the churn at its fastest of REPEAT runs.
+
+Run from the repository root:  python benchmarks/bench_feed.py [fanout]
+e.g. python benchmarks/bench_feed.py 60   (President and VPs with 60 reports, ~36k employees)
+"""
+
+import io
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "WackyWidgetOrganization"))
+
+import employee
+from changes import ChangeFeed
+from organization_manager import OrganizationManager
+
+FANOUT = 30
+WORKERS = 10
+CHURN = 3_000   # HIRE, TRANSFER, FIRE triples
+POLL_EVERY = 10  # Triples between two polls of a mirror
+REPEAT = 3      # Runs of each timed churn; the fastest counts
+
+
+def build(fanout: int) -> OrganizationManager:
+    org = OrganizationManager(echo=False)
+    org.initialize_president("P")
+    for v in range(fanout):
+        org.hire_employee("P", f"V{v}")
+        for s in range(fanout):
+            org.hire_employee(f"V{v}", f"S{v}_{s}")
+            for w in range(WORKERS - 1):
+                org.hire_employee(f"S{v}_{s}", f"W{v}_{s}_{w}")
+    return org
+
+
+def churn(org: OrganizationManager, supervisors: list, start: int, count: int, poll=None):
+    for i in range(start, start + count):
+        org.hire_employee(supervisors[i % len(supervisors)], f"X{i}")
+        org.transfer_employee("P", f"X{i}", supervisors[(i + 7) % len(supervisors)])
+        org.fire_employee("P", f"X{i}")
+        if poll is not None and i % POLL_EVERY == 0:
+            poll()
+
+
+def best(org: OrganizationManager, supervisors: list, start: int) -> float:
+    # Fastest of REPEAT runs of the churn, each with fresh names from start on
+    times = []
+    for run in range(REPEAT):
+        began = time.perf_counter()
+        churn(org, supervisors, start + run * CHURN, CHURN)
+        times.append(time.perf_counter() - began)
+    return min(times)
+
+
+def timed(poll, spent: list):
+    # poll, adding the time each call takes to spent[0]
+    def call():
+        began = time.perf_counter()
+        poll()
+        spent[0] += time.perf_counter() - began
+    return call
+
+
+def main():
+    fanout = int(sys.argv[1]) if len(sys.argv) > 1 else FANOUT
+    saved = (list(employee.ROLE_LADDER), dict(employee.ROLE_CAPACITY))
+    employee.configure_roles(employee.ROLE_LADDER, {"President": fanout, "Vice President": fanout, "Supervisor": WORKERS})
+    try:
+        org = build(fanout)
+        supervisors = [f"S{v}_{s}" for v in range(fanout) for s in range(fanout)]
+        commands = 3 * CHURN
+        print(f"{len(org.employee_lookup):,} employees, {commands:,} commands per run")
+
+        plain = best(org, supervisors, 0)
+
+        feed = ChangeFeed(limit=10 * POLL_EVERY)
+        feed.attach(org)
+        published = best(org, supervisors, REPEAT * CHURN)
+
+        mirror = {}
+        position = feed.sequence
+
+        def catch_up():
+            nonlocal position
+            for change in feed.since(position):
+                mirror[change.name] = (change.boss_after, change.role_after)
+            position = feed.sequence
+
+        # Only the polls are timed, not the churn between them
+        spent = [0.0]
+        churn(org, supervisors, 2 * REPEAT * CHURN, CHURN, timed(catch_up, spent))
+        following = spent[0]
+        feed.close()
+
+        spent = [0.0]
+        churn(org, supervisors, (2 * REPEAT + 1) * CHURN, CHURN,
+              timed(lambda: org.display_organization(io.StringIO()), spent))
+        displaying = spent[0]
+
+        polls = len(range(0, CHURN, POLL_EVERY))
+        print(f"churn without a feed              {plain / commands * 1e6:10.2f} us per command")
+        print(f"churn publishing to a feed        {published / commands * 1e6:10.2f} us per command "
+              f"({max(published - plain, 0) / commands * 1e6:.2f} us for the changes)")
+        print(f"mirror catching up with since()   {following / polls * 1e6:10.2f} us per poll")
+        print(f"mirror re-reading DISPLAY         {displaying / polls * 1e6:10.2f} us per poll")
+    finally:
+        employee.configure_roles(*saved)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""
+Benchmark: headcount() from the maintained tallies vs. walking the subtree
+Builds a wide organization, then asks for the headcount of every manager the way a dashboard
+poll would, once from the tallies and once by walking each subtree. Also reports what keeping
+the tallies current costs per HIRE/FIRE.
+
+Run from the repository root:  python benchmarks/bench_headcount.py [fanout]
+e.g. python benchmarks/bench_headcount.py 60   (President and VPs with 60 reports, ~200k employees)
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "WackyWidgetOrganization"))
+
+import employee
+from employee import Vacancy
+from organization_manager import OrganizationManager
+
+FANOUT = 30
+WORKERS = 10
+CHURN = 20_000
+
+
+def walk_headcount(person) -> tuple:
+    # What headcount() had to do before the tallies: visit the whole subtree
+    employees, vacancies, depth = 0, {}, 0
+    stack = [(report, 1) for report in person.reports]
+    while stack:
+        node, level = stack.pop()
+        depth = max(depth, level)
+        if isinstance(node, Vacancy):
+            vacancies[node.role] = vacancies.get(node.role, 0) + 1
+        else:
+            employees += 1
+        stack.extend((report, level + 1) for report in node.reports)
+    return employees, vacancies, depth
+
+
+def build(fanout: int) -> OrganizationManager:
+    org = OrganizationManager(echo=False)
+    org.initialize_president("P")
+    for v in range(fanout):
+        org.hire_employee("P", f"V{v}")
+        for s in range(fanout):
+            org.hire_employee(f"V{v}", f"S{v}_{s}")
+            for w in range(WORKERS):
+                org.hire_employee(f"S{v}_{s}", f"W{v}_{s}_{w}")
+    # Some vacancies to count
+    for v in range(0, fanout, 3):
+        org.fire_employee("P", f"S{v}_0")
+    return org
+
+
+def main():
+    fanout = int(sys.argv[1]) if len(sys.argv) > 1 else FANOUT
+    saved = (list(employee.ROLE_LADDER), dict(employee.ROLE_CAPACITY))
+    employee.configure_roles(employee.ROLE_LADDER, {"President": fanout, "Vice President": fanout, "Supervisor": WORKERS})
+    try:
+        org = build(fanout)
+        managers = [name for name, person in org.employee_lookup.items() if person.reports]
+        print(f"{len(org.employee_lookup):,} employees, {len(managers):,} managers")
+
+        start = time.perf_counter()
+        for name in managers:
+            org.headcount(name)
+        tallied = time.perf_counter() - start
+        start = time.perf_counter()
+        for name in managers:
+            walk_headcount(org.employee_lookup[name])
+        walked = time.perf_counter() - start
+        print(f"poll every manager, tallies  {tallied * 1000:10.2f} ms  ({tallied / len(managers) * 1e6:.2f} us each)")
+        print(f"poll every manager, walking  {walked * 1000:10.2f} ms  ({walked / len(managers) * 1e6:.2f} us each)")
+        print(f"President alone: tallies {timed(lambda: org.headcount('P')) * 1e6:.2f} us, "
+              f"walking {timed(lambda: walk_headcount(org.president), 3) * 1e3:.2f} ms")
+
+        supervisors = [f"S{v}_{s}" for v in range(fanout) for s in range(1, fanout)]
+        start = time.perf_counter()
+        for i in range(CHURN):
+            org.hire_employee(supervisors[i % len(supervisors)], f"X{i}")
+            org.fire_employee("P", f"X{i}")
+        churn = time.perf_counter() - start
+        print(f"HIRE + FIRE with tallies kept current  {churn / (2 * CHURN) * 1e6:.2f} us per command")
+    finally:
+        employee.configure_roles(*saved)
+
+
+def timed(call, repeat: int = 1000) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        call()
+    return (time.perf_counter() - start) / repeat
+
+
+if __name__ == "__main__":
+    main()
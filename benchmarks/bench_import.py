@@ -0,0 +1,78 @@
+"""
+Benchmark: bulk import with from_records vs. one hire_employee call per person
+Writes an HRIS-style CSV export of a wide organization, with the rows shuffled so managers often
+come after their reports, then builds the organization from it with read_records and
+from_records. Against that, hires the same people top-down, one call each.
+
+Run from the repository root:  python benchmarks/bench_import.py [fanout]
+e.g. python benchmarks/bench_import.py 100   (President, VPs and Supervisors with 100 reports, ~1M employees)
+"""
+
+import csv
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "WackyWidgetOrganization"))
+
+import employee
+from organization_manager import OrganizationManager
+from records import read_records
+
+FANOUT = 40
+
+
+def people(fanout: int) -> list:
+    # (name, manager, role) top-down
+    rows = [("P", "", "President")]
+    for v in range(fanout):
+        rows.append((f"V{v}", "P", "Vice President"))
+        for s in range(fanout):
+            rows.append((f"S{v}_{s}", f"V{v}", "Supervisor"))
+            rows.extend((f"W{v}_{s}_{w}", f"S{v}_{s}", "Worker") for w in range(fanout))
+    return rows
+
+
+def main():
+    fanout = int(sys.argv[1]) if len(sys.argv) > 1 else FANOUT
+    saved = (list(employee.ROLE_LADDER), dict(employee.ROLE_CAPACITY))
+    employee.configure_roles(employee.ROLE_LADDER, {"President": fanout, "Vice President": fanout, "Supervisor": fanout})
+    try:
+        rows = people(fanout)
+        shuffled = rows[:]
+        random.Random(0).shuffle(shuffled)
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "export.csv")
+            with open(path, "w", newline="") as file:
+                writer = csv.writer(file)
+                writer.writerow(("name", "manager", "role"))
+                writer.writerows(shuffled)
+            print(f"{len(rows):,} rows, {os.path.getsize(path) / 2**20:.1f} MiB of CSV")
+
+            start = time.perf_counter()
+            org = OrganizationManager.from_records(read_records(path), echo=False)
+            imported = time.perf_counter() - start
+            assert len(org.employee_lookup) == len(rows)
+
+        start = time.perf_counter()
+        org = OrganizationManager.from_records(rows, echo=False)
+        built = time.perf_counter() - start
+
+        start = time.perf_counter()
+        org = OrganizationManager(echo=False)
+        org.initialize_president("P")
+        for name, manager, _ in rows[1:]:
+            org.hire_employee(manager, name)
+        hired = time.perf_counter() - start
+
+        print(f"read_records + from_records (CSV)  {imported:8.2f} s")
+        print(f"from_records (records in memory)   {built:8.2f} s")
+        print(f"hire_employee per person           {hired:8.2f} s (rows in top-down order)")
+    finally:
+        employee.configure_roles(*saved)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""
+Benchmark: role and vacancy indexes vs. walking the tree
+Builds a wide organization with some vacancies, then times the staffing planner's questions:
+every Supervisor, every open Vice President and Supervisor slot, and every Worker under one VP.
+
+Run from the repository root:  python benchmarks/bench_indexes.py [fanout]
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "WackyWidgetOrganization"))
+
+import employee
+from employee import Vacancy
+from organization_manager import OrganizationManager
+
+FANOUT = 40
+WORKERS = 10
+REPEAT = 20
+
+
+def walk(org: OrganizationManager, matches, root=None) -> list:
+    # How these questions were answered before the indexes
+    found = []
+    stack = list((root or org.president).reports)
+    while stack:
+        node = stack.pop()
+        if matches(node):
+            found.append(node)
+        stack.extend(node.reports)
+    return found
+
+
+def build(fanout: int) -> OrganizationManager:
+    org = OrganizationManager(echo=False)
+    org.initialize_president("P")
+    for v in range(fanout):
+        org.hire_employee("P", f"V{v}")
+        for s in range(fanout):
+            org.hire_employee(f"V{v}", f"S{v}_{s}")
+            for w in range(WORKERS):
+                org.hire_employee(f"S{v}_{s}", f"W{v}_{s}_{w}")
+    for v in range(0, fanout, 4):
+        org.employee_quits(f"V{v}")
+        org.employee_quits(f"S{v + 1}_0")
+    return org
+
+
+def timed(call) -> float:
+    start = time.perf_counter()
+    for _ in range(REPEAT):
+        call()
+    return (time.perf_counter() - start) / REPEAT * 1000
+
+
+def main():
+    fanout = int(sys.argv[1]) if len(sys.argv) > 1 else FANOUT
+    saved = (list(employee.ROLE_LADDER), dict(employee.ROLE_CAPACITY))
+    employee.configure_roles(employee.ROLE_LADDER, {"President": fanout, "Vice President": fanout, "Supervisor": WORKERS})
+    try:
+        org = build(fanout)
+        print(f"{len(org.employee_lookup):,} employees, {len(org.vacancies()):,} vacancies")
+        vp = org.employee_lookup["V1"]
+        questions = [
+            ("all Supervisors",
+             lambda: org.employees_with_role("Supervisor"),
+             lambda: walk(org, lambda node: node.role == "Supervisor" and not isinstance(node, Vacancy))),
+            ("open Vice President slots",
+             lambda: org.vacancies("Vice President"),
+             lambda: walk(org, lambda node: isinstance(node, Vacancy) and node.role == "Vice President")),
+            ("all open slots",
+             lambda: org.vacancies(),
+             lambda: walk(org, lambda node: isinstance(node, Vacancy))),
+            ("Workers under V1",
+             lambda: org.employees_with_role("Worker", under="V1"),
+             lambda: walk(org, lambda node: node.role == "Worker" and not isinstance(node, Vacancy), vp)),
+            ("Supervisors under V1",
+             lambda: org.employees_with_role("Supervisor", under="V1"),
+             lambda: walk(org, lambda node: node.role == "Supervisor" and not isinstance(node, Vacancy), vp)),
+        ]
+        print(f"{'question':28} {'index ms':>10} {'walk ms':>10}")
+        for label, indexed, walked in questions:
+            assert {id(node) for node in indexed()} == {id(node) for node in walked()}
+            print(f"{label:28} {timed(indexed):10.3f} {timed(walked):10.3f}")
+    finally:
+        employee.configure_roles(*saved)
+
+
+if __name__ == "__main__":
+    main()
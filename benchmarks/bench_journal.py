@@ -0,0 +1,77 @@
+"""
+Benchmark: journal throughput with group commit, and recovery time for a long journal
+Journals a churning organization (HIRE then FIRE of the same worker, over and over) and
+compares one fsync per record with group commit. Then it simulates a crash and times recover(),
+which loads the newest checkpoint and replays only the records written after it
+(at most checkpoint_every, 100k by default, however long the journal has grown).
+
+Run from the repository root:  python benchmarks/bench_journal.py [records]
+e.g. python benchmarks/bench_journal.py 10000000
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "WackyWidgetOrganization"))
+
+import employee
+from organization_manager import OrganizationManager
+from journal import Journal, recover
+
+RECORDS = 1_000_000
+UNGROUPED = 2_000
+FANOUT = 30
+
+
+def build(directory: str, records: int, **options):
+    # Fills an organization, then hires and fires workers until records have been journaled
+    org = OrganizationManager(echo=False)
+    journal = Journal(directory, **options)
+    journal.attach(org)
+    org.initialize_president("P")
+    for v in range(FANOUT):
+        org.hire_employee("P", f"V{v}")
+        for s in range(FANOUT):
+            org.hire_employee(f"V{v}", f"S{v}_{s}")
+    supervisors = [f"S{v}_{s}" for v in range(FANOUT) for s in range(FANOUT)]
+    start = time.perf_counter()
+    count = 0
+    while journal.sequence < records:
+        manager = supervisors[count % len(supervisors)]
+        org.hire_employee(manager, f"W{count}")
+        org.fire_employee("P", f"W{count}")
+        count += 1
+    journal.sync()
+    return org, journal, time.perf_counter() - start
+
+
+def main():
+    records = int(sys.argv[1]) if len(sys.argv) > 1 else RECORDS
+    saved = (list(employee.ROLE_LADDER), dict(employee.ROLE_CAPACITY))
+    employee.configure_roles(employee.ROLE_LADDER, {"President": FANOUT, "Vice President": FANOUT, "Supervisor": 10})
+    try:
+        with tempfile.TemporaryDirectory() as directory:
+            _, journal, elapsed = build(directory, UNGROUPED, group_size=1)
+            journal.close()
+            print(f"fsync per record   {UNGROUPED:>12,} records  {UNGROUPED / elapsed:12,.0f} records/s")
+        with tempfile.TemporaryDirectory() as directory:
+            org, journal, elapsed = build(directory, records)
+            print(f"group commit       {records:>12,} records  {records / elapsed:12,.0f} records/s")
+            # Crash: the journal is never closed
+            del org, journal
+            start = time.perf_counter()
+            recovered = recover(directory, echo=False)
+            elapsed = time.perf_counter() - start
+            checkpointed = max(int(name[len("checkpoint-"):-4]) for name in os.listdir(directory) if name.startswith("checkpoint-"))
+            print(f"recover()          {recovered._journal.sequence:>12,} records  {elapsed:12.2f} s"
+                  f"  ({recovered._journal.sequence - checkpointed:,} replayed after the checkpoint)")
+            recovered._journal.close()
+    finally:
+        employee.configure_roles(*saved)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
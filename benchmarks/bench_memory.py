@@ -0,0 +1,126 @@
+"""
+Benchmark: memory held by an organization of slotted nodes vs. the previous node layout
+Builds a 1M-employee organization (capacities raised to 100 per manager) through
+OrganizationManager.apply_batch and measures it with tracemalloc. The same shape is then
+rebuilt from plain-class nodes that each own a ReportList, as Employee did before, and
+captured as a ColumnarOrg snapshot.
+
+Run from the repository root:  python benchmarks/bench_memory.py [employees]
+"""
+
+import gc
+import io
+import os
+import pickle
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "WackyWidgetOrganization"))
+
+import employee
+from employee import ReportList
+from organization_manager import OrganizationManager
+from columnar_store import ColumnarOrg
+
+EMPLOYEES = 1_000_000
+FANOUT = 100
+
+
+class PlainEmployee:
+    # The previous layout: per-instance __dict__ and a ReportList for every node
+    def __init__(self, name: str, role: str, boss=None):
+        self.name = name
+        self.role = role
+        self.boss = boss
+        self.reports = ReportList()
+        self.max_reports = employee.ROLE_CAPACITY.get(role, 0)
+        self.tour = None
+
+    def has_open_spot(self) -> bool:
+        return len(self.reports) < self.max_reports or bool(self.reports.vacancy_slots)
+
+
+def hire_commands(total: int):
+    # President -> VPs -> Supervisors -> Workers, FANOUT reports per manager, breadth first
+    yield from (("HIRE", "P", f"V{i}") for i in range(FANOUT))
+    supervisors = min(FANOUT * FANOUT, max(total // FANOUT, 1))
+    yield from (("HIRE", f"V{i % FANOUT}", f"S{i}") for i in range(supervisors))
+    workers = total - 1 - FANOUT - supervisors
+    yield from (("HIRE", f"S{i % supervisors}", f"W{i}") for i in range(workers))
+
+
+def measure(build):
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    kept = build()
+    elapsed = time.perf_counter() - start
+    gc.collect()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return kept, size, elapsed
+
+
+def build_org(total: int):
+    org = OrganizationManager(echo=False)
+    org.initialize_president("P")
+    results = org.apply_batch(hire_commands(total))
+    assert all(result.ok for result in results), "every hire should succeed"
+    return org
+
+
+def build_plain(total: int):
+    # Same shape and names as build_org, without the manager's lookup tables
+    nodes = {"P": PlainEmployee("P", "President")}
+    for _, boss_name, name in hire_commands(total):
+        boss = nodes[boss_name]
+        rank = employee.ROLE_RANK[boss.role] + 1
+        node = PlainEmployee(name, employee.ROLE_LADDER[rank], boss)
+        boss.reports.append(node)
+        nodes[name] = node
+    return nodes
+
+
+def build_slotted(total: int):
+    nodes = {"P": employee.Employee("P", "President")}
+    for _, boss_name, name in hire_commands(total):
+        boss = nodes[boss_name]
+        rank = employee.ROLE_RANK[boss.role] + 1
+        node = employee.Employee(name, employee.ROLE_LADDER[rank], boss)
+        boss.add_report(node)
+        nodes[name] = node
+    return nodes
+
+
+def main():
+    total = int(sys.argv[1]) if len(sys.argv) > 1 else EMPLOYEES
+    saved = (list(employee.ROLE_LADDER), dict(employee.ROLE_CAPACITY))
+    employee.configure_roles(employee.ROLE_LADDER, {"President": FANOUT, "Vice President": FANOUT, "Supervisor": FANOUT})
+    try:
+        print(f"{total:,} employees, {FANOUT} reports per manager")
+        org, org_size, org_time = measure(lambda: build_org(total))
+        print(f"  OrganizationManager     {org_size / 2**20:9.1f} MiB  {org_size / total:6.0f} B/employee  built in {org_time:.1f} s")
+        store, store_size, store_time = measure(lambda: ColumnarOrg.from_manager(org))
+        print(f"  ColumnarOrg snapshot    {store_size / 2**20:9.1f} MiB  {store_size / total:6.0f} B/employee  taken in {store_time:.1f} s")
+        blob, _, pickle_time = measure(lambda: pickle.dumps(store))
+        print(f"    pickled to one {len(blob) / 2**20:.1f} MiB blob in {pickle_time:.2f} s")
+        for label, source in (("OrganizationManager", org), ("ColumnarOrg", store)):
+            start = time.perf_counter()     # Timed without tracemalloc, which slows allocation down
+            source.display_organization(stream=io.StringIO())
+            print(f"    DISPLAY from {label:20} {time.perf_counter() - start:.2f} s")
+        del org, store, blob
+        sizes = {}
+        for label, build in (("Plain nodes", build_plain), ("Slotted nodes", build_slotted)):
+            nodes, sizes[label], _ = measure(lambda: build(total))
+            print(f"  {label:22}  {sizes[label] / 2**20:9.1f} MiB  {sizes[label] / total:6.0f} B/employee")
+            del nodes
+        saved_bytes = sizes["Plain nodes"] - sizes["Slotted nodes"]
+        print(f"  Slotted layout saves {saved_bytes / 2**20:.1f} MiB ({saved_bytes / sizes['Plain nodes']:.0%})")
+    finally:
+        employee.configure_roles(*saved)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
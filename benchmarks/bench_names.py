@@ -0,0 +1,133 @@
+"""
+Benchmark: name lookups against the NameRegistry vs. the previous all_names set + dict
+Builds a 1M-employee organization through OrganizationManager.apply_batch, then times
+  - validating and fetching names the old way (a set probe, then a dict probe) and the new
+    way (one get on employee_lookup),
+  - checking a bulk list of names for unknown ones one by one and with NameRegistry.missing(),
+    and resolving it one by one and with NameRegistry.resolve(),
+  - lookup-heavy commands run through apply_batch (failed TRANSFER/PROMOTE/FIRE checks),
+and reports the memory the dropped all_names set used to hold.
+
+Run from the repository root:  python benchmarks/bench_names.py [employees]
+"""
+
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "WackyWidgetOrganization"))
+
+import employee
+from organization_manager import OrganizationManager
+
+EMPLOYEES = 1_000_000
+FANOUT = 100
+PROBES = 1_000_000
+COMMANDS = 200_000
+
+
+def hire_commands(total: int):
+    # President -> VPs -> Supervisors -> Workers, FANOUT reports per manager, breadth first
+    yield from (("HIRE", "P", f"V{i}") for i in range(FANOUT))
+    supervisors = min(FANOUT * FANOUT, max(total // FANOUT, 1))
+    yield from (("HIRE", f"V{i % FANOUT}", f"S{i}") for i in range(supervisors))
+    workers = total - 1 - FANOUT - supervisors
+    yield from (("HIRE", f"S{i % supervisors}", f"W{i}") for i in range(workers))
+
+
+def old_probe(all_names: set, lookup: dict, names: list) -> int:
+    # What every command did before: check the set, then fetch from the dict
+    found = 0
+    for name in names:
+        if name in all_names:
+            found += lookup[name] is not None
+    return found
+
+
+def new_probe(lookup: dict, names: list) -> int:
+    found = 0
+    get = lookup.get
+    for name in names:
+        found += get(name) is not None
+    return found
+
+
+def loop_missing(lookup: dict, names: list) -> list:
+    missing, seen = [], set()
+    for name in names:
+        if name not in lookup and name not in seen:
+            seen.add(name)
+            missing.append(name)
+    return missing
+
+
+def loop_resolve(lookup: dict, names: list) -> list:
+    resolved = []
+    for name in names:
+        resolved.append(lookup.get(name))
+    return resolved
+
+
+def timed(call) -> tuple:
+    start = time.perf_counter()
+    result = call()
+    return result, time.perf_counter() - start
+
+
+def main():
+    total = int(sys.argv[1]) if len(sys.argv) > 1 else EMPLOYEES
+    saved = (list(employee.ROLE_LADDER), dict(employee.ROLE_CAPACITY))
+    employee.configure_roles(employee.ROLE_LADDER, {"President": FANOUT, "Vice President": FANOUT, "Supervisor": FANOUT})
+    try:
+        org = OrganizationManager(echo=False)
+        org.initialize_president("P")
+        assert all(result.ok for result in org.apply_batch(hire_commands(total)))
+        lookup = org.employee_lookup
+        rng = random.Random(7)
+        known = list(lookup)
+        # Fresh string objects, as names arrive from a parsed command line; one in ten unknown
+        names = [(rng.choice(known) if rng.random() < 0.9 else f"X{i}").encode().decode() for i in range(PROBES)]
+        print(f"{len(lookup):,} employees, {len(names):,} probes")
+
+        all_names = set(lookup)
+        old_found, old_time = timed(lambda: old_probe(all_names, lookup, names))
+        new_found, new_time = timed(lambda: new_probe(lookup, names))
+        assert old_found == new_found
+        print(f"  validate + fetch, set then dict   {old_time / len(names) * 1e9:7.1f} ns per name")
+        print(f"  validate + fetch, one get         {new_time / len(names) * 1e9:7.1f} ns per name")
+
+        loop_result, loop_time = timed(lambda: loop_missing(lookup, names))
+        bulk_result, bulk_time = timed(lambda: lookup.missing(names))
+        assert loop_result == bulk_result
+        print(f"  unknown names, loop               {loop_time * 1000:7.1f} ms  ({len(bulk_result):,} unknown)")
+        print(f"  unknown names, missing()          {bulk_time * 1000:7.1f} ms")
+
+        loop_result, loop_time = timed(lambda: loop_resolve(lookup, names))
+        bulk_result, bulk_time = timed(lambda: lookup.resolve(names))
+        assert loop_result == bulk_result
+        print(f"  resolve names, loop               {loop_time * 1000:7.1f} ms")
+        print(f"  resolve names, resolve()          {bulk_time * 1000:7.1f} ms")
+
+        workers = [name for name in known if name.startswith("W")]
+        commands = []
+        for i in range(COMMANDS):
+            # Rejected whatever the size: X names are never hired, and a Worker manages no one
+            worker, other = rng.sample(workers, 2)
+            commands.append([("TRANSFER", "V0", worker, f"X{i}"),
+                             ("PROMOTE", other, worker),
+                             ("FIRE", other, worker)][i % 3])
+        results, batch_time = timed(lambda: org.apply_batch(commands))
+        assert not any(result.ok for result in results)
+        print(f"  rejected TRANSFER/PROMOTE/FIRE    {batch_time / len(commands) * 1e6:7.2f} us per command")
+
+        del all_names
+        set_size = sys.getsizeof(set(lookup))
+        print(f"  all_names set no longer held      {set_size / 2**20:7.1f} MiB")
+    finally:
+        employee.configure_roles(*saved)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,100 @@
+"""
+Benchmark: structurally shared snapshots vs. copying the whole organization
+Builds a wide organization, then runs HIRE/FIRE churn with a VersionHistory attached, which keeps
+a FrozenOrg after every change. Reports the cost per change and the memory all kept versions take,
+against capturing a ColumnarOrg (a full copy) after every change.
+
+Run from the repository root:  python benchmarks/bench_snapshots.py [fanout]
+e.g. python benchmarks/bench_snapshots.py 60   (President and VPs with 60 reports, ~200k employees)
+"""
+
+import gc
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "WackyWidgetOrganization"))
+
+import employee
+from columnar_store import ColumnarOrg
+from organization_manager import OrganizationManager
+from persistent import VersionHistory
+
+FANOUT = 30
+WORKERS = 10
+CHURN = 5_000   # HIRE + FIRE pairs, so twice as many versions
+
+
+def build(fanout: int) -> OrganizationManager:
+    org = OrganizationManager(echo=False)
+    org.initialize_president("P")
+    for v in range(fanout):
+        org.hire_employee("P", f"V{v}")
+        for s in range(fanout):
+            org.hire_employee(f"V{v}", f"S{v}_{s}")
+            for w in range(WORKERS - 1):
+                org.hire_employee(f"S{v}_{s}", f"W{v}_{s}_{w}")
+    return org
+
+
+def churn(org: OrganizationManager, supervisors: list, start: int, count: int):
+    for i in range(start, start + count):
+        org.hire_employee(supervisors[i % len(supervisors)], f"X{i}")
+        org.fire_employee("P", f"X{i}")
+
+
+def main():
+    fanout = int(sys.argv[1]) if len(sys.argv) > 1 else FANOUT
+    saved = (list(employee.ROLE_LADDER), dict(employee.ROLE_CAPACITY))
+    employee.configure_roles(employee.ROLE_LADDER, {"President": fanout, "Vice President": fanout, "Supervisor": WORKERS})
+    try:
+        org = build(fanout)
+        supervisors = [f"S{v}_{s}" for v in range(fanout) for s in range(fanout)]
+        print(f"{len(org.employee_lookup):,} employees")
+
+        start = time.perf_counter()
+        churn(org, supervisors, 0, CHURN)
+        plain = (time.perf_counter() - start) / (2 * CHURN)
+
+        start = time.perf_counter()
+        org.snapshot()
+        first = time.perf_counter() - start
+        history = VersionHistory(limit=2 * CHURN + 1)
+        history.attach(org)
+        start = time.perf_counter()
+        churn(org, supervisors, CHURN, CHURN)
+        kept = (time.perf_counter() - start) / (2 * CHURN)
+        history.close()
+
+        # Memory is traced on a second run, as tracing slows every allocation down
+        del history
+        gc.collect()
+        tracemalloc.start()
+        history = VersionHistory(limit=2 * CHURN + 1)
+        history.attach(org)
+        churn(org, supervisors, 2 * CHURN, CHURN)
+        versions_memory = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        history.close()
+
+        start = time.perf_counter()
+        store = ColumnarOrg.from_manager(org)
+        columnar = time.perf_counter() - start
+        full_copy = len(store.to_bytes())
+
+        print(f"first snapshot (freezes every spot)  {first * 1000:10.2f} ms")
+        print(f"HIRE/FIRE without a history          {plain * 1e6:10.2f} us per change")
+        print(f"HIRE/FIRE keeping every version      {kept * 1e6:10.2f} us per change "
+              f"({(kept - plain) * 1e6:.2f} us for the snapshot)")
+        print(f"ColumnarOrg.from_manager             {columnar * 1000:10.2f} ms per change")
+        print(f"{len(history):,} kept versions take  {versions_memory / 2**20:10.2f} MiB "
+              f"({versions_memory / len(history):.0f} bytes each)")
+        print(f"{len(history):,} columnar copies would take {full_copy * len(history) / 2**20:10.2f} MiB "
+              f"({full_copy:,} bytes each)")
+    finally:
+        employee.configure_roles(*saved)
+
+
+if __name__ == "__main__":
+    main()
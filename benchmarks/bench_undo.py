@@ -0,0 +1,107 @@
+"""
+Benchmark: rolling a transaction back vs. restoring a full copy of the organization
+Builds a wide organization, then runs a reorg script of HIRE/TRANSFER/FIRE steps inside a
+transaction that fails at the end, so every step is rolled back. Reports the rollback time against
+capturing and restoring a ColumnarOrg (a full copy), and what keeping undo adds to each command;
+scripts run without and with undo are timed at their fastest of REPEAT runs.
+
+Run from the repository root:  python benchmarks/bench_undo.py [fanout]
+e.g. python benchmarks/bench_undo.py 60   (President and VPs with 60 reports, ~36k employees)
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "WackyWidgetOrganization"))
+
+import employee
+from columnar_store import ColumnarOrg
+from organization_manager import OrganizationManager
+
+FANOUT = 30
+WORKERS = 10
+STEPS = 3_000   # HIRE, TRANSFER, FIRE triples in the script
+REPEAT = 3      # Runs of each timed script; the fastest counts
+
+
+class Abort(Exception):
+    pass
+
+
+def build(fanout: int) -> OrganizationManager:
+    org = OrganizationManager(echo=False)
+    org.initialize_president("P")
+    for v in range(fanout):
+        org.hire_employee("P", f"V{v}")
+        for s in range(fanout):
+            org.hire_employee(f"V{v}", f"S{v}_{s}")
+            for w in range(WORKERS - 1):
+                org.hire_employee(f"S{v}_{s}", f"W{v}_{s}_{w}")
+    return org
+
+
+def script(org: OrganizationManager, supervisors: list, start: int, count: int):
+    for i in range(start, start + count):
+        org.hire_employee(supervisors[i % len(supervisors)], f"X{i}")
+        org.transfer_employee("P", f"X{i}", supervisors[(i + 7) % len(supervisors)])
+        org.fire_employee("P", f"X{i}")
+
+
+def best(org: OrganizationManager, supervisors: list, start: int) -> float:
+    # Fastest of REPEAT runs of the script, each with fresh names from start on
+    times = []
+    for run in range(REPEAT):
+        began = time.perf_counter()
+        script(org, supervisors, start + run * STEPS, STEPS)
+        times.append(time.perf_counter() - began)
+    return min(times)
+
+
+def main():
+    fanout = int(sys.argv[1]) if len(sys.argv) > 1 else FANOUT
+    saved = (list(employee.ROLE_LADDER), dict(employee.ROLE_CAPACITY))
+    employee.configure_roles(employee.ROLE_LADDER, {"President": fanout, "Vice President": fanout, "Supervisor": WORKERS})
+    try:
+        org = build(fanout)
+        supervisors = [f"S{v}_{s}" for v in range(fanout) for s in range(fanout)]
+        print(f"{len(org.employee_lookup):,} employees, {3 * STEPS:,} commands per script")
+
+        plain = best(org, supervisors, 0)
+
+        start = time.perf_counter()
+        try:
+            with org.transaction():
+                script(org, supervisors, REPEAT * STEPS, STEPS)
+                middle = time.perf_counter()
+                raise Abort
+        except Abort:
+            pass
+        end = time.perf_counter()
+        in_transaction, rollback = middle - start, end - middle
+
+        # Only the capture and the restore are timed, not the script between them
+        start = time.perf_counter()
+        store = ColumnarOrg.from_manager(org)
+        captured = time.perf_counter()
+        script(org, supervisors, (REPEAT + 1) * STEPS, STEPS)
+        restoring = time.perf_counter()
+        OrganizationManager.from_columnar(store, echo=False)
+        copying = captured - start + time.perf_counter() - restoring
+
+        org.keep_undo()
+        with_undo = best(org, supervisors, (REPEAT + 2) * STEPS)
+
+        commands = 3 * STEPS
+        print(f"script without undo               {plain * 1000:10.2f} ms ({plain / commands * 1e6:.2f} us per command)")
+        print(f"script inside a transaction       {in_transaction * 1000:10.2f} ms")
+        print(f"rolling the transaction back      {rollback * 1000:10.2f} ms")
+        print(f"full copy taken and restored      {copying * 1000:10.2f} ms")
+        print(f"script keeping undo               {with_undo * 1000:10.2f} ms "
+              f"({max(with_undo - plain, 0) / commands * 1e6:.2f} us per command for the undo stack)")
+    finally:
+        employee.configure_roles(*saved)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+Benchmark: indexed vacancy lookup vs. the original linear scan of `reports`
+Builds wide synthetic organizations (ROLE_CAPACITY raised to 10k) and times the
+capacity checks used by HIRE, TRANSFER, PROMOTE and LAYOFF.
+
+Run from the repository root:  python benchmarks/bench_vacancy_index.py
+"""
+
+import contextlib
+import io
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "WackyWidgetOrganization"))
+
+import employee
+from employee import Vacancy
+from organization_manager import OrganizationManager
+
+WIDTH = 10_000
+REPEAT = 200
+
+
+def scan_vacancy(manager) -> int:
+    # The pre-index implementation of _check_vancancy_objects
+    for index, report in enumerate(manager.reports):
+        if isinstance(report, Vacancy):
+            return index
+    return -1
+
+
+def scan_has_spots(manager):
+    # The pre-index implementation of _has_spots
+    if len(manager.reports) < manager.max_reports:
+        return True
+    index = scan_vacancy(manager)
+    if index != -1:
+        return index
+    return False
+
+
+def build_wide_org(width: int, vacancy_at: int | None):
+    # President -> one VP with `width` Supervisors (each with one Worker so firing leaves a vacancy)
+    for role in ("President", "Vice President", "Supervisor"):
+        employee.ROLE_CAPACITY[role] = width
+    org = OrganizationManager()
+    with contextlib.redirect_stdout(io.StringIO()):
+        org.initialize_president("P")
+        org.hire_employee("P", "VP")
+        for i in range(width):
+            org.hire_employee("VP", f"S{i}")
+            org.hire_employee(f"S{i}", f"W{i}")
+        if vacancy_at is not None:
+            org.fire_employee("P", f"S{vacancy_at}")
+    return org, org._find_employee("VP")
+
+
+def bench(label: str, org, vp):
+    indexed_vacancy = timeit.timeit(lambda: org._check_vancancy_objects(vp), number=REPEAT)
+    scanned_vacancy = timeit.timeit(lambda: scan_vacancy(vp), number=REPEAT)
+    indexed_spots = timeit.timeit(lambda: org._has_spots(vp), number=REPEAT)
+    scanned_spots = timeit.timeit(lambda: scan_has_spots(vp), number=REPEAT)
+    assert org._check_vancancy_objects(vp) == scan_vacancy(vp)
+    assert org._has_spots(vp) == scan_has_spots(vp)
+
+    print(f"\n{label}")
+    print(f"  _check_vancancy_objects  indexed {indexed_vacancy / REPEAT * 1e6:9.3f} us   "
+          f"scan {scanned_vacancy / REPEAT * 1e6:9.3f} us   x{scanned_vacancy / indexed_vacancy:,.0f}")
+    print(f"  _has_spots               indexed {indexed_spots / REPEAT * 1e6:9.3f} us   "
+          f"scan {scanned_spots / REPEAT * 1e6:9.3f} us   x{scanned_spots / indexed_spots:,.0f}")
+
+
+def main():
+    saved_capacity = dict(employee.ROLE_CAPACITY)
+    try:
+        print(f"Wide organization: one VP with {WIDTH:,} Supervisors, {REPEAT:,} calls per measurement")
+        bench("Full, no vacancy (worst case for the scan)", *build_wide_org(WIDTH, None))
+        bench("Full, vacancy in the last slot", *build_wide_org(WIDTH, WIDTH - 1))
+        bench("Full, vacancy in the middle", *build_wide_org(WIDTH, WIDTH // 2))
+    finally:
+        employee.ROLE_CAPACITY.clear()
+        employee.ROLE_CAPACITY.update(saved_capacity)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
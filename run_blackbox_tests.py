@@ -1,25 +1,144 @@
 """
 Black Box Test Automation for Wacky Widget Organization
-Independent testing - does NOT import their code, tests only via CLI interface
+Independent testing - tests only via the CLI interface (main.py's stdin/stdout)
 Team 2 - Independent Verification
+
+Usage: python run_blackbox_tests.py [--subprocess | --compare] [--jobs N]
+  (default)     run main.main() inside this process with stdin/stdout redirected
+  --subprocess  start a fresh "python WackyWidgetOrganization/main.py" per test
+  --compare     run every test both ways and report any test whose output differs
+  --jobs N      run the tests on N worker processes; reports still print in test order
 """
 
+import argparse
+import contextlib
+import importlib
+import io
+import multiprocessing
+import os
+import signal
 import subprocess
 import sys
+import time
+import traceback
 from typing import List, Tuple
 
+PROGRAM_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "WackyWidgetOrganization")
+TIMEOUT = 5     # seconds per test, in both modes
+POOL_GRACE = 5  # extra seconds to wait on a pool worker before giving its test up as timed out
+
+
+class ProgramTimeout(BaseException):
+    # Raised inside an in-process run that takes too long. Derives from BaseException
+    # so main.py's "except Exception" loop cannot swallow it.
+    pass
+
+
+class ScriptedInput(io.StringIO):
+    # stdin for an in-process run. A real process blocks or keeps failing at end of input,
+    # and would be killed by the timeout; here repeated reads past the end stop the run instead.
+    def __init__(self, text: str):
+        super().__init__(text)
+        self.reads_past_end = 0
+
+    def readline(self, *args):
+        line = super().readline(*args)
+        if not line:
+            self.reads_past_end += 1
+            if self.reads_past_end > 100:
+                raise ProgramTimeout()
+        return line
+
+
+def run_subprocess(all_input: str) -> str:
+    # Run the program as a black box
+    result = subprocess.run(
+        [sys.executable, "WackyWidgetOrganization/main.py"],
+        input=all_input,
+        capture_output=True,
+        text=True,
+        timeout=TIMEOUT
+    )
+    return result.stdout + result.stderr
+
+
+def run_in_process(all_input: str) -> str:
+    # Drives main.main() with redirected stdin/stdout/stderr after resetting the state
+    # a fresh interpreter would start with
+    if PROGRAM_DIR not in sys.path:
+        sys.path.insert(0, PROGRAM_DIR)
+    program = importlib.import_module("main")
+    manager_class = importlib.import_module("organization_manager").OrganizationManager
+    if "president" in vars(manager_class):
+        del manager_class.president
+    manager_class._active = None
+
+    stdout, stderr = io.StringIO(), io.StringIO()
+
+    def expire(signum, frame):
+        raise ProgramTimeout()
+
+    alarm = hasattr(signal, "SIGALRM")
+    if alarm:
+        previous = signal.signal(signal.SIGALRM, expire)
+        signal.setitimer(signal.ITIMER_REAL, TIMEOUT)
+    try:
+        with contextlib.redirect_stdout(stdout), contextlib.redirect_stderr(stderr):
+            saved_stdin, sys.stdin = sys.stdin, ScriptedInput(all_input)
+            try:
+                program.main()
+            except ProgramTimeout:
+                raise subprocess.TimeoutExpired("main.main()", TIMEOUT) from None
+            except Exception:
+                # What the interpreter would print for an uncaught exception
+                stderr.write(traceback.format_exc())
+            finally:
+                sys.stdin = saved_stdin
+    finally:
+        if alarm:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+            signal.signal(signal.SIGALRM, previous)
+    return stdout.getvalue() + stderr.getvalue()
+
+
+ENGINES = {"in-process": run_in_process, "subprocess": run_subprocess}
+
+
+def execute(modes: List[str], all_input: str) -> tuple:
+    # Runs one test's input under each mode. Returns (outputs, seconds, error), where error is
+    # None, "TIMEOUT" or an exception message. Runs in pool workers too, so it only returns plain data.
+    outputs, timings = {}, {}
+    for mode in modes:
+        start = time.perf_counter()
+        try:
+            outputs[mode] = ENGINES[mode](all_input)
+        except subprocess.TimeoutExpired:
+            return outputs, timings, "TIMEOUT"
+        except Exception as e:
+            return outputs, timings, f"{e}"
+        finally:
+            timings[mode] = time.perf_counter() - start
+    return outputs, timings, None
+
 
 class BlackBoxTester:
     """Runs the main.py program and interacts via stdin/stdout"""
     
-    def __init__(self):
+    def __init__(self, modes: List[str] = ("in-process",), jobs: int = 1):
         self.test_results = []
         self.passed = 0
         self.failed = 0
+        self.modes = list(modes)    # The first mode decides pass/fail; any others are checked against it
+        self.mode_mismatches = []
+        self.mode_seconds = {mode: 0.0 for mode in self.modes}
+        self.jobs = jobs
+        self.pool = None
+        self.pending = []           # (test, AsyncResult) for tests handed to the pool, in the order given
+        self.started = time.perf_counter()
         
     def run_test(self, test_id: str, description: str, 
                  inputs: List[str], expected_outputs: List[str],
-                 should_contain_all: bool = False) -> bool:
+                 should_contain_all: bool = False) -> bool | None:
         """
         Run a single black box test
         
@@ -29,25 +148,69 @@ class BlackBoxTester:
             inputs: List of commands to send to the program
             expected_outputs: List of strings that should appear in output
             should_contain_all: If True, ALL expected outputs must be present
+
+        With jobs > 1 the test is only handed to the worker pool and None is returned;
+        its report is printed, in the order the tests were given, by print_summary().
         """
+        # Prepare input
+        all_input = "\n".join(inputs) + "\n"
+        test = (test_id, description, inputs, expected_outputs, should_contain_all)
+
+        if self.jobs > 1:
+            if self.pool is None:
+                self.pool = multiprocessing.Pool(self.jobs)
+            self.pending.append((test, self.pool.apply_async(execute, (self.modes, all_input))))
+            return None
+        return self.record(test, execute(self.modes, all_input))
+
+    def collect(self):
+        # Prints the reports of every test still in the pool, in the order they were given.
+        # Workers enforce TIMEOUT themselves; the extra wait here only covers a worker that
+        # stopped answering, and such a test fails as timed out instead of stalling the run.
+        limit = TIMEOUT * len(self.modes) + POOL_GRACE
+        for test, pending in self.pending:
+            try:
+                outcome = pending.get(timeout=limit)
+            except multiprocessing.TimeoutError:
+                outcome = ({}, {}, "TIMEOUT")
+            except Exception as e:
+                outcome = ({}, {}, f"{e}")
+            self.record(test, outcome)
+        self.pending.clear()
+        if self.pool is not None:
+            # Every result is in, so terminating only stops workers still stuck on a given-up test
+            self.pool.terminate()
+            self.pool.join()
+            self.pool = None
+
+    def record(self, test: tuple, outcome: tuple) -> bool:
+        # Checks one test's output against its expectations and prints its report
+        test_id, description, inputs, expected_outputs, should_contain_all = test
+        outputs, timings, error = outcome
         print(f"\n{'='*70}")
         print(f"Running {test_id}: {description}")
         print(f"{'='*70}")
-        
-        # Prepare input
-        all_input = "\n".join(inputs) + "\n"
-        
+        for mode, seconds in timings.items():
+            self.mode_seconds[mode] += seconds
+
+        if error == "TIMEOUT":
+            print(f"\n[FAIL] {test_id} FAILED - Program timed out")
+            self.failed += 1
+            self.test_results.append({
+                'id': test_id,
+                'description': description,
+                'passed': False,
+                'output': 'TIMEOUT',
+                'seconds': timings
+            })
+            self.print_timings(test_id, timings)
+            return False
         try:
-            # Run the program as a black box
-            result = subprocess.run(
-                [sys.executable, "WackyWidgetOrganization/main.py"],
-                input=all_input,
-                capture_output=True,
-                text=True,
-                timeout=5
-            )
-            
-            output = result.stdout + result.stderr
+            if error is not None:
+                raise RuntimeError(error)
+            output = outputs[self.modes[0]]
+            if any(outputs[mode] != output for mode in self.modes[1:]):
+                self.mode_mismatches.append(test_id)
             
             print(f"Input commands: {inputs}")
             print(f"\nProgram output:\n{output}")
@@ -71,7 +234,8 @@ class BlackBoxTester:
                 'id': test_id,
                 'description': description,
                 'passed': passed,
-                'output': output
+                'output': output,
+                'seconds': timings
             })
             
             if passed:
@@ -80,19 +244,9 @@ class BlackBoxTester:
             else:
                 self.failed += 1
                 print(f"\n[FAIL] {test_id} FAILED")
+            self.print_timings(test_id, timings)
             
             return passed
-            
-        except subprocess.TimeoutExpired:
-            print(f"\n[FAIL] {test_id} FAILED - Program timed out")
-            self.failed += 1
-            self.test_results.append({
-                'id': test_id,
-                'description': description,
-                'passed': False,
-                'output': 'TIMEOUT'
-            })
-            return False
         except Exception as e:
             print(f"\n[FAIL] {test_id} FAILED - Exception: {e}")
             self.failed += 1
@@ -104,8 +258,14 @@ class BlackBoxTester:
             })
             return False
     
+    def print_timings(self, test_id: str, timings: dict):
+        spent = ", ".join(f"{mode} {seconds * 1000:.1f} ms" for mode, seconds in timings.items())
+        note = " - OUTPUT DIFFERS BETWEEN MODES" if test_id in self.mode_mismatches else ""
+        print(f"Time: {spent}{note}")
+
     def print_summary(self):
         """Print test execution summary"""
+        self.collect()
         print("\n" + "="*70)
         print("TEST EXECUTION SUMMARY")
         print("="*70)
@@ -115,6 +275,10 @@ class BlackBoxTester:
         if self.passed + self.failed > 0:
             pass_rate = (self.passed / (self.passed + self.failed)) * 100
             print(f"Pass Rate: {pass_rate:.1f}%")
+        for mode, seconds in self.mode_seconds.items():
+            print(f"Time ({mode}): {seconds:.2f} s")
+        if self.jobs > 1:
+            print(f"Time (wall clock, {self.jobs} jobs): {time.perf_counter() - self.started:.2f} s")
         print("="*70)
         
         if self.failed > 0:
@@ -123,10 +287,25 @@ class BlackBoxTester:
                 if not result['passed']:
                     print(f"  - {result['id']}: {result['description']}")
 
+        if len(self.modes) > 1:
+            print(f"\nOUTPUT DIFFERS BETWEEN MODES: {', '.join(self.mode_mismatches) or 'none'}")
+
 
 def main():
     """Run all black box tests"""
-    tester = BlackBoxTester()
+    parser = argparse.ArgumentParser(description="Black box tests for main.py")
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument("--subprocess", action="store_true", help="run each test in a fresh interpreter")
+    mode.add_argument("--compare", action="store_true", help="run each test both ways and compare the output")
+    parser.add_argument("--jobs", type=int, default=1, metavar="N", help="number of worker processes")
+    options = parser.parse_args()
+    if options.compare:
+        modes = ["in-process", "subprocess"]
+    elif options.subprocess:
+        modes = ["subprocess"]
+    else:
+        modes = ["in-process"]
+    tester = BlackBoxTester(modes, jobs=max(1, options.jobs))
     
     # ========== INITIALIZATION TESTS ==========
     
@@ -1922,6 +2101,8 @@ def main():
     tester.print_summary()
     
     # Return exit code based on results
+    if tester.mode_mismatches:
+        return 1
     return 0 if tester.failed == 0 else 1
 
 
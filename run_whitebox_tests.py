@@ -0,0 +1,1907 @@
+"""
+White Box Test Automation for Wacky Widget Organization
+Imports OrganizationManager directly and checks its internal indexes against
+straightforward reference implementations on randomized command sequences.
+"""
+
+import asyncio
+import contextlib
+import csv
+import gzip
+import io
+import json
+import os
+import pickle
+import random
+import re
+import struct
+import sys
+import tempfile
+import threading
+import time
+import zlib
+from typing import Callable, Tuple
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "WackyWidgetOrganization"))
+
+import employee
+from employee import Vacancy
+from organization_manager import OrganizationManager
+from columnar_store import ColumnarOrg
+from journal import Journal, recover
+from concurrency import ConcurrentOrganizationManager
+from server import OrganizationServer
+from persistent import VersionHistory
+from records import read_records
+from changes import Change, ChangeFeed, diff
+import main as program
+import commands
+from results import ActionResult
+
+NAMES = [f"N{i}" for i in range(60)]
+COMMANDS = ["HIRE", "FIRE", "QUIT", "LAYOFF", "TRANSFER", "PROMOTE"]
+WEIGHTS = [35, 8, 8, 15, 15, 15]
+
+
+# ----- Reference implementations (the original linear scans) -----
+
+def scan_has_spots(manager):
+    if len(manager.reports) < manager.max_reports:
+        return True
+    for index, report in enumerate(manager.reports):
+        if isinstance(report, Vacancy):
+            return index
+    return False
+
+
+def scan_slot(manager):
+    result = scan_has_spots(manager)
+    if result is True:
+        return -1, manager
+    elif result is not False:
+        return result, manager
+    return None
+
+
+def scan_find_opening(manager, role: str):
+    rank = employee.ROLE_RANK.get(role, 0)
+    if rank == 0:
+        return None, None
+    if rank == 1:
+        return scan_slot(manager) or (None, None)
+    if rank == 2:
+        found = scan_slot(manager)
+        if found:
+            return found
+        for report in manager.boss.reports:
+            if report is not manager:
+                found = scan_slot(report)
+                if found:
+                    return found
+        return None, None
+    found = scan_slot(manager)
+    if found:
+        return found
+    for report in manager.boss.reports:
+        if report is not manager:
+            found = scan_slot(report)
+            if found:
+                return found
+    for vp in manager.boss.boss.reports:
+        if vp is not manager.boss:
+            for report in vp.reports:
+                found = scan_slot(report)
+                if found:
+                    return found
+    return None, None
+
+
+def walk_is_superior(manager, person) -> bool:
+    current_boss = person.boss
+    while current_boss is not None:
+        if current_boss is manager:
+            return True
+        current_boss = current_boss.boss
+    return False
+
+
+def recursive_display(manager, level: int, max_depth=None) -> list:
+    # The original recursive _display_loop, collecting lines instead of printing them
+    lines = []
+    tab_indent = "\t" * level
+    for report in manager.reports:
+        if isinstance(report, Vacancy):
+            lines.append(f"{tab_indent}VACANCY: {report.role}")
+        else:
+            lines.append(f"{tab_indent}{report.role}: {report.name}")
+            if max_depth is None or level < max_depth:
+                lines.extend(recursive_display(report, level + 1, max_depth))
+    return lines
+
+
+def outcome(func, *args):
+    # Result of a call, or the exception it raised, in a comparable form
+    try:
+        return func(*args)
+    except Exception as e:
+        return f"{type(e).__name__}: {e}"
+
+
+# ----- Randomized command driver -----
+
+def random_command(rng: random.Random, org: OrganizationManager):
+    existing = list(org.employee_lookup)
+    pick = lambda: rng.choice(existing) if rng.random() < 0.9 else rng.choice(NAMES)
+    command = rng.choices(COMMANDS, WEIGHTS)[0]
+    if command == "HIRE":
+        return org.hire_employee, (pick(), rng.choice(NAMES))
+    if command == "FIRE":
+        return org.fire_employee, (pick(), pick())
+    if command == "QUIT":
+        return org.employee_quits, (pick(),)
+    if command == "LAYOFF":
+        return org.layoff_employee, (pick(), pick())
+    if command == "TRANSFER":
+        return org.transfer_employee, (pick(), pick(), pick())
+    return org.promote_employee, (pick(), pick())
+
+
+def has_cycle(org: OrganizationManager) -> bool:
+    # Some command sequences can move an employee under their own report (see BUG-007/008).
+    # Every later walk up the tree would then loop forever, so replay stops there.
+    limit = len(org.employee_lookup) * 2 + 2
+    for person in org.employee_lookup.values():
+        steps = 0
+        current_boss = person.boss
+        while current_boss is not None:
+            steps += 1
+            if steps > limit:
+                return True
+            current_boss = current_boss.boss
+    return False
+
+
+def replay(seed: int, steps: int, check: Callable[[OrganizationManager], str | None]) -> str | None:
+    # Applies random commands and runs check after each one. Returns the first mismatch, if any.
+    rng = random.Random(seed)
+    org = OrganizationManager()
+    with contextlib.redirect_stdout(io.StringIO()):
+        org.initialize_president("P")
+        for step in range(steps):
+            method, args = random_command(rng, org)
+            try:
+                method(*args)
+            except Exception:
+                pass
+            if has_cycle(org):
+                break
+            problem = check(org)
+            if problem:
+                return f"seed {seed}, step {step} ({method.__name__}{args}): {problem}"
+    return None
+
+
+def check_openings(org: OrganizationManager) -> str | None:
+    for name, person in org.employee_lookup.items():
+        expected = outcome(scan_has_spots, person)
+        actual = outcome(org._has_spots, person)
+        if actual != expected:
+            return f"_has_spots({name}) = {actual}, scan gives {expected}"
+        if person.boss is None:
+            continue
+        expected = outcome(scan_find_opening, person.boss, person.role)
+        actual = outcome(org._find_opening, person.boss, person.role)
+        if actual != expected:
+            return f"_find_opening for {name} = {actual}, scan gives {expected}"
+    return None
+
+
+def check_ancestry(org: OrganizationManager) -> str | None:
+    people = list(org.employee_lookup.items())
+    for manager_name, manager in people:
+        for name, person in people:
+            expected = walk_is_superior(manager, person)
+            if org._is_superior_to(manager, person) != expected:
+                return f"_is_superior_to({manager_name}, {name}) should be {expected}"
+    return None
+
+
+def check_display(org: OrganizationManager) -> str | None:
+    for name, person in list(org.employee_lookup.items())[:5]:
+        for max_depth in (None, 0, 1, 2):
+            below = recursive_display(person, 1, max_depth) if max_depth != 0 else []
+            expected = "".join(f"{line}\n" for line in [f"{person.role}: {name}"] + below)
+            stream = io.StringIO()
+            org.display_organization(stream=stream, max_depth=max_depth, root=name)
+            if stream.getvalue() != expected:
+                return f"display below {name} to depth {max_depth} differs from the recursive listing"
+    return None
+
+
+def display_listers_agree(seeds: range, steps: int) -> Tuple[bool, str]:
+    # The manager, a loaded copy, its columnar store and a snapshot list max_depth=0 as the root
+    # alone, and answer an unknown root with the same result, printing it only if echo is on
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "org.bin")
+        for seed in seeds:
+            rng = random.Random(seed)
+            org = OrganizationManager(echo=False)
+            org.initialize_president("P")
+            for _ in range(steps):
+                method, args = random_command(rng, org)
+                outcome(method, *args)
+            if has_cycle(org):
+                continue
+            listers = {"manager": org, "columnar store": ColumnarOrg.from_manager(org), "snapshot": org.snapshot()}
+            if tree_is_consistent(org):     # save() refuses the rest
+                org.save(path)
+                listers["loaded manager"] = OrganizationManager.load(path, echo=False)
+            # Known bugs can leave employees tracked but out of the tree, which is all a file or snapshot holds
+            in_tree = [name for name in org.employee_lookup if listers["columnar store"].find(name) is not None]
+            for name in in_tree[:5]:
+                person = org.employee_lookup[name]
+                for label, lister in listers.items():
+                    if listing(lister, root=name, max_depth=0) != f"{person.role}: {name}\n":
+                        return False, f"seed {seed}: {label} lists more than {name} at max_depth=0"
+            for label, lister in listers.items():
+                stream, printed = io.StringIO(), io.StringIO()
+                with contextlib.redirect_stdout(printed):
+                    result = lister.display_organization(stream=stream, root="Nobody")
+                if result != ActionResult("unknown_employee", ("Nobody",)) or stream.getvalue() or printed.getvalue():
+                    return False, f"seed {seed}: {label} answered an unknown root with {result!r}"
+            org.echo = True
+            printed = io.StringIO()
+            with contextlib.redirect_stdout(printed):
+                org.display_organization(stream=io.StringIO(), root="Nobody")
+            if printed.getvalue() != "Error: Employee name Nobody does not exist.\n":
+                return False, f"seed {seed}: an echoing manager printed {printed.getvalue()!r}"
+    return True, f"{len(seeds)} organizations listed alike by every lister at max_depth=0 and for an unknown root"
+
+
+def display_deep_chain(depth: int) -> Tuple[bool, str]:
+    # A single chain deeper than the recursion limit still displays in full
+    ladder = [f"Level{i}" for i in range(depth + 1)]
+    org = OrganizationManager()
+    with contextlib.redirect_stdout(io.StringIO()):
+        org.initialize_president("E0")
+        for i in range(1, depth + 1):
+            org.hire_employee(f"E{i - 1}", f"E{i}")
+    stream = io.StringIO()
+    org.display_organization(stream=stream)
+    lines = stream.getvalue().splitlines()
+    if len(lines) != depth + 1 or lines[-1] != "\t" * depth + f"{ladder[-1]}: E{depth}":
+        return False, f"expected {depth + 1} lines ending with E{depth}, got {len(lines)}"
+    return True, f"displayed a chain {depth:,} levels deep"
+
+
+def without_addresses(text: str) -> str:
+    # Errors from the known bugs can quote object reprs, which differ between two organizations
+    return re.sub(r"0x[0-9a-f]+", "0x", text)
+
+
+def batch_matches_calls(seed: int, steps: int) -> str | None:
+    # Drives one organization call by call, then replays the same operations through apply_batch
+    # and checks that each result renders to exactly what the call printed
+    rng = random.Random(seed)
+    commands = {method: command for command, (method, _) in OrganizationManager.BATCH_COMMANDS.items()}
+    direct = OrganizationManager()
+    with contextlib.redirect_stdout(io.StringIO()):
+        direct.initialize_president("P")
+    operations, printed = [], []
+    for _ in range(steps):
+        method, args = random_command(rng, direct)
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            try:
+                method(*args)
+            except Exception as e:
+                print(f"An unexpected error occurred: {e}")
+        operations.append((commands[method.__name__].lower(),) + args)
+        printed.append(tuple(without_addresses(output.getvalue()).splitlines()))
+        if has_cycle(direct):
+            break
+
+    batched = OrganizationManager()
+    with contextlib.redirect_stdout(io.StringIO()):
+        batched.initialize_president("P")
+    output = io.StringIO()
+    with contextlib.redirect_stdout(output):
+        results = batched.apply_batch(operations)
+    if output.getvalue():
+        return f"seed {seed}: apply_batch printed {output.getvalue()[:60]!r}"
+    for position, (result, expected) in enumerate(zip(results, printed)):
+        lines = tuple(without_addresses(result.message).splitlines())
+        if result.code in ("laid_off", "laid_off_vacated"):
+            lines = ("No comparable openings found",) + lines  # Printed before the removal starts
+        if lines != expected:
+            return f"seed {seed}, operation {position} {operations[position]}: {lines} != {expected}"
+        if result.ok == any(line.startswith(("Error:", "An unexpected error")) for line in expected):
+            return f"seed {seed}, operation {position}: ok is {result.ok} for {expected}"
+    shown = [io.StringIO(), io.StringIO()]
+    direct.display_organization(stream=shown[0])
+    batched.display_organization(stream=shown[1])
+    if shown[0].getvalue() != shown[1].getvalue():
+        return f"seed {seed}: organizations differ after the batch"
+    return None
+
+
+def batch_differential(seeds: range, steps: int) -> Tuple[bool, str]:
+    for seed in seeds:
+        problem = batch_matches_calls(seed, steps)
+        if problem:
+            return False, problem
+    return True, f"{len(seeds)} random batches of up to {steps} operations matched the individual calls"
+
+
+def batch_rejects_malformed() -> Tuple[bool, str]:
+    org = OrganizationManager()
+    with contextlib.redirect_stdout(io.StringIO()):
+        org.initialize_president("P")
+    try:
+        org.apply_batch([("HIRE", "P", "A"), ("FIRE", "P"), ("DANCE", "P"), ("QUIT", "A")])
+    except ValueError as e:
+        if "#1" not in str(e) or "#2" not in str(e):
+            return False, f"rejection does not list every bad operation: {e}"
+        if len(org.employee_lookup) != 1:
+            return False, "operations were applied from a rejected batch"
+        return True, "malformed batch rejected as a whole"
+    return False, "malformed batch was accepted"
+
+
+def quiet_results() -> Tuple[bool, str]:
+    # With echo off the methods print nothing and describe the change in their results
+    org = OrganizationManager(echo=False)
+    output = io.StringIO()
+    with contextlib.redirect_stdout(output):
+        org.initialize_president("P")
+        steps = [
+            (org.hire_employee("P", "V1"), ("hired", ("V1", "P"), "P", 0)),
+            (org.hire_employee("V1", "S1"), ("hired", ("S1", "V1"), "V1", 0)),
+            (org.hire_employee("S1", "W1"), ("hired", ("W1", "S1"), "S1", 0)),
+            (org.fire_employee("P", "S1"), ("vacated", ("S1",), "V1", 0)),
+            (org.hire_employee("V1", "S2"), ("hired", ("S2", "V1"), "V1", 1)),
+            (org.transfer_employee("P", "W1", "S2"), ("placed", ("W1", "S2"), "S2", 0)),
+            (org.employee_quits("W1"), ("removed", ("W1",), "S2", None)),
+            (org.hire_employee("W9", "X"), ("unknown_hiring_manager", ("W9",), None, None)),
+        ]
+    if output.getvalue():
+        return False, f"echo=False still printed {output.getvalue()!r}"
+    for result, expected in steps:
+        if tuple(result) != expected:
+            return False, f"{result} should be {expected}"
+    if steps[-1][0].ok or not steps[0][0].ok:
+        return False, "ok does not separate failures from successes"
+    return True, f"{len(steps)} results carried the expected codes, names and spots"
+
+
+def shared_leaf_reports() -> Tuple[bool, str]:
+    # Leaves share one empty report container that fails exactly like an empty ReportList
+    org = OrganizationManager(echo=False)
+    org.initialize_president("P")
+    org.hire_employee("P", "V1")
+    org.hire_employee("V1", "S1")
+    leaf, manager = org._find_employee("S1"), org._find_employee("V1")
+    if leaf.reports is not employee.NO_REPORTS or hasattr(leaf, "__dict__"):
+        return False, "a new leaf should be slotted and share NO_REPORTS"
+    if not isinstance(manager.reports, employee.ReportList):
+        return False, "a manager should own a ReportList after the first hire"
+    probes = [("index", (leaf,)), ("remove", (leaf,)), ("__setitem__", (0, leaf)), ("__delitem__", (0,)),
+              ("first_vacancy", ())]
+    for method, args in probes:
+        expected = outcome(getattr(employee.ReportList(), method), *args)
+        actual = outcome(getattr(employee.NO_REPORTS, method), *args)
+        if actual != expected:
+            return False, f"NO_REPORTS.{method} gives {actual}, an empty ReportList gives {expected}"
+    return True, f"leaves share NO_REPORTS and {len(probes)} list operations fail the same way"
+
+
+def listing(org, **options) -> str:
+    stream = io.StringIO()
+    org.display_organization(stream=stream, **options)
+    return stream.getvalue()
+
+
+def check_columnar(org: OrganizationManager) -> str | None:
+    # The columnar store, its pickled copy and the manager rebuilt from it all show the same organization
+    store = ColumnarOrg.from_manager(org)
+    copy = pickle.loads(pickle.dumps(store))
+    rebuilt = OrganizationManager.from_columnar(store, echo=False)
+    expected = listing(org)
+    for label, other in (("store", store), ("unpickled store", copy), ("rebuilt manager", rebuilt)):
+        if listing(other) != expected:
+            return f"{label} displays differently"
+    names = [name for name in org.employee_lookup if copy.find(name) is not None][:4]
+    for name in names:
+        if listing(copy, root=name, max_depth=1) != listing(org, root=name, max_depth=1):
+            return f"unpickled store displays the subtree of {name} differently"
+        for other in names:
+            if copy.is_superior_to(name, other) != walk_is_superior(org._find_employee(name), org._find_employee(other)):
+                return f"unpickled store disagrees on whether {name} is above {other}"
+    # Known bugs can leave employees tracked but detached from the tree; only the tree is captured
+    in_tree, stack = set(), [org.president]
+    while stack:
+        node = stack.pop()
+        if not isinstance(node, Vacancy):
+            in_tree.add(node.name)
+        stack.extend(node.reports)
+    if set(rebuilt.employee_lookup) != in_tree:
+        return "rebuilt manager tracks different names than the tree holds"
+    return check_openings(rebuilt) or check_ancestry(rebuilt)
+
+
+def counted_below(person) -> tuple:
+    # (employees, vacancies by role, depth) below person, counted by walking the subtree
+    employees, vacancies, depth = 0, {}, 0
+    stack = [(report, 1) for report in person.reports]
+    while stack:
+        node, level = stack.pop()
+        depth = max(depth, level)
+        if isinstance(node, Vacancy):
+            vacancies[node.role] = vacancies.get(node.role, 0) + 1
+        else:
+            employees += 1
+        stack.extend((report, level + 1) for report in node.reports)
+    return employees, vacancies, depth
+
+
+def check_headcount(org: OrganizationManager) -> str | None:
+    # headcount() matches a walk of each subtree, also after the manager is rebuilt from a snapshot
+    for name, person in org.employee_lookup.items():
+        if tuple(org.headcount(name)) != counted_below(person):
+            return f"headcount({name}) = {tuple(org.headcount(name))}, walk gives {counted_below(person)}"
+    if org.headcount("nobody") is not None:
+        return "headcount() of an unknown name is not None"
+    rebuilt = OrganizationManager.from_columnar(ColumnarOrg.from_manager(org), echo=False)
+    for name, person in rebuilt.employee_lookup.items():
+        if tuple(rebuilt.headcount(name)) != counted_below(person):
+            return f"rebuilt headcount({name}) = {tuple(rebuilt.headcount(name))}, walk gives {counted_below(person)}"
+    return None
+
+
+def check_indexes(org: OrganizationManager) -> str | None:
+    # Role and vacancy queries match a walk of the tree, with and without under
+    roles = set(employee.ROLE_LADDER)
+    for role in roles:
+        listed = {person.name for person in org.employees_with_role(role)}
+        if listed != {name for name, person in org.employee_lookup.items() if person.role == role}:
+            return f"employees_with_role({role!r}) differs from employee_lookup"
+    in_tree, stack = [], [org.president]
+    while stack:
+        node = stack.pop()
+        in_tree.append(node)
+        stack.extend(node.reports)
+    tree_vacancies = {id(node) for node in in_tree if isinstance(node, Vacancy)}
+    listed = {id(vacancy) for vacancy in org.vacancies()}
+    if not tree_vacancies <= listed:
+        return "vacancies() misses a vacancy in the tree"
+    # Known bugs can strand spots outside the tree; below them, the two query strategies may disagree
+    if listed != tree_vacancies or not tree_is_consistent(org):
+        return None
+    for name, person in org.employee_lookup.items():
+        below, stack = [], list(person.reports)
+        while stack:
+            node = stack.pop()
+            below.append(node)
+            stack.extend(node.reports)
+        for role in roles:
+            if {id(e) for e in org.employees_with_role(role, under=name)} != \
+                    {id(e) for e in below if not isinstance(e, Vacancy) and e.role == role}:
+                return f"employees_with_role({role!r}, under={name!r}) differs from a walk"
+            if {id(v) for v in org.vacancies(role, under=name)} != \
+                    {id(v) for v in below if isinstance(v, Vacancy) and v.role == role}:
+                return f"vacancies({role!r}, under={name!r}) differs from a walk"
+    if org.vacancies(under="nobody") is not None or org.employees_with_role("Worker", under="nobody") is not None:
+        return "a query under an unknown name is not None"
+    return None
+
+
+def check_names(org: OrganizationManager) -> str | None:
+    # employee_lookup is the only name table: keys interned and matching their Employee,
+    # and the bulk checks agree with probing one name at a time
+    lookup = org.employee_lookup
+    for name, person in lookup.items():
+        if person.name != name or sys.intern(name) is not name or person.name is not name:
+            return f"{name!r} is not interned or does not match its Employee"
+    probe = NAMES + ["P", "nobody"]
+    if lookup.missing(probe + probe) != [name for name in probe if name not in lookup]:
+        return "missing() differs from probing each name"
+    if lookup.resolve(probe) != [lookup.get(name) for name in probe]:
+        return "resolve() differs from probing each name"
+    if set(org.all_names) != set(lookup):
+        return "all_names differs from employee_lookup"
+    return None
+
+
+def tree_is_consistent(org: OrganizationManager) -> bool:
+    # False when a known bug left a boss pointer that disagrees with the reports lists,
+    # or a tracked employee or indexed vacancy outside the tree
+    stack, in_tree, vacancies = [org.president], set(), set()
+    while stack:
+        node = stack.pop()
+        if isinstance(node, Vacancy):
+            vacancies.add(node)
+        else:
+            in_tree.add(node.name)
+        for report in node.reports:
+            if report.boss is not node:
+                return False
+        stack.extend(node.reports)
+    return in_tree == set(org.employee_lookup) and vacancies == set(org.vacancies())
+
+
+def save_and_load(seeds: range, steps: int, manager: type = OrganizationManager) -> Tuple[bool, str]:
+    # DISPLAY is identical straight from the mapped file and after the objects are built,
+    # and a loaded organization is a manager of its own and behaves like the one that was saved
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "org.bin")
+        refused = 0
+        for seed in seeds:
+            rng = random.Random(seed)
+            org = OrganizationManager(echo=False)
+            org.initialize_president("P")
+            for _ in range(steps):
+                method, args = random_command(rng, org)
+                outcome(method, *args)
+                if has_cycle(org):
+                    break
+            if os.path.exists(path):
+                os.remove(path)
+            if has_cycle(org) or not tree_is_consistent(org):
+                # The file could not hold what a known bug left outside the tree, so save() refuses
+                try:
+                    org.save(path)
+                except ValueError:
+                    pass
+                else:
+                    return False, f"seed {seed}: save() wrote an organization whose tree and lookup disagree"
+                if os.listdir(directory):
+                    return False, f"seed {seed}: a refused save() left a file behind"
+                refused += 1
+                continue
+            org.save(path)
+            loaded = manager.load(path, echo=False)
+            if type(loaded) is not manager:
+                return False, f"seed {seed}: load() returned a {type(loaded).__name__}"
+            if listing(loaded) != listing(org) or listing(loaded, root="P", max_depth=1) != listing(org, root="P", max_depth=1):
+                return False, f"seed {seed}: DISPLAY from the loaded file differs"
+            if loaded._store is None:
+                return False, f"seed {seed}: DISPLAY built the objects instead of reading the file"
+            if set(loaded.employee_lookup) != set(org.employee_lookup) or listing(loaded) != listing(org):
+                return False, f"seed {seed}: the loaded organization differs once its objects are built"
+            for step in range(steps // 2):
+                method, args = random_command(rng, org)
+                expected = outcome(method, *args)
+                actual = outcome(getattr(loaded, method.__name__), *args)
+                if without_addresses(str(actual)) != without_addresses(str(expected)):
+                    return False, f"seed {seed}, step {step} after loading: {actual} != {expected}"
+            if listing(loaded) != listing(org) or type(loaded) is not manager:
+                return False, f"seed {seed}: organizations drifted apart after loading"
+    return True, f"{len(seeds) - refused} organizations saved, loaded and replayed identically, {refused} inconsistent ones refused"
+
+
+def journal_state(org: OrganizationManager) -> tuple:
+    # organization_state, and every employee's boss, which also places those a known bug left outside
+    # the tree. A reporting cycle leaves no listing or headcounts to compare, only the bosses.
+    bosses = {name: (getattr(person.boss, "name", None), getattr(person.boss, "role", None))
+              for name, person in org.employee_lookup.items()}
+    return bosses if has_cycle(org) else (organization_state(org), bosses)
+
+
+def journal_recovery(seeds: range, steps: int, manager: type = OrganizationManager) -> Tuple[bool, str]:
+    # Runs commands, and some undos, with a journal attached, tears the last write, recovers, keeps going
+    # and recovers again. Checkpoints are skipped while save() refuses the organization, so every
+    # recovery, inconsistent organizations included, must rebuild exactly what was journaled.
+    compared = refused_undos = 0
+    for seed in seeds:
+        rng = random.Random(seed)
+        with tempfile.TemporaryDirectory() as directory:
+            org = OrganizationManager(echo=False)
+            Journal(directory, group_size=8, checkpoint_every=50).attach(org)
+            org.initialize_president("P")
+            org.keep_undo()
+            for round_number in range(2):
+                for _ in range(steps):
+                    if rng.random() < 0.05:
+                        before = journal_state(org)
+                        try:
+                            org.undo()
+                        except ValueError:
+                            # The journal could not checkpoint the undo, so the unit is back in place
+                            if journal_state(org) != before:
+                                return False, f"seed {seed}: a refused undo changed the organization"
+                            refused_undos += 1
+                    else:
+                        method, args = random_command(rng, org)
+                        outcome(method, *args)
+                    if has_cycle(org):
+                        break
+                journal = org._journal
+                journal.sync()
+                with open(journal._segment.name, "ab") as segment:
+                    segment.write(b"\x20\x00\x00\x00torn")    # A record header whose payload never made it
+                journal._segment.close()
+                recovered = recover(directory, echo=False, manager=manager, group_size=8, checkpoint_every=50)
+                if type(recovered) is not manager:
+                    return False, f"seed {seed}, round {round_number}: recover() returned a {type(recovered).__name__}"
+                if journal_state(recovered) != journal_state(org):
+                    return False, f"seed {seed}, round {round_number}: recovered organization differs"
+                compared += 1
+                if has_cycle(org):
+                    break
+                org = recovered
+                org.keep_undo()
+    return True, (f"{compared} recoveries across {len(seeds)} journals rebuilt the same organization; "
+                  f"{refused_undos} undos the journal could not checkpoint were put back")
+
+
+def concurrent_loading() -> Tuple[bool, str]:
+    # A subclass loaded from a file or recovered from a journal is still that subclass, before and
+    # after its objects are built
+    for check in (save_and_load(range(10), 300, ConcurrentOrganizationManager),
+                  journal_recovery(range(10), 150, ConcurrentOrganizationManager)):
+        if not check[0]:
+            return check
+    return True, "loaded and recovered ConcurrentOrganizationManagers stayed concurrent"
+
+
+def journal_flushes_when_idle() -> Tuple[bool, str]:
+    # A change followed by no other reaches the disk within group_delay without sync(), and a name
+    # too long for a 16-bit length prefix is journaled and recovered like any other
+    with tempfile.TemporaryDirectory() as directory:
+        org = OrganizationManager(echo=False)
+        journal = Journal(directory, group_size=256, group_delay=0.05)
+        journal.attach(org)
+        org.initialize_president("P")
+        long_name = "L" * 70_000
+        org.hire_employee("P", long_name)
+        time.sleep(0.5)
+        if journal.synced != journal.sequence:
+            return False, f"{journal.sequence - journal.synced} records still unsynced after the group delay"
+        recovered = recover(directory, echo=False)
+        journal.close()
+        if listing(recovered) != listing(org) or long_name not in recovered.employee_lookup:
+            return False, "recover() did not rebuild the acknowledged changes"
+        recovered._journal.close()
+    return True, "an idle journal synced its last group on time, a 70,000-character name included"
+
+
+def journal_segment_headers() -> Tuple[bool, str]:
+    # A segment written before segments had a header (16-bit name lengths) is rejected, not misread,
+    # and a header cut short by a crash is dropped and written again when the journal carries on
+    with tempfile.TemporaryDirectory() as directory:
+        org = OrganizationManager(echo=False)
+        Journal(directory).attach(org)
+        org._journal.close()
+        checkpoint = sorted(os.listdir(directory))[0]
+        name = "P".encode("utf-8")
+        payload = struct.pack("<QB", 1, 0) + struct.pack("<H", len(name)) + name
+        segment = os.path.join(directory, "journal-0000000000000001.log")
+        with open(segment, "wb") as file:
+            file.write(struct.pack("<II", len(payload), zlib.crc32(payload)) + payload)
+        try:
+            recover(directory, echo=False)
+        except ValueError:
+            pass
+        else:
+            return False, "recover() read a segment without a header"
+        with open(segment, "wb") as file:
+            file.write(b"WW")
+        recovered = recover(directory, echo=False)
+        recovered.initialize_president("P")
+        recovered._journal.close()
+        again = recover(directory, echo=False)
+        again._journal.close()
+        if listing(again) != listing(recovered) or sorted(os.listdir(directory)) != [checkpoint, os.path.basename(segment)]:
+            return False, "a journal whose segment header was cut short did not carry on"
+    return True, "a headerless segment was rejected and a torn header was written again"
+
+
+PROMPTS = [
+    "\nWelcome to the Wacky Widget Company System.\n",
+    "Welcome to the Wacky Widget Company System.\n",
+    "Please enter the President's name to begin: ",
+    "Available commands: HIRE, FIRE, QUIT, LAYOFF, TRANSFER, PROMOTE, DISPLAY, EXIT.\n",
+    "\nEnter command: ",
+]
+
+
+def random_script(rng: random.Random, length: int) -> list:
+    # Command lines as a user would type them, including unknown commands and wrong argument counts
+    lines = ["P"]
+    for _ in range(length):
+        command = rng.choice(COMMANDS + ["DISPLAY", "display", "BOGUS", ""])
+        arguments = rng.choices(["P"] + NAMES[:15], k=rng.choice([0, 1, 2, 2, 2, 3]))
+        lines.append(" ".join([command] + arguments))
+    return lines + ["EXIT", "DISPLAY"]
+
+
+def script_matches_interactive(seeds: range, length: int) -> Tuple[bool, str]:
+    # run_script() prints what the interactive loop prints for the same lines, minus banners and
+    # prompts; every script ends with EXIT, so the farewell line is compared too
+    for seed in seeds:
+        lines = random_script(random.Random(seed), length)
+        interactive, scripted = io.StringIO(), io.StringIO()
+        saved_stdin, sys.stdin = sys.stdin, io.StringIO("\n".join(lines) + "\n")
+        try:
+            with contextlib.redirect_stdout(interactive):
+                program.main()
+        finally:
+            sys.stdin = saved_stdin
+        with contextlib.redirect_stdout(scripted):
+            program.run_script(line + "\n" for line in lines)
+        expected = interactive.getvalue()
+        for prompt in PROMPTS:
+            expected = expected.replace(prompt, "")
+        if scripted.getvalue() != expected:
+            return False, f"seed {seed}: script output differs from the interactive session"
+    return True, f"{len(seeds)} scripts of {length} commands printed the interactive output without prompts"
+
+
+def registry_matches_batch(seeds: range, length: int) -> Tuple[bool, str]:
+    # Lines dispatched through the command registry do what apply_batch() does with the same words
+    batch_commands = {command.name: command.words for command in commands.COMMANDS.values() if command.batch}
+    if set(batch_commands) != set(OrganizationManager.BATCH_COMMANDS):
+        return False, "registry and BATCH_COMMANDS list different commands"
+    for seed in seeds:
+        lines = [line.split() for line in random_script(random.Random(seed), length)[1:-2]]
+        lines = [parts for parts in lines if parts and batch_commands.get(parts[0].upper()) == len(parts)]
+        dispatched, batched = OrganizationManager(echo=False), OrganizationManager(echo=False)
+        dispatched.initialize_president("P")
+        batched.initialize_president("P")
+        expected = batched.apply_batch(lines)
+        actual = []
+        for parts in lines:
+            try:
+                actual.append(commands.dispatch(dispatched, parts))
+            except Exception as e:
+                actual.append(ActionResult("unexpected_error", (str(e),)))
+        if [without_addresses(repr(result)) for result in actual] != [without_addresses(repr(result)) for result in expected]:
+            return False, f"seed {seed}: dispatch and apply_batch returned different results"
+        if listing(dispatched) != listing(batched):
+            return False, f"seed {seed}: dispatch and apply_batch built different organizations"
+    try:
+        commands.register("HIRE", "fire_employee", "ManagerName", "EmployeeName")
+        return False, "register() accepted a second HIRE"
+    except ValueError:
+        pass
+    return True, f"{len(seeds)} scripts dispatched like apply_batch; duplicate registration rejected"
+
+
+def concurrent_command(rng: random.Random, org: OrganizationManager):
+    # Like random_command, but PROMOTE names a receiving manager two rungs above the target.
+    # Promoting within one rung (BUG-007/008) can leave a reporting cycle, and a walk up
+    # a cycle never ends, whichever thread is walking.
+    method, args = random_command(rng, org)
+    if method.__name__ != "promote_employee":
+        return method, args
+    people = list(org.employee_lookup.items())
+    target = rng.choice(people)
+    rank = employee.ROLE_RANK.get(target[1].role, 0)
+    above = [name for name, person in people if employee.ROLE_RANK.get(person.role) == rank - 2]
+    return org.promote_employee, (rng.choice(above or [name for name, _ in people]), target[0])
+
+
+def organization_state(org: OrganizationManager) -> tuple:
+    # Everything the checks compare: the listing, every headcount and both indexes
+    return (listing(org),
+            {name: tuple(org.headcount(name)) for name in org.employee_lookup},
+            {role: sorted(person.name for person in org.employees_with_role(role)) for role in employee.ROLE_LADDER},
+            sorted(vacancy.role for vacancy in org.vacancies()))
+
+
+def concurrent_stress(seeds: range, threads: int, steps: int) -> Tuple[bool, str]:
+    # Threads issue mixed commands to one ConcurrentOrganizationManager while the invariants are
+    # checked between commands. Afterwards the journal, replayed in one thread, must rebuild the
+    # same organization: the threads' commands took effect in the order they were recorded.
+    switch_interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)     # Switch threads often, so commands interleave
+    checked = 0
+    try:
+        for seed in seeds:
+            with tempfile.TemporaryDirectory() as directory:
+                org = ConcurrentOrganizationManager(echo=False)
+                Journal(directory, group_size=8, checkpoint_every=10**9).attach(org)
+                org.initialize_president("P")
+                failures = []
+
+                def issue(number: int):
+                    rng = random.Random(seed * 1000 + number)
+                    try:
+                        for _ in range(steps):
+                            method, args = concurrent_command(rng, org)
+                            outcome(method, *args)
+                    except BaseException as e:
+                        failures.append(f"thread {number}: {type(e).__name__}: {e}")
+
+                workers = [threading.Thread(target=issue, args=(number,)) for number in range(threads)]
+                for worker in workers:
+                    worker.start()
+                while any(worker.is_alive() for worker in workers):
+                    with org.exclusive():
+                        problem = check_headcount(org) or check_indexes(org) or check_names(org) or check_openings(org)
+                    if problem:
+                        failures.append(problem)
+                        break
+                    checked += 1
+                    time.sleep(0.005)   # Let the threads get some commands in
+                for worker in workers:
+                    worker.join()
+                if failures:
+                    return False, f"seed {seed}: {failures[0]}"
+                org._journal.close()
+                replayed = recover(directory, echo=False)
+                if organization_state(replayed) != organization_state(org):
+                    return False, f"seed {seed}: replaying the journal in one thread built a different organization"
+    finally:
+        sys.setswitchinterval(switch_interval)
+    return True, (f"{len(seeds)} runs of {threads} threads x {steps} commands matched a serial replay; "
+                  f"invariants held at {checked} checks in between")
+
+
+def concurrent_batches(seeds: range, threads: int, batches: int) -> Tuple[bool, str]:
+    # Threads run apply_batch on one ConcurrentOrganizationManager with echo on while another
+    # thread hires one name at a time: the batches print nothing, every single hire prints its
+    # message, and echo is still on afterwards
+    for seed in seeds:
+        org = ConcurrentOrganizationManager(echo=True)
+        output = io.StringIO()
+        failures = []
+
+        def batch(number: int):
+            try:
+                for round_number in range(batches):
+                    name = f"B{number}_{round_number}"
+                    org.apply_batch([("HIRE", "P", name), ("QUIT", name)])
+            except BaseException as e:
+                failures.append(f"batch thread {number}: {type(e).__name__}: {e}")
+
+        def single():
+            for number in range(batches):
+                org.hire_employee("P", f"S{number}")
+                org.employee_quits(f"S{number}")
+
+        with contextlib.redirect_stdout(output):
+            org.initialize_president("P")
+            workers = [threading.Thread(target=batch, args=(number,)) for number in range(threads)]
+            workers.append(threading.Thread(target=single))
+            for worker in workers:
+                worker.start()
+            for worker in workers:
+                worker.join()
+        if failures:
+            return False, f"seed {seed}: {failures[0]}"
+        if not org.echo:
+            return False, f"seed {seed}: echo was left off"
+        lines = output.getvalue().splitlines()
+        if any("B" in line for line in lines):
+            return False, f"seed {seed}: a batch printed"
+        if sum(line.startswith("Successfully hired S") for line in lines) != batches:
+            return False, f"seed {seed}: hires outside the batches went unprinted"
+    return True, f"{len(seeds)} runs of {threads} batch threads left echo on and printed only the single commands"
+
+
+def dispatched_output(org: OrganizationManager, parts: list) -> str:
+    # What the REPL prints for one command line
+    output = io.StringIO()
+    with contextlib.redirect_stdout(output):
+        try:
+            commands.dispatch(org, parts)
+        except Exception as e:
+            print(f"An unexpected error occurred: {e}")
+    return output.getvalue()
+
+
+async def exchange(connect, lines: list) -> list:
+    # Sends every line without waiting for responses, reading one response per line meanwhile
+    # (a client that stops reading until it has sent everything can fill both socket buffers)
+    reader, writer = await connect()
+    writer.write("".join(line + "\n" for line in lines).encode())
+    sending = asyncio.create_task(writer.drain())
+    responses = [(await reader.readuntil(b"\n\n"))[:-1].decode() for _ in lines]
+    await sending
+    writer.close()
+    await writer.wait_closed()
+    return responses
+
+
+def server_matches_dispatch(seeds: range, length: int) -> Tuple[bool, str]:
+    # One client pipelining a whole script over TCP gets, line by line, what the REPL prints
+    async def run(lines: list) -> list:
+        org = OrganizationManager()
+        with contextlib.redirect_stdout(io.StringIO()):
+            org.initialize_president("P")
+        server = await OrganizationServer(org, pipeline_depth=16).start()
+        try:
+            host, port = server.address[:2]
+            return await exchange(lambda: asyncio.open_connection(host, port), lines)
+        finally:
+            await server.close()
+
+    for seed in seeds:
+        lines = [line for line in random_script(random.Random(seed), length)[1:-2] if line]
+        expected = OrganizationManager()
+        with contextlib.redirect_stdout(io.StringIO()):
+            expected.initialize_president("P")
+        expected = [dispatched_output(expected, line.split()) for line in lines]
+        if asyncio.run(run(lines + ["EXIT"])) != expected + ["Exiting Wacky Widget HR System.\n"]:
+            return False, f"seed {seed}: served responses differ from the REPL's"
+    return True, f"{len(seeds)} pipelined scripts of {length} commands answered like the REPL"
+
+
+def server_clients(seeds: range, clients: int, length: int) -> Tuple[bool, str]:
+    # Many clients pipelining over a Unix socket: every line is answered once, each client's DISPLAY
+    # shows its own earlier hire, and the journal the writer kept replays to the served organization
+    names = ["P"] + NAMES[:30]
+    served = 0
+
+    async def client(connect, rng: random.Random, number: int) -> str | None:
+        lines = [f"HIRE P C{number}", "DISPLAY"]
+        for _ in range(length):
+            command = rng.choice(["HIRE", "HIRE", "FIRE", "QUIT", "LAYOFF", "TRANSFER", "DISPLAY"])
+            arguments = {"HIRE": 2, "FIRE": 2, "QUIT": 1, "LAYOFF": 2, "TRANSFER": 3, "DISPLAY": 0}[command]
+            lines.append(" ".join([command] + rng.choices(names, k=arguments)))
+        responses = await exchange(connect, lines)
+        if len(responses) != len(lines):
+            return f"client {number} got {len(responses)} responses to {len(lines)} lines"
+        if responses[0].startswith("Successfully") and f": C{number}\n" not in responses[1]:
+            return f"client {number}'s DISPLAY is missing its own hire"
+        for line, response in zip(lines, responses):
+            if line == "DISPLAY" and not response.startswith("President: P\n"):
+                return f"client {number} got {response!r} for DISPLAY"
+        return None
+
+    async def run(seed: int, directory: str):
+        org = OrganizationManager(echo=True)
+        Journal(directory, group_size=8, checkpoint_every=10**9).attach(org)
+        with contextlib.redirect_stdout(io.StringIO()):
+            org.initialize_president("P")
+        path = os.path.join(directory, "server.sock")
+        server = await OrganizationServer(org, pipeline_depth=8).start(path=path)
+        try:
+            connect = lambda: asyncio.open_unix_connection(path)
+            problems = await asyncio.gather(*(client(connect, random.Random(seed * 100 + number), number)
+                                              for number in range(clients)))
+            # A new connection may be shown a snapshot up to snapshot_age old; let that one expire
+            await asyncio.sleep(server.snapshot_age)
+            final = (await exchange(connect, ["DISPLAY"]))[0]
+        finally:
+            await server.close()
+        org._journal.close()
+        return [problem for problem in problems if problem], final, org
+
+    for seed in seeds:
+        with tempfile.TemporaryDirectory() as directory:
+            problems, final, org = asyncio.run(run(seed, directory))
+            if problems:
+                return False, f"seed {seed}: {problems[0]}"
+            if final != listing(org):
+                return False, f"seed {seed}: DISPLAY after the clients finished is stale"
+            if listing(recover(directory, echo=False)) != final:
+                return False, f"seed {seed}: the journal replays to a different organization"
+            served += clients * (length + 2)
+    return True, f"{served} lines from {len(seeds)} x {clients} concurrent clients answered once each; journals replayed"
+
+
+def version_history(seeds: range, steps: int, limit: int) -> Tuple[bool, str]:
+    # A VersionHistory attached from the start keeps each version as it was: every kept version
+    # displays what the manager displayed right after that change, and a version only holds
+    # new spots along the paths from the changed spots up to the President
+    kept = 0
+    for seed in seeds:
+        rng = random.Random(seed)
+        org = OrganizationManager(echo=False)
+        history = VersionHistory(limit=limit)
+        history.attach(org)
+        org.initialize_president("P")
+        listings = {0: "Organization is empty.\n", 1: listing(org)}
+        for step in range(steps):
+            method, args = random_command(rng, org)
+            outcome(method, *args)
+            if has_cycle(org):
+                break
+            listings[history.version] = listing(org)
+            if history.version < 2:
+                continue
+            before = {id(spot) for spot, _ in history.at(history.version - 1).spots()}
+            copied = sum(id(spot) not in before for spot, _ in history.latest.spots())
+            levels = org.president.tally.height + 1 if org.president.tally else 1
+            if copied > 3 * levels + 1:
+                return False, f"seed {seed}, step {step}: {copied} spots copied in a tree {levels} levels deep"
+        if len(history) != min(limit, history.version + 1):
+            return False, f"seed {seed}: {len(history)} versions kept, expected the last {limit}"
+        for version in range(history.oldest, history.version + 1):
+            if listing(history.at(version)) != listings[version]:
+                return False, f"seed {seed}: version {version} no longer shows the organization after change {version}"
+        if listing(org.snapshot()) != listing(org):
+            return False, f"seed {seed}: snapshot() displays differently from the manager"
+        try:
+            history.at(history.oldest - 1)
+            return False, f"seed {seed}: a dropped version is still returned"
+        except KeyError:
+            pass
+        kept += len(history)
+    return True, f"{kept} versions from {len(seeds)} histories displayed as they did when recorded"
+
+
+class Abort(Exception):
+    pass
+
+
+def run_random_commands(rng: random.Random, org: OrganizationManager, count: int) -> bool:
+    # Runs up to count random commands; True if one made a reporting cycle (see has_cycle), which ends the run
+    for _ in range(count):
+        method, args = random_command(rng, org)
+        outcome(method, *args)
+        if has_cycle(org):
+            return True
+    return False
+
+
+def undo_and_transactions(seeds: range, steps: int) -> Tuple[bool, str]:
+    # Random commands, some grouped into transactions, with undo kept and a journal attached:
+    #   - a transaction whose block raises leaves everything as it was before it, and a savepoint
+    #     that raises only takes back its own commands
+    #   - undoing unit by unit goes back through exactly the states seen after each unit, and
+    #     redoing half of them comes forward through the same states again
+    #   - the journal, TRANSACTION records and the checkpoints undo takes included, recovers the end state,
+    #     or, once it refuses to checkpoint an undo, the state it refused it in
+    # Changes cannot be taken back exactly through a reporting cycle, so a sequence ends at the first one.
+    units = compared = 0
+    for seed in seeds:
+        rng = random.Random(seed)
+        with tempfile.TemporaryDirectory() as directory:
+            org = OrganizationManager(echo=False)
+            Journal(directory, group_size=8, checkpoint_every=10**9).attach(org)
+            org.keep_undo()
+            states = [organization_state(org)]
+            org.initialize_president("P")
+            states.append(organization_state(org))
+            cycled = False
+            for step in range(steps):
+                before = states[-1]
+                kind = rng.random()
+                if kind < 0.6:
+                    cycled = run_random_commands(rng, org, 1)
+                else:
+                    try:
+                        with org.transaction():
+                            cycled = run_random_commands(rng, org, rng.randint(1, 4))
+                            if not cycled and rng.random() < 0.3:
+                                inside = organization_state(org)
+                                with contextlib.suppress(Abort), org.transaction():
+                                    cycled = run_random_commands(rng, org, rng.randint(1, 3))
+                                    if not cycled:
+                                        raise Abort
+                                if not cycled and organization_state(org) != inside:
+                                    return False, f"seed {seed}, step {step}: a savepoint did not roll back its part"
+                            if kind > 0.9 and not cycled:
+                                raise Abort
+                    except Abort:
+                        if organization_state(org) != before:
+                            return False, f"seed {seed}, step {step}: a failed transaction left changes behind"
+                        continue
+                if cycled:
+                    break
+                problem = check_headcount(org) or check_indexes(org) or check_names(org) or check_openings(org)
+                if problem:
+                    return False, f"seed {seed}, step {step}: {problem}"
+                if len(org._undo) == len(states):
+                    states.append(organization_state(org))
+                elif organization_state(org) != before:
+                    return False, f"seed {seed}, step {step}: a change left nothing to undo"
+            if cycled:
+                continue
+            journaled = True
+            for back in range(len(states) - 2, -1, -1):
+                if journaled:
+                    try:
+                        org.undo()
+                    except ValueError:
+                        # The journal could not checkpoint what the undo left, so the unit was put back and
+                        # the journal still recovers this state; the walk goes on without the journal
+                        if organization_state(org) != states[back + 1]:
+                            return False, f"seed {seed}: a refused undo changed the organization"
+                        org._journal.close()
+                        recovered = recover(directory, echo=False)
+                        recovered._journal.close()
+                        if journal_state(recovered) != journal_state(org):
+                            return False, f"seed {seed}: the journal of a refused undo recovers a different organization"
+                        journaled = False
+                if not journaled:
+                    org.undo()
+                if organization_state(org) != states[back]:
+                    return False, f"seed {seed}: undo {len(states) - 1 - back} did not restore the earlier state"
+                problem = check_ancestry(org) or check_openings(org)
+                if problem:
+                    return False, f"seed {seed}: after undo {len(states) - 1 - back}: {problem}"
+            if org.undo():
+                return False, f"seed {seed}: undo went past the first change"
+            for forward in range(1, len(states) // 2 + 1):
+                org.redo()
+                if organization_state(org) != states[forward]:
+                    return False, f"seed {seed}: redo {forward} did not reproduce the later state"
+            if journaled:
+                org._journal.sync()
+                if listing(recover(directory, echo=False)) != listing(org):
+                    return False, f"seed {seed}: the journal recovers a different organization"
+            org.keep_undo(3, 10)
+            if len(org._undo) > 3 or org._undo_size > 10:
+                return False, f"seed {seed}: {len(org._undo)} units of {org._undo_size} steps kept past the bounds"
+            units += len(states) - 1
+            compared += 1
+    return True, f"{units} units across {compared} of {len(seeds)} organizations undone and redone exactly"
+
+
+def concurrent_undo(seeds: range, threads: int, steps: int) -> Tuple[bool, str]:
+    # Threads issue commands and transactions (some rolled back) to one ConcurrentOrganizationManager
+    # keeping undo. Undoing every unit then leaves an empty organization, and redoing them all
+    # brings back the organization the threads left.
+    switch_interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    undone = 0
+    try:
+        for seed in seeds:
+            org = ConcurrentOrganizationManager(echo=False)
+            org.keep_undo(10**6, 10**9)
+            org.initialize_president("P")
+            failures = []
+
+            def issue(number: int):
+                rng = random.Random(seed * 1000 + number)
+                try:
+                    for _ in range(steps):
+                        if rng.random() < 0.8:
+                            method, args = concurrent_command(rng, org)
+                            outcome(method, *args)
+                            continue
+                        with contextlib.suppress(Abort), org.transaction():
+                            for _ in range(rng.randint(1, 3)):
+                                method, args = concurrent_command(rng, org)
+                                outcome(method, *args)
+                            if rng.random() < 0.3:
+                                raise Abort
+                except BaseException as e:
+                    failures.append(f"thread {number}: {type(e).__name__}: {e}")
+
+            workers = [threading.Thread(target=issue, args=(number,)) for number in range(threads)]
+            for worker in workers:
+                worker.start()
+            for worker in workers:
+                worker.join()
+            if failures:
+                return False, f"seed {seed}: {failures[0]}"
+            final = organization_state(org)
+            units = 0
+            while org.undo():
+                units += 1
+            if organization_state(org) != organization_state(OrganizationManager(echo=False)):
+                return False, f"seed {seed}: undoing all {units} units left something behind"
+            while org.redo():
+                pass
+            if organization_state(org) != final:
+                return False, f"seed {seed}: redoing all {units} units led somewhere else"
+            undone += units
+    finally:
+        sys.setswitchinterval(switch_interval)
+    return True, f"{undone} units from {len(seeds)} x {threads} threads undone and redone in commit order"
+
+
+def hired_records(rng: random.Random, size: int) -> tuple:
+    # An organization grown by random hires only (imports have no vacancies), and its
+    # (name, manager, role) records, each manager's reports in order but otherwise shuffled
+    org = OrganizationManager(echo=False)
+    org.initialize_president("P")
+    for number in range(size):
+        org.hire_employee(rng.choice(list(org.employee_lookup)), f"E{number}")
+    queues = {None: [("P", "", org.president.role)]}
+    for person in org.employee_lookup.values():
+        if person.reports:
+            queues[person.name] = [(report.name, person.name, report.role) for report in person.reports]
+    records = []
+    while queues:
+        manager = rng.choice(list(queues))
+        records.append(queues[manager].pop(0))
+        if not queues[manager]:
+            del queues[manager]
+    return org, records
+
+
+def bulk_import(seeds: range, size: int) -> Tuple[bool, str]:
+    # from_records builds, from records in any order, the organization the hires built: same
+    # listing, headcounts, indexes and names, and later commands act the same on both. Written
+    # to CSV, JSON and JSON Lines, the records read back unchanged. Records with planted
+    # problems are rejected with every one of them listed.
+    for seed in seeds:
+        rng = random.Random(seed)
+        hired, records = hired_records(rng, size)
+        imported = OrganizationManager.from_records(records, echo=False)
+        if organization_state(imported) != organization_state(hired):
+            return False, f"seed {seed}: the imported organization differs from the hired one"
+        problem = check_headcount(imported) or check_indexes(imported) or check_names(imported) or check_openings(imported)
+        if problem:
+            return False, f"seed {seed}: {problem}"
+        for step in range(100):
+            method, args = random_command(random.Random(seed * 1000 + step), hired)
+            expected = without_addresses(str(outcome(method, *args)))
+            if without_addresses(str(outcome(getattr(imported, method.__name__), *args))) != expected \
+                    or listing(imported) != listing(hired):
+                return False, f"seed {seed}, step {step}: {method.__name__}{args} acts differently after the import"
+            if has_cycle(hired):
+                break
+
+        with tempfile.TemporaryDirectory() as directory:
+            written = {}
+            for extension in (".csv", ".json", ".jsonl"):
+                path = written[extension] = os.path.join(directory, "export" + extension)
+                with open(path, "w", newline="") as file:
+                    if extension == ".csv":
+                        writer = csv.writer(file)
+                        writer.writerow(("Role", "Name", "Manager"))
+                        writer.writerows((role, name, manager) for name, manager, role in records)
+                    elif extension == ".json":
+                        json.dump([dict(zip(("name", "manager", "role"), record)) for record in records], file)
+                    else:
+                        file.writelines(json.dumps(dict(zip(("name", "manager", "role"), record))) + "\n" for record in records)
+            for extension, path in written.items():
+                if list(read_records(path)) != records:
+                    return False, f"seed {seed}: {extension} records read back differently"
+
+        planted = list(records)
+        full = next(name for name, person in hired.employee_lookup.items() if len(person.reports) >= person.max_reports > 0)
+        bad = {
+            len(planted) + 1: (records[-1][0], "P", None),        # repeated name
+            len(planted) + 2: ("Orphan", "Nobody", None),         # unknown manager
+            len(planted) + 3: ("Wrong", "P", "Worker"),           # role not below the manager's
+            len(planted) + 4: ("Second", "", None),               # another President
+            len(planted) + 5: ("Loop1", "Loop2", None),           # not under the President
+            len(planted) + 6: ("Loop2", "Loop1", None),
+            len(planted) + 7: ("bad name", "P", None),
+            len(planted) + 8: ("Extra", full, None),              # one more than full's capacity
+        }
+        planted.extend(bad.values())
+        try:
+            OrganizationManager.from_records(planted, echo=False)
+            return False, f"seed {seed}: records with planted problems were accepted"
+        except ValueError as e:
+            reported = {int(number) for number in re.findall(r"^record (\d+):", str(e), re.M)}
+        expected = set(bad) - {len(records) + 8} | {next(number for number, record in enumerate(planted, 1) if record[0] == full)}
+        if reported != expected:
+            return False, f"seed {seed}: problems reported for records {sorted(reported)}, planted in {sorted(expected)}"
+    return True, f"{len(seeds)} organizations imported from shuffled records; every planted problem reported"
+
+
+def document_of(spot) -> dict:
+    # The nested export document, built from the live tree
+    return {"name": getattr(spot, "name", None), "role": spot.role,
+            "reports": [document_of(report) for report in spot.reports]}
+
+
+def listing_of(document: dict) -> str:
+    # The DISPLAY listing of a nested export document
+    lines = [f"{document['role']}: {document['name']}"]
+    stack = [(report, 1) for report in reversed(document["reports"])]
+    while stack:
+        spot, level = stack.pop()
+        if spot["name"] is None:
+            lines.append("\t" * level + f"VACANCY: {spot['role']}")
+            continue
+        lines.append("\t" * level + f"{spot['role']}: {spot['name']}")
+        stack.extend((report, level + 1) for report in reversed(spot["reports"]))
+    return "\n".join(lines) + "\n"
+
+
+def cycle_errors_alike() -> Tuple[bool, str]:
+    # A reporting cycle makes every listing, export and snapshot of either manager raise the same
+    # ValueError (employee.cycle_error)
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "org.bin")
+        for manager in (OrganizationManager, ConcurrentOrganizationManager):
+            org = manager(echo=False)
+            org.initialize_president("P")
+            org.hire_employee("P", "A")
+            org.hire_employee("A", "B")
+            a, b = org.employee_lookup["A"], org.employee_lookup["B"]
+            b.add_report(a)     # A now sits below B as well as above it
+            calls = {
+                "display_organization": lambda: org.display_organization(stream=io.StringIO()),
+                "export": lambda: org.export(io.StringIO(), "jsonl"),
+                "snapshot": org.snapshot,
+                "save": lambda: org.save(path),
+                "ColumnarOrg.from_manager": lambda: ColumnarOrg.from_manager(org),
+            }
+            for label, call in calls.items():
+                try:
+                    call()
+                    return False, f"{manager.__name__} {label} went through a reporting cycle"
+                except ValueError as e:
+                    if str(e) != "A appears below themselves in the hierarchy.":
+                        return False, f"{manager.__name__} {label} raised {str(e)!r}"
+                except Exception as e:
+                    return False, f"{manager.__name__} {label} raised {type(e).__name__}, not ValueError"
+    return True, "every listing, export and snapshot of both managers raised the same ValueError on a cycle"
+
+
+def streamed_export(seeds: range, steps: int) -> Tuple[bool, str]:
+    # Exports of organizations changed by random commands (vacancies and what sits under them
+    # included) hold the whole tree: the nested JSON matches the tree and displays the same listing,
+    # the JSON Lines and CSV spots link back into that same tree, gzip holds the same text, and a
+    # snapshot exports the same files. Organizations without vacancies import back unchanged.
+    exported = 0
+    for seed in seeds:
+        rng = random.Random(seed)
+        org = OrganizationManager(echo=False)
+        org.initialize_president("P")
+        for _ in range(steps):
+            method, args = random_command(rng, org)
+            outcome(method, *args)
+            if has_cycle(org):
+                break
+        if has_cycle(org):
+            continue
+        texts = {}
+        for format in ("json", "jsonl", "csv"):
+            stream = io.StringIO()
+            org.export(stream, format)
+            texts[format] = stream.getvalue()
+            compressed = io.BytesIO()
+            org.snapshot().export(compressed, format, compress=True)
+            if gzip.decompress(compressed.getvalue()).decode() != texts[format]:
+                return False, f"seed {seed}: the gzip-compressed {format} snapshot export differs"
+        document = json.loads(texts["json"])
+        if document != document_of(org.president) or listing_of(document) != listing(org):
+            return False, f"seed {seed}: the nested JSON export does not match the organization"
+        spots = [json.loads(line) for line in texts["jsonl"].splitlines()]
+        rows = list(csv.DictReader(io.StringIO(texts["csv"])))
+        if [{key: "" if value is None else str(value) for key, value in spot.items()} for spot in spots] != rows:
+            return False, f"seed {seed}: the CSV and JSON Lines exports hold different spots"
+        linked = [{"name": spot["name"], "role": spot["role"], "reports": []} for spot in spots]
+        for spot in spots[1:]:
+            boss = spots[spot["boss"]]
+            if spot["manager"] != boss["name"]:
+                return False, f"seed {seed}: spot {spot['id']} names a manager other than its boss"
+            linked[spot["boss"]]["reports"].append(linked[spot["id"]])
+        if linked[0] != document:
+            return False, f"seed {seed}: the JSON Lines spots link into a different tree"
+        exported += len(spots)
+
+        hired, _ = hired_records(rng, steps)
+        with tempfile.TemporaryDirectory() as directory:
+            for name in ("org.csv.gz", "org.jsonl"):
+                path = os.path.join(directory, name)
+                hired.export(path)
+                imported = OrganizationManager.from_records(read_records(path), echo=False)
+                if organization_state(imported) != organization_state(hired):
+                    return False, f"seed {seed}: {name} imports back differently"
+    return True, f"{exported} spots exported from {len(seeds)} organizations in every format"
+
+
+def placed_spots(org: OrganizationManager) -> dict:
+    # (name, boss, role) -> count of every tracked spot, as a change feed describes them:
+    # a vacancy, and a boss that is one, by its number
+    def identity(spot):
+        return spot.number if isinstance(spot, Vacancy) else getattr(spot, "name", None)
+    spots = {}
+    for person in org.employee_lookup.values():
+        spots[person.name, identity(person.boss), person.role] = 1
+    for vacancies in org._vacancy_index.values():
+        for vacancy in vacancies:
+            spots[vacancy.number, identity(vacancy.boss), vacancy.role] = 1
+    return spots
+
+
+def apply_change(mirror: dict, change) -> str | None:
+    # Drops the before half of a change from a mirror of placed_spots and adds the after half
+    if change.role_before is not None:
+        key = (change.name, change.boss_before, change.role_before)
+        if not mirror.get(key):
+            return f"change {change.sequence} ({change.kind}) moves {key}, which the mirror does not hold"
+        mirror[key] -= 1
+        if not mirror[key]:
+            del mirror[key]
+    if change.role_after is not None:
+        key = (change.name, change.boss_after, change.role_after)
+        mirror[key] = mirror.get(key, 0) + 1
+    return None
+
+
+def two_vacancies() -> OrganizationManager:
+    # P over two Vice President vacancies: V1 full (A0, A1, A2) and V2 with room (B0).
+    # LAYOFF P A0 then moves A0 from V1 to V2 (and raises on the vacancy's missing name, a known bug).
+    org = OrganizationManager(echo=False)
+    org.initialize_president("P")
+    org.hire_employee("P", "X")
+    org.hire_employee("P", "Y")
+    for name in ("A0", "A1", "A2"):
+        org.hire_employee("X", name)
+    org.hire_employee("Y", "B0")
+    org.fire_employee("P", "X")
+    org.fire_employee("P", "Y")
+    return org
+
+
+def change_feed(seeds: range, steps: int, limit: int) -> Tuple[bool, str]:
+    # Random commands, transactions (some rolled back), undos and redos with a ChangeFeed attached:
+    #   - a subscriber applying each change to a mirror holds exactly the spots the manager tracks
+    #     after every step, and a rolled-back transaction publishes nothing
+    #   - the changes come numbered one after another, and since() returns exactly the ones after
+    #     a reader's position, or raises KeyError once some of them have been dropped
+    #   - resync() hands back the newest sequence number and a snapshot of the organization
+    published = resyncs = 0
+    for seed in seeds:
+        rng = random.Random(seed)
+        org = OrganizationManager(echo=False)
+        org.keep_undo()
+        feed = ChangeFeed(limit)
+        feed.attach(org)
+        received, applied = [], []
+        mirror = {}
+        feed.subscribe(received.append)
+        org.initialize_president("P")
+        position = 0
+        for step in range(steps):
+            kind = rng.random()
+            before = feed.sequence
+            if kind < 0.6:
+                cycled = run_random_commands(rng, org, 1)
+            elif kind < 0.85:
+                aborted = rng.random() < 0.3
+                cycled = False
+                with contextlib.suppress(Abort), org.transaction():
+                    cycled = run_random_commands(rng, org, rng.randint(1, 4))
+                    if aborted and not cycled:
+                        raise Abort
+                if aborted and not cycled and feed.sequence != before:
+                    return False, f"seed {seed}, step {step}: a rolled-back transaction published changes"
+            else:
+                cycled = False
+                if kind > 0.95:
+                    org.redo()
+                elif len(org._undo) > 1:    # Keeps the President, whom the commands need
+                    org.undo()
+            if cycled:
+                break
+            for number, change in enumerate(received[len(applied):], len(applied) + 1):
+                applied.append(change)
+                problem = change.sequence != number and f"change {change.sequence} published as number {number}"
+                problem = problem or apply_change(mirror, change)
+                if problem:
+                    return False, f"seed {seed}, step {step}: {problem}"
+            if mirror != placed_spots(org):
+                return False, f"seed {seed}, step {step}: the mirror differs from the organization"
+            if rng.random() < 0.1:
+                try:
+                    changes = feed.since(position)
+                    if position < feed.sequence - limit:
+                        return False, f"seed {seed}, step {step}: since({position}) did not report the dropped changes"
+                    if changes != received[position:]:
+                        return False, f"seed {seed}, step {step}: since({position}) returned other changes"
+                    position = feed.sequence
+                except KeyError:
+                    if position >= feed.sequence - limit:
+                        return False, f"seed {seed}, step {step}: since({position}) raised with the changes still kept"
+                    position, snapshot = feed.resync()
+                    if position != feed.sequence or listing(snapshot) != listing(org):
+                        return False, f"seed {seed}, step {step}: resync() is not at the newest change"
+                    resyncs += 1
+        if len(feed) != min(limit, feed.sequence):
+            return False, f"seed {seed}: {len(feed)} changes kept, expected the last {limit}"
+        feed.close()
+        org.hire_employee("P", "Late")
+        if feed.sequence != len(received):
+            return False, f"seed {seed}: a closed feed still published"
+        published += feed.sequence
+    org = two_vacancies()
+    full, room = org.president.reports
+    feed = ChangeFeed()
+    feed.attach(org)
+    with contextlib.suppress(AttributeError):
+        org.layoff_employee("P", "A0")
+    if list(feed) != [Change(1, "move", "A0", full.number, room.number, "Supervisor", "Supervisor")]:
+        return False, f"moving A0 from one vacancy to another published {list(feed)}"
+    return True, f"{published} changes from {len(seeds)} organizations kept mirrors exact; {resyncs} readers resynced"
+
+
+def frozen_spots(frozen) -> dict:
+    # (name, boss, role) of the spots reachable from a FrozenOrg's President, as diff() describes them:
+    # a vacancy, and a boss that is one, by its place, (boss, n) for its boss's n-th vacancy
+    spots = {}
+    stack = [] if frozen.root is None else [(frozen.root, None, frozen.root.name)]
+    while stack:
+        spot, boss, key = stack.pop()
+        spots[key, boss, spot.role] = 1
+        vacancies = 0
+        for report in spot.reports:
+            if report.name is None:
+                stack.append((report, key, (key, vacancies)))
+                vacancies += 1
+            else:
+                stack.append((report, key, report.name))
+    return spots
+
+
+def tree_diff(seeds: range, steps: int, pairs: int) -> Tuple[bool, str]:
+    # diff() between random pairs of versions from a VersionHistory, and between an organization and
+    # a copy rebuilt from its columnar form (which shares no spots with it) changed by a few commands:
+    # applying the changes to a mirror of the first gives the second, no change leaves a spot where
+    # it was, each employee comes up once at most, and an unchanged copy differs in nothing.
+    # An employee moving from one vacancy to another under the same boss is a change too.
+    compared = 0
+    for seed in seeds:
+        rng = random.Random(seed)
+        org = OrganizationManager(echo=False)
+        history = VersionHistory(limit=steps + 2)
+        history.attach(org)
+        org.initialize_president("P")
+        if run_random_commands(rng, org, steps):
+            continue
+        copy = OrganizationManager.from_columnar(ColumnarOrg.from_manager(org), echo=False)
+        if diff(org, copy):
+            return False, f"seed {seed}: an unchanged copy differs"
+        cycled = run_random_commands(rng, copy, 5)
+        versions = [(history.at(rng.randint(0, history.version)), history.at(rng.randint(0, history.version)))
+                    for _ in range(pairs)]
+        if not cycled:
+            versions.append((history.latest, copy.snapshot()))
+        for first, second in versions:
+            mirror = frozen_spots(first)
+            changes = diff(first, second)
+            for change in changes:
+                if (change.boss_before, change.role_before) == (change.boss_after, change.role_after):
+                    return False, f"seed {seed}: change {change.sequence} leaves {change.name} where they were"
+                problem = apply_change(mirror, change)
+                if problem:
+                    return False, f"seed {seed}: {problem}"
+            if mirror != frozen_spots(second):
+                return False, f"seed {seed}: the changes do not lead from one version to the other"
+            names = [change.name for change in changes if isinstance(change.name, str)]
+            if len(names) != len(set(names)):
+                return False, f"seed {seed}: an employee comes up in more than one change"
+            compared += 1
+    org = two_vacancies()
+    before = org.snapshot()
+    with contextlib.suppress(AttributeError):
+        org.layoff_employee("P", "A0")
+    changes = diff(before, org)
+    if changes != [Change(1, "move", "A0", ("P", 0), ("P", 1), "Supervisor", "Supervisor")]:
+        return False, f"moving A0 from one vacancy to another came out as {changes}"
+    return True, f"{compared} pairs of organizations from {len(seeds)} histories diffed exactly"
+
+
+class WhiteBoxTester:
+    """Runs internal consistency checks against OrganizationManager"""
+
+    def __init__(self):
+        self.test_results = []
+        self.passed = 0
+        self.failed = 0
+
+    def run_test(self, test_id: str, description: str, check: Callable[[], Tuple[bool, str]]) -> bool:
+        print(f"\n{'='*70}")
+        print(f"Running {test_id}: {description}")
+        print(f"{'='*70}")
+        try:
+            passed, detail = check()
+        except Exception as e:
+            passed, detail = False, f"EXCEPTION: {e}"
+        print(detail)
+
+        self.test_results.append({
+            'id': test_id,
+            'description': description,
+            'passed': passed,
+            'output': detail
+        })
+        if passed:
+            self.passed += 1
+            print(f"\n[PASS] {test_id} PASSED")
+        else:
+            self.failed += 1
+            print(f"\n[FAIL] {test_id} FAILED")
+        return passed
+
+    def print_summary(self):
+        """Print test execution summary"""
+        print("\n" + "="*70)
+        print("TEST EXECUTION SUMMARY")
+        print("="*70)
+        print(f"Total Tests: {self.passed + self.failed}")
+        print(f"Passed: {self.passed}")
+        print(f"Failed: {self.failed}")
+        print("="*70)
+
+        if self.failed > 0:
+            print("\nFAILED TESTS:")
+            for result in self.test_results:
+                if not result['passed']:
+                    print(f"  - {result['id']}: {result['description']}")
+
+
+def differential(seeds: range, steps: int, check) -> Tuple[bool, str]:
+    for seed in seeds:
+        problem = replay(seed, steps, check)
+        if problem:
+            return False, problem
+    return True, f"{len(seeds)} random sequences of up to {steps} commands matched the reference"
+
+
+def with_roles(ladder: list, capacity: dict, func):
+    # Runs func with the role ladder and capacities temporarily replaced
+    def run():
+        saved = (list(employee.ROLE_LADDER), dict(employee.ROLE_CAPACITY))
+        employee.configure_roles(ladder, capacity)
+        try:
+            return func()
+        finally:
+            employee.configure_roles(*saved)
+    return run
+
+
+def main():
+    """Run all white box tests"""
+    tester = WhiteBoxTester()
+
+    # ========== OPENING INDEX TESTS ==========
+
+    tester.run_test(
+        "WBT001",
+        "Opening index returns exactly what the linear scans return",
+        lambda: differential(range(60), 400, check_openings)
+    )
+
+    tester.run_test(
+        "WBT002",
+        "Opening index matches the scans on a wider organization",
+        with_roles(employee.ROLE_LADDER, {"President": 4, "Vice President": 6, "Supervisor": 8},
+                   lambda: differential(range(60, 90), 400, check_openings))
+    )
+
+    # ========== ANCESTRY INDEX TESTS ==========
+
+    tester.run_test(
+        "WBT003",
+        "Ancestry index agrees with walking boss pointers",
+        lambda: differential(range(40), 400, check_ancestry)
+    )
+
+    tester.run_test(
+        "WBT004",
+        "Ancestry and opening indexes on a configured six-rung ladder",
+        with_roles(["President", "Director", "Vice President", "Manager", "Supervisor", "Worker"],
+                   {"President": 2, "Director": 2, "Vice President": 2, "Manager": 3, "Supervisor": 3},
+                   lambda: differential(range(60), 400, lambda org: check_ancestry(org) or check_openings(org)))
+    )
+
+    # ========== DISPLAY TESTS ==========
+
+    tester.run_test(
+        "WBT005",
+        "Iterative display matches the recursive listing for subtrees and depth limits",
+        lambda: differential(range(30), 300, check_display)
+    )
+
+    tester.run_test(
+        "WBT034",
+        "Every lister shows only the root at max_depth=0 and reports an unknown root alike",
+        lambda: display_listers_agree(range(20), 200)
+    )
+
+    depth = sys.getrecursionlimit() * 3
+    tester.run_test(
+        "WBT006",
+        "Display walks a chain deeper than the recursion limit",
+        with_roles([f"Level{i}" for i in range(depth + 1)], {f"Level{i}": 1 for i in range(depth)},
+                   lambda: display_deep_chain(depth))
+    )
+
+    # ========== BATCH API TESTS ==========
+
+    tester.run_test(
+        "WBT007",
+        "apply_batch results render to exactly what the individual calls print",
+        lambda: batch_differential(range(30), 400)
+    )
+
+    tester.run_test(
+        "WBT008",
+        "apply_batch rejects a malformed batch before applying anything",
+        batch_rejects_malformed
+    )
+
+    tester.run_test(
+        "WBT009",
+        "Methods return result records and print nothing when echo is off",
+        quiet_results
+    )
+
+    # ========== NODE LAYOUT TESTS ==========
+
+    tester.run_test(
+        "WBT010",
+        "Leaf nodes share one empty report container",
+        shared_leaf_reports
+    )
+
+    # ========== COLUMNAR STORE TESTS ==========
+
+    tester.run_test(
+        "WBT011",
+        "Columnar store, its pickle and the manager rebuilt from it match the object graph",
+        lambda: differential(range(20), 300, check_columnar)
+    )
+
+    tester.run_test(
+        "WBT012",
+        "save() and load() round-trip DISPLAY and later commands",
+        lambda: save_and_load(range(20), 300)
+    )
+
+    tester.run_test(
+        "WBT033",
+        "load() and recover() into ConcurrentOrganizationManager keep it concurrent",
+        concurrent_loading
+    )
+
+    # ========== JOURNAL TESTS ==========
+
+    tester.run_test(
+        "WBT013",
+        "recover() rebuilds the organization from checkpoint and journal after a torn write",
+        lambda: journal_recovery(range(20), 150)
+    )
+
+    tester.run_test(
+        "WBT031",
+        "An idle journal syncs its last group after group_delay, and long names are journaled",
+        journal_flushes_when_idle
+    )
+
+    tester.run_test(
+        "WBT036",
+        "Journal segments in another format are rejected, and a torn segment header is rewritten",
+        journal_segment_headers
+    )
+
+    # ========== COMMAND LINE TESTS ==========
+
+    tester.run_test(
+        "WBT014",
+        "Scripted runs print the interactive output without banners and prompts",
+        lambda: script_matches_interactive(range(20), 200)
+    )
+
+    tester.run_test(
+        "WBT015",
+        "Command registry dispatches batch commands like apply_batch()",
+        lambda: registry_matches_batch(range(20), 200)
+    )
+
+    # ========== AGGREGATE TESTS ==========
+
+    tester.run_test(
+        "WBT016",
+        "headcount() tallies match a walk of each subtree after every command",
+        lambda: differential(range(30), 300, check_headcount)
+    )
+
+    tester.run_test(
+        "WBT017",
+        "headcount() tallies on a configured six-rung ladder",
+        with_roles(["President", "Director", "Vice President", "Manager", "Supervisor", "Worker"],
+                   {"President": 2, "Director": 2, "Vice President": 2, "Manager": 3, "Supervisor": 3},
+                   lambda: differential(range(30), 300, check_headcount))
+    )
+
+    tester.run_test(
+        "WBT018",
+        "Role and vacancy indexes answer the same as walking the tree",
+        lambda: differential(range(30), 300, check_indexes)
+    )
+
+    tester.run_test(
+        "WBT019",
+        "Role and vacancy indexes on a wider organization",
+        with_roles(employee.ROLE_LADDER, {"President": 4, "Vice President": 6, "Supervisor": 8},
+                   lambda: differential(range(30), 300, check_indexes))
+    )
+
+    tester.run_test(
+        "WBT020",
+        "Name registry stays interned and answers bulk checks like single probes",
+        lambda: differential(range(30), 300, check_names)
+    )
+
+    tester.run_test(
+        "WBT021",
+        "Threads issuing mixed commands to a ConcurrentOrganizationManager keep it consistent",
+        with_roles(employee.ROLE_LADDER, {"President": 6, "Vice President": 5, "Supervisor": 6},
+                   lambda: concurrent_stress(range(20), 8, 200))
+    )
+
+    tester.run_test(
+        "WBT032",
+        "apply_batch on many threads keeps other threads' output and leaves echo on",
+        lambda: concurrent_batches(range(20), 4, 50)
+    )
+
+    # ========== SERVICE TESTS ==========
+
+    tester.run_test(
+        "WBT022",
+        "A pipelining client is answered by the server as the REPL would answer",
+        lambda: server_matches_dispatch(range(20), 200)
+    )
+
+    tester.run_test(
+        "WBT023",
+        "Concurrent clients are each answered in order and the writer's journal replays",
+        with_roles(employee.ROLE_LADDER, {"President": 6, "Vice President": 5, "Supervisor": 6},
+                   lambda: server_clients(range(10), 16, 100))
+    )
+
+    # ========== VERSION HISTORY TESTS ==========
+
+    tester.run_test(
+        "WBT024",
+        "Kept versions stay as recorded and share all but the changed paths",
+        lambda: version_history(range(30), 300, 200)
+    )
+
+    # ========== TRANSACTION TESTS ==========
+
+    tester.run_test(
+        "WBT025",
+        "Transactions roll back, and undo/redo step through the exact earlier states",
+        lambda: undo_and_transactions(range(30), 300)
+    )
+
+    tester.run_test(
+        "WBT026",
+        "Units committed from many threads undo and redo in commit order",
+        lambda: concurrent_undo(range(10), 8, 150)
+    )
+
+    # ========== BULK IMPORT TESTS ==========
+
+    tester.run_test(
+        "WBT027",
+        "from_records rebuilds hired organizations from shuffled records and lists every problem",
+        lambda: bulk_import(range(20), 300)
+    )
+
+    # ========== EXPORT TESTS ==========
+
+    tester.run_test(
+        "WBT028",
+        "Streamed JSON, JSON Lines and CSV exports hold the whole tree and import back",
+        lambda: streamed_export(range(30), 300)
+    )
+
+    tester.run_test(
+        "WBT035",
+        "A reporting cycle raises ValueError from every listing, export and snapshot",
+        cycle_errors_alike
+    )
+
+    # ========== CHANGE FEED TESTS ==========
+
+    tester.run_test(
+        "WBT029",
+        "A change feed keeps mirrors exact and readers of its ring buffer see every gap",
+        lambda: change_feed(range(30), 300, 20)
+    )
+
+    # ========== DIFF TESTS ==========
+
+    tester.run_test(
+        "WBT030",
+        "diff() leads from one version to another, shared or rebuilt, and finds nothing in a copy",
+        lambda: tree_diff(range(30), 300, 100)
+    )
+
+    tester.print_summary()
+    return 0 if tester.failed == 0 else 1
+
+
+if __name__ == "__main__":
+    exit_code = main()
+    sys.exit(exit_code)